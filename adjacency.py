@@ -0,0 +1,97 @@
+from typing import Dict, List, Tuple
+
+
+class AdjacencyGraph:
+    node_ids: List[int]  # İndeks -> düğüm ID'si
+    index: Dict[int, int]  # Düğüm ID'si -> indeks
+    points: List[Tuple[float, float]]  # İndeks -> konum
+    indptr: List[int]  # CSR satır başlangıçları
+    indices: List[int]  # CSR komşu indeksleri
+    weights: List[float]  # CSR kenar ağırlıkları
+    extra: Dict[int, List[Tuple[int, float]]]  # CSR'ye eklenen katman kenarları
+    rows: Dict[int, List[Tuple[int, float]]]  # Sonradan değiştirilen, CSR satırının yerine geçen satırlar
+
+    def __init__(self, node_ids, points, indptr, indices, weights, extra=None):
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.points = points
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.extra = extra if extra is not None else {}
+        self.rows = {}
+
+    @classmethod
+    def from_edges(cls, graph, positions) -> "AdjacencyGraph":
+        # Kenar sözlüğünden yönsüz CSR komşuluk yapısı oluşturma
+        rows = {}
+        for (u, v), cost in graph.items():
+            rows.setdefault(u, {})[v] = cost
+            rows.setdefault(v, {})[u] = cost
+
+        node_ids = list(positions.keys())
+        for node_id in rows:
+            if node_id not in positions:
+                raise KeyError(f"Node {node_id} has no position")
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        indptr = [0]
+        indices = []
+        weights = []
+        for node_id in node_ids:
+            for neighbor, cost in rows.get(node_id, {}).items():
+                indices.append(index[neighbor])
+                weights.append(cost)
+            indptr.append(len(indices))
+
+        points = [positions[node_id] for node_id in node_ids]
+        return cls(node_ids, points, indptr, indices, weights)
+
+    def with_overlay(self, edges, positions) -> "AdjacencyGraph":
+        # CSR dizilerini paylaşan, üzerine küçük bir kenar katmanı eklenmiş grafik
+        node_ids = list(self.node_ids)
+        points = list(self.points)
+        index = dict(self.index)
+        for node_id, pos in positions.items():
+            if node_id not in index:
+                index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+                points.append(pos)
+
+        extra = {i: list(items) for i, items in self.extra.items()}
+        for (u, v), cost in edges.items():
+            extra.setdefault(index[u], []).append((index[v], cost))
+            extra.setdefault(index[v], []).append((index[u], cost))
+
+        overlay = AdjacencyGraph.__new__(AdjacencyGraph)
+        overlay.node_ids = node_ids
+        overlay.index = index
+        overlay.points = points
+        overlay.indptr = self.indptr
+        overlay.indices = self.indices
+        overlay.weights = self.weights
+        overlay.extra = extra
+        overlay.rows = dict(self.rows)
+        return overlay
+
+    def add_node(self, node_id: int, pos: Tuple[float, float]) -> int:
+        ## Komşusuz düğüm ekle ve indeksini döndür (komşular set_row ile verilir)
+        i = len(self.node_ids)
+        self.node_ids.append(node_id)
+        self.points.append(pos)
+        self.index[node_id] = i
+        return i
+
+    def set_row(self, i: int, row: List[Tuple[int, float]]):
+        ## Düğümün CSR komşularını (komşu indeksi, ağırlık) listesiyle değiştir; CSR dizileri paylaşıldığı
+        ## için yeniden oluşturulmaz
+        self.rows[i] = row
+
+    def neighbors(self, i: int):
+        # Bir düğümün (komşu indeksi, ağırlık) çiftleri
+        if self.rows and i in self.rows:
+            yield from self.rows[i]
+        elif i + 1 < len(self.indptr):
+            start, end = self.indptr[i], self.indptr[i + 1]
+            yield from zip(self.indices[start:end], self.weights[start:end])
+        yield from self.extra.get(i, ())
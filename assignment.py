@@ -0,0 +1,55 @@
+from typing import Tuple
+import numpy as np
+
+
+def min_cost_assignment(cost) -> Tuple[np.ndarray, np.ndarray]:
+    ## Dikdörtgen maliyet matrisi için en düşük toplam maliyetli eşleme (Macar algoritması).
+    ## Küçük boyuttaki her satır/sütun tam olarak bir eşe atanır; (satırlar, sütunlar) döndürülür.
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # Potansiyeller ve eşleme 1 tabanlı tutulur; 0. sütun yeni satırın sanal başlangıcıdır
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.intp)  # Sütun -> eşlenen satır (0: boş)
+    way = np.zeros(m + 1, dtype=np.intp)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            # En kısa artırma yolu her adımda tüm sütunlar için vektörel güncellenir
+            used[column] = True
+            current = match[column]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_slack[1:])
+            min_slack[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        # Artırma yolu boyunca eşlemeleri kaydır
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+
+    columns = np.flatnonzero(match[1:])
+    rows = match[1:][columns] - 1
+    if transposed:
+        rows, columns = columns, rows
+    order = np.argsort(rows, kind="stable")
+    return rows[order], columns[order]
@@ -1,19 +1,83 @@
 
 from collections import defaultdict
-from datetime import datetime, timedelta
+from functools import partial
+from heapq import heappop, heappush
+import logging
+from time import perf_counter
+import numpy as np
+from adjacency import AdjacencyGraph
+from assignment import min_cost_assignment
 from deliverycase import DeliveryCase
+from dispatch import DispatchIndex
 from drone import Drone
-from solver import DronePath, Solution, Solver
+from landmarks import LandmarkTable
+from metrics import SolverMetrics
+from packagegraph import PackageGraph
+from parallel import ParallelEvaluator
+from searchtree import SearchTree
+from solver import DronePath, RoutePlan, Solution, Solver, TripPlan
 
+logger = logging.getLogger(__name__)
 
 class AStarSolver(Solver):
     noflyzone_penalty:float  # No-fly zone cezası
     KNN = 4  # KNN için kullanılacak komşu sayısı
     deliverycase: DeliveryCase  # Teslimat vakası
-
-    def __init__(self,noflyzone_penalty=100000000):
+    expansions: int  # A* tarafından genişletilen düğüm sayısı
+    edge_relaxations: int  # Genişletme sırasında incelenen kenar sayısı
+    route_evaluations: int  # Aday drone için çalıştırılan teslimat+dönüş rotası sayısı
+    BOUND_TOLERANCE = 1e-9  # Alt sınırlarda kayan nokta yuvarlaması için pay
+    one_to_many: bool  # Her üsten dağıtım anı başına tek arama yapılır
+    forward_trees: dict  # (üs, hız, zaman) -> üsten tüm düğümlere zamana bağlı arama ağacı
+    reverse_trees: dict  # (üs, aktif zone kümesi) -> dönüş yolları için ters arama ağacı
+    workers: int  # Aday drone'ları eşzamanlı değerlendirecek işçi sayısı (1: sıralı)
+    parallel_mode: str  # "process" ya da "thread"
+    evaluator: ParallelEvaluator
+    metrics: SolverMetrics  # Aşama süreleri ve isteğe bağlı profil
+    batch_assignment: bool  # Her dağıtım anında paket x drone eşlemesi toplu çözülür
+    BATCH_CANDIDATES = 4  # Toplu eşlemede paket başına önce değerlendirilen en iyi sınırlı drone sayısı
+    PRIORITY_WEIGHT = 100  # Toplu eşleme maliyetinde öncelik birimi başına indirim
+    multi_drop: bool  # Bir sefere yakındaki paketler de eklenir
+    MAX_STOPS = 4  # Bir seferdeki en fazla paket sayısı
+    MULTI_DROP_CANDIDATES = 4  # Her durak için denenen en yakın paket sayısı
+    routing: str  # "knn": paket KNN grafiği, "visibility": zone köşeleri görünürlük grafiği
+    ROUTING_MODES = ("knn", "visibility")
+    heuristic: str  # "euclidean" ya da "alt" (işaret düğümlü üçgen eşitsizliği sınırı)
+    HEURISTICS = ("euclidean", "alt")
+    LANDMARKS = 8  # ALT için işaret düğümü sayısı
+    bidirectional: bool  # Ceza kümesi değişmiyorsa iki yönlü A*
+    time_horizon: float  # Uygulanabilir hiçbir seferin geçemeyeceği an; ALT ve iki yönlü arama bunu kullanır (vaka başına hesaplanır)
+
+    def __init__(self,noflyzone_penalty=100000000, one_to_many=False, workers=1, parallel_mode="process",
+                 metrics=False, profile=False, trace=None, batch_assignment=False, multi_drop=False, routing="knn",
+                 heuristic="euclidean", bidirectional=False):
+        if routing not in self.ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode: {routing}")
+        if heuristic not in self.HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
         self.noflyzone_penalty = noflyzone_penalty
         self.deliverycase = None
+        self.expansions = 0
+        self.edge_relaxations = 0
+        self.route_evaluations = 0
+        self.one_to_many = one_to_many
+        self.forward_trees = {}
+        self.reverse_trees = {}
+        self.workers = workers
+        self.parallel_mode = parallel_mode
+        self.evaluator = None
+        self.metrics = SolverMetrics(enabled=metrics, profile=profile, trace=trace)
+        self.batch_assignment = batch_assignment
+        self.multi_drop = multi_drop
+        self.routing = routing
+        self.heuristic = heuristic
+        self.bidirectional = bidirectional
+        self.time_horizon = None
+
+    def worker_factory(self):
+        # İşçilerde aynı ayarlarla çözücü oluşturan (pickle edilebilir) fabrika
+        return partial(type(self), noflyzone_penalty=self.noflyzone_penalty, one_to_many=self.one_to_many, routing=self.routing,
+                       heuristic=self.heuristic, bidirectional=self.bidirectional)
 
     def calculate_cost(self,distance:float,weight:float,priority:int):
         return (distance * weight) + (priority * 100)
@@ -23,23 +87,9 @@ class AStarSolver(Solver):
         return Drone.calculate_distance(current_pos, target_pos)
 
     def build_graph(self, deliverycase):
-        # Teslimat vakasından bir grafik oluşturma
-        package_graph = {}
-
-        for i, package1 in enumerate(deliverycase.packages):
-            edges = {}
-            for j, package2 in enumerate(deliverycase.packages):
-                if i != j:
-                    distance = Drone.calculate_distance(package1.pos, package2.pos)
-                    edges[package2.id] = distance 
-                    
-            edges = dict(sorted(edges.items(), key=lambda item: item[1]))
-
-            for i, (node_id,distance) in enumerate(edges.items()):
-                if i < self.KNN:
-                    package_graph[(package1.id, node_id)] = distance
-
-        return package_graph
+        # Teslimat vakasının KNN grafiğini döndürme (vaka başına bir kez oluşturulur)
+        with self.metrics.phase("build_graph"):
+            return deliverycase.get_package_graph(self.KNN).edges
     
     def extract_packages_positions(self, deliverycase):
         # Teslimat vakasından paket ve drone konumlarını çıkarma
@@ -48,20 +98,9 @@ class AStarSolver(Solver):
             positions[package.id] = package.pos
         return positions
     
-    def build_drone_graph(self, graph, packages, drone):
-        # Drone düğümlerini grafiğe ekleme
-        drone_graphs = graph.copy()
-
-        edges = {}
-        for package in packages:
-            distance = Drone.calculate_distance(drone.start_pos, package.pos)
-            edges[package.id] = distance
-        edges = dict(sorted(edges.items(), key=lambda item: item[1]))
-
-        for i, (node_id,distance) in enumerate(edges.items()):
-            if i < self.KNN:
-                drone_graphs[(-1, node_id)] = distance
-        return drone_graphs
+    def build_drone_graph(self, package_graph:PackageGraph, drone) -> AdjacencyGraph:
+        # Drone düğümünü paket grafiğinin CSR yapısına küçük bir katman olarak ekleme
+        return package_graph.get_drone_adjacency(drone.start_pos)
         
     def build_adjacency_list(self,graph):
         adj = defaultdict(dict)
@@ -71,69 +110,213 @@ class AStarSolver(Solver):
             adj[v][u] = cost
         return adj
 
-    def find_path(self, start, end, graph, positions, speed, start_time):
-        adj = self.build_adjacency_list(graph)
+    def get_time_horizon(self, deliverycase:DeliveryCase) -> float:
+        # En geç pencere bitişine en uzun uçuşun süresi (boş drone'un batarya menzili / hız) eklenir:
+        # teslimat ya da dönüş bacağı pencere bitişinde başlasa da bu andan önce biter
+        if self.time_horizon is None:
+            flight = max((drone.battery / Drone.calculate_energy_consumption(1.0, 0) / drone.speed
+                          for drone in deliverycase.drones if drone.speed > 0), default=0.0)
+            self.time_horizon = deliverycase.get_time_horizon() + flight
+        return self.time_horizon
+
+    def get_landmark_table(self, deliverycase:DeliveryCase, time:float):
+        # Zaman ufkuna kadar aktif kalacak zone'ların cezasını içeren ALT tablosu. Bu zone'lar aralıktaki
+        # her varış anında aktif olduğundan tablodaki cezalar her zaman uygulanır; diğer zone'lar yalnızca
+        # ceza ekleyebilir, bu yüzden tablo bu andan başlayan aramalar için alt sınırdır.
+        zones = deliverycase.get_persistent_noflyzones(time, self.get_time_horizon(deliverycase))
+        package_graph = deliverycase.get_package_graph(self.KNN)
+        key = (zones, self.LANDMARKS)
+        if key not in package_graph.landmark_tables:
+            fleet = package_graph.get_fleet_adjacency([drone.start_pos for drone in deliverycase.drones])
+            edges = [(i, j) for i in range(len(fleet.node_ids)) for j, _ in fleet.neighbors(i) if i < j]
+            penalties = {}
+            if zones and edges:
+                conflicts = deliverycase.are_edges_conflict_noflyzone(
+                    [fleet.points[i] for i, _ in edges], [fleet.points[j] for _, j in edges], time, zones=zones
+                )
+                for (i, j), conflict in zip(edges, conflicts.tolist()):
+                    if conflict:
+                        penalties[(i, j)] = penalties[(j, i)] = self.noflyzone_penalty
+            table = LandmarkTable(fleet, penalties, self.LANDMARKS)
+            bases = {fleet.points[i]: i for i, node_id in enumerate(fleet.node_ids) if node_id < 0}
+            package_graph.landmark_tables[key] = (table, bases, len(package_graph.ids), zones)
+        return package_graph.landmark_tables[key]
+
+    def alt_heuristic(self, adj:AdjacencyGraph, goal:int, start_time:float):
+        # ALT tablosundan düğüm -> goal alt sınırı (Öklid mesafesiyle birlikte en büyüğü)
+        package_graph = self.deliverycase.get_package_graph(self.KNN)
+        if adj.indptr is not package_graph.get_adjacency().indptr:
+            return None
+        table, bases, packages, _ = self.get_landmark_table(self.deliverycase, start_time)
+        points = adj.points
+        to_table = lambda i: i if i < packages else bases[points[i]]
+        goal_row = to_table(goal)
+        goal_pos = points[goal]
+        return lambda i: max(Drone.calculate_distance(points[i], goal_pos), table.bound(to_table(i), goal_row))
 
-        open_set = {start}
+    def find_path(self, start, end, graph, positions, speed, start_time):
+        # graph önceden oluşturulmuş bir AdjacencyGraph değilse kenar sözlüğünden oluşturulur
+        adj = graph if isinstance(graph, AdjacencyGraph) else AdjacencyGraph.from_edges(graph, positions)
+        points = adj.points
+        node_ids = adj.node_ids
+
+        if start == end:
+            return [start], [0, start_time]
+        source = adj.index.get(start)
+        target = adj.index.get(end)
+        if source is None or target is None:
+            return None, [float('inf'), start_time]
+
+        alt = self.alt_heuristic(adj, target, start_time) if self.heuristic == "alt" else None
+        if self.bidirectional and self.has_static_penalties(start_time):
+            return self.find_path_bidirectional(adj, source, target, speed, start_time, alt)
+
+        target_pos = points[target]
         came_from = {}
 
-        # g_score: node -> (distance_so_far, arrival_time)
-        g_score = defaultdict(lambda: [float('inf'), start_time])
-        g_score[start] = [0, start_time]
+        # g_dist / g_time: node -> distance_so_far / arrival_time
+        g_dist = {source: 0}
+        g_time = {source: start_time}
 
-        # f_score: node -> (estimated_total_cost, estimated_arrival_time)
-        f_score = defaultdict(lambda: [float('inf'), start_time])
-        h = self.calculate_hauristic(positions[start], positions[end])
-        f_score[start] = [h, start_time + timedelta(seconds=h / speed)]
+        # f_score: node -> estimated_total_cost; heap girdileri tembel olarak geçersiz kılınır
+        f_score = {source: self.calculate_hauristic(points[source], target_pos) if alt is None else alt(source)}
+        open_heap = [(f_score[source], source)]
+        open_set = {start}
 
-        while open_set:
+        while open_heap:
             # Select node with the lowest f_score (total estimated cost)
-            current = min(open_set, key=lambda node: f_score[node][0])
+            estimate, current = heappop(open_heap)
+            if node_ids[current] not in open_set or estimate != f_score[current]:
+                continue
 
-            if current == end:
+            # Eşit f_score değerlerinde open_set sırasını koru (önceki min() davranışı)
+            if open_heap and open_heap[0][0] == estimate:
+                ties = {node_ids[current]: current}
+                while open_heap and open_heap[0][0] == estimate:
+                    _, other = heappop(open_heap)
+                    if node_ids[other] in open_set and f_score[other] == estimate:
+                        ties[node_ids[other]] = other
+                if len(ties) > 1:
+                    current = ties.pop(next(node for node in open_set if node in ties))
+                    for other in ties.values():
+                        heappush(open_heap, (estimate, other))
+
+            if current == target:
                 path = []
-                total_cost = g_score[end]
                 while current in came_from:
-                    path.append(current)
+                    path.append(node_ids[current])
                     current = came_from[current]
                 path.append(start)
-                return path[::-1], total_cost
-
-            open_set.remove(current)
+                return path[::-1], [g_dist[target], g_time[target]]
 
-            for neighbor, distance in adj[current].items():
-                current_time = g_score[current][1]
-                travel_time = timedelta(seconds=distance / speed)
-                arrival_time = current_time + travel_time
+            open_set.remove(node_ids[current])
+            self.expansions += 1
 
+            current_dist = g_dist[current]
+            current_time = g_time[current]
+            current_pos = points[current]
+            for neighbor, distance in adj.neighbors(current):
+                self.edge_relaxations += 1
                 # Check for no-fly zone conflict at the moment of travel
                 penalty = self.deliverycase.is_edge_conflict_noflyzone(
-                    positions[current], positions[neighbor], current_time
+                    current_pos, points[neighbor], current_time
                 ) * self.noflyzone_penalty
-                total_distance = g_score[current][0] + distance + penalty
+                total_distance = current_dist + distance + penalty
 
                 # Only update if this path is better
-                if total_distance < g_score[neighbor][0]:
+                if total_distance < g_dist.get(neighbor, float('inf')):
                     came_from[neighbor] = current
-                    g_score[neighbor] = [total_distance, arrival_time]
-
-                    h = self.calculate_hauristic(positions[neighbor], positions[end])
-                    f_score[neighbor] = [total_distance + h, arrival_time + timedelta(seconds=h / speed)]
+                    g_dist[neighbor] = total_distance
+                    g_time[neighbor] = current_time + distance / speed
 
-                    open_set.add(neighbor)
+                    estimate = total_distance + (self.calculate_hauristic(points[neighbor], target_pos) if alt is None else alt(neighbor))
+                    f_score[neighbor] = estimate
+                    heappush(open_heap, (estimate, neighbor))
+                    open_set.add(node_ids[neighbor])
 
         return None, [float('inf'), start_time]
+
+    def has_static_penalties(self, start_time:float) -> bool:
+        # Kenar cezaları ancak aktif zone kümesi kalkıştan zaman ufkuna kadar her aralıkta aynıysa
+        # zamandan bağımsızdır; arada açılan ya da kapanan bir zone zamana bağlı aramayı gerektirir
+        return self.deliverycase.has_constant_noflyzones(start_time, self.get_time_horizon(self.deliverycase))
+
+    def find_path_bidirectional(self, adj:AdjacencyGraph, source:int, target:int, speed:float, start_time:float, alt=None):
+        # İki yönlü A* (ortalama potansiyelli). Yalnızca cezalar zamandan bağımsızken kullanılır;
+        # çakışma kontrolü kalkış anındaki aktif kümeyle yapılır.
+        points = adj.points
+        if alt is None:
+            to_target = lambda i: self.calculate_hauristic(points[i], points[target])
+        else:
+            to_target = alt
+        to_source = self.alt_heuristic(adj, source, start_time) if alt is not None else None
+        if to_source is None:
+            to_source = lambda i: self.calculate_hauristic(points[i], points[source])
+        potentials = {}
+
+        def potential(i):
+            if i not in potentials:
+                potentials[i] = (to_target(i) - to_source(i)) / 2
+            return potentials[i]
+
+        dist = ({source: 0}, {target: 0})
+        parents = ({}, {})
+        settled = (set(), set())
+        heaps = ([(potential(source), source)], [(-potential(target), target)])
+        best = float('inf')
+        meeting = None
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, current = heappop(heaps[side])
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+            self.expansions += 1
+
+            sign = 1 if side == 0 else -1
+            current_pos = points[current]
+            for neighbor, distance in adj.neighbors(current):
+                self.edge_relaxations += 1
+                penalty = self.deliverycase.is_edge_conflict_noflyzone(
+                    current_pos, points[neighbor], start_time
+                ) * self.noflyzone_penalty
+                total_distance = dist[side][current] + distance + penalty
+                if total_distance < dist[side].get(neighbor, float('inf')):
+                    dist[side][neighbor] = total_distance
+                    parents[side][neighbor] = current
+                    heappush(heaps[side], (total_distance + sign * potential(neighbor), neighbor))
+                if neighbor in dist[1 - side] and dist[side][neighbor] + dist[1 - side][neighbor] < best:
+                    best = dist[side][neighbor] + dist[1 - side][neighbor]
+                    meeting = neighbor
+
+        if meeting is None:
+            return None, [float('inf'), start_time]
+        path = [meeting]
+        while path[-1] in parents[0]:
+            path.append(parents[0][path[-1]])
+        path.reverse()
+        while path[-1] in parents[1]:
+            path.append(parents[1][path[-1]])
+
+        # Maliyet ve varış zamanı tek yönlü aramadaki sırayla toplanır
+        cost = 0
+        arrival = start_time
+        for u, v in zip(path, path[1:]):
+            distance = Drone.calculate_distance(points[u], points[v])
+            cost = cost + distance + self.deliverycase.is_edge_conflict_noflyzone(points[u], points[v], start_time) * self.noflyzone_penalty
+            arrival = arrival + distance / speed
+        return [adj.node_ids[i] for i in path], [cost, arrival]
     
-    def delivery_rotue(self, deliverycase:DeliveryCase,drone:Drone , package:DronePath, time:datetime):
+    def delivery_rotue(self, deliverycase:DeliveryCase,drone:Drone , package:DronePath, time:float):
         temp_time = time
-        drone_graph = self.build_drone_graph(self.build_graph(deliverycase), deliverycase.packages, drone)
-        drone_positions = self.extract_packages_positions(deliverycase)
-        drone_positions[-1] = drone.start_pos  # Add drone's starting position
+        drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
         deliver_path = self.find_path(
             start=-1,  # Assuming -1 is the drone's starting position
             end=package.id,
             graph=drone_graph,
-            positions=drone_positions,
+            positions=None,
             speed=drone.speed,
             start_time=temp_time
         )
@@ -144,103 +327,514 @@ class AStarSolver(Solver):
             start=package.id,
             end=-1,  # Assuming -1 is the drone's starting position
             graph=drone_graph,
-            positions=drone_positions,
+            positions=None,
             speed=drone.speed,
             start_time=temp_time  # Use arrival time from delivery path
         )
         temp_time = return_path[1][1]
         return deliver_path,return_path,temp_time
 
-    def select_best_drone(self, deliverycase:DeliveryCase, package,time):
-        # En iyi drone yolunu seçme
-        best_drone_id = None
-        best_cost = float('inf')
+    def build_search_tree(self, graph:AdjacencyGraph, source:int, speed:float, start_time:float, static_time:float=None) -> SearchTree:
+        # Kaynaktan tüm düğümlere Dijkstra araması. No-fly zone kontrolü her kenarın
+        # başlangıcına varış anında yapılır; static_time verilirse o andaki aktif kümeyle.
+        tree = SearchTree(source=source)
+        tree.dist[source] = 0
+        tree.times[source] = start_time
+        points = graph.points
+        queue = [(0, source)]
+        settled = set()
+
+        while queue:
+            distance_so_far, current = heappop(queue)
+            if current in settled:
+                continue
+            settled.add(current)
+            self.expansions += 1
+
+            current_time = tree.times[current]
+            check_time = current_time if static_time is None else static_time
+            current_pos = points[current]
+            for neighbor, distance in graph.neighbors(current):
+                self.edge_relaxations += 1
+                penalty = self.deliverycase.is_edge_conflict_noflyzone(
+                    current_pos, points[neighbor], check_time
+                ) * self.noflyzone_penalty
+                total_distance = distance_so_far + distance + penalty
+                if total_distance < tree.dist.get(neighbor, float('inf')):
+                    tree.dist[neighbor] = total_distance
+                    tree.times[neighbor] = current_time + distance / speed
+                    tree.came_from[neighbor] = current
+                    heappush(queue, (total_distance, neighbor))
+        return tree
+
+    def get_forward_tree(self, deliverycase:DeliveryCase, drone:Drone, time:float) -> SearchTree:
+        # Dağıtım anı değiştiğinde eski ağaçlar geçersiz olur
+        key = (drone.start_pos, drone.speed, time)
+        if key not in self.forward_trees:
+            if any(cached[2] != time for cached in self.forward_trees):
+                self.forward_trees.clear()
+            drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
+            self.forward_trees[key] = self.build_search_tree(drone_graph, drone_graph.index[-1], drone.speed, time)
+        return self.forward_trees[key]
+
+    def get_reverse_tree(self, deliverycase:DeliveryCase, drone:Drone, time:float) -> SearchTree:
+        # Aktif no-fly zone kümesi aynı kaldığı sürece geçerli dönüş ağacı
+        key = (drone.start_pos, deliverycase.get_active_noflyzone_key(time))
+        if key not in self.reverse_trees:
+            drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
+            self.reverse_trees[key] = self.build_search_tree(drone_graph, drone_graph.index[-1], drone.speed, time, static_time=time)
+        return self.reverse_trees[key]
+
+    def tree_route(self, deliverycase:DeliveryCase, drone:Drone, package, time:float):
+        # delivery_rotue ile aynı biçimde, önbellekteki arama ağaçlarından rota okuma
+        drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
+        target = drone_graph.index.get(package.id)
+        forward = self.get_forward_tree(deliverycase, drone, time)
+        if target is None or not forward.reaches(target):
+            return None, None, None
+        node_ids = drone_graph.node_ids
+        deliver_path = ([node_ids[i] for i in forward.path_to(target)], [forward.dist[target], forward.times[target]])
+
+        depart = forward.times[target]
+        reverse = self.get_reverse_tree(deliverycase, drone, depart)
+        if not reverse.reaches(target):
+            return deliver_path, (None, [float('inf'), depart]), depart
+        path = reverse.path_from(target)
+        arrival = depart
+        for u, v in zip(path, path[1:]):
+            arrival += Drone.calculate_distance(drone_graph.points[u], drone_graph.points[v]) / drone.speed
+
+        if deliverycase.get_noflyzone_epoch(depart) != deliverycase.get_noflyzone_epoch(arrival):
+            # Dönüş sırasında aktif küme değişiyor; zamana bağlı A* ile hesapla
+            return_path = self.find_path(package.id, -1, drone_graph, None, drone.speed, depart)
+            return deliver_path, return_path, return_path[1][1]
+        return deliver_path, ([node_ids[i] for i in path], [reverse.dist[target], arrival]), arrival
+
+    def find_leg(self, deliverycase:DeliveryCase, drone:Drone, start, end, time:float):
+        # İki durak arası tek bacak; start/end paket ya da None (drone üssü).
+        # (düğüm yolu, noktalar, maliyet, varış) ya da ulaşılamıyorsa None döndürür.
+        start_id = -1 if start is None else start.id
+        end_id = -1 if end is None else end.id
+        if self.routing == "visibility":
+            # No-fly zone'lar ceza yerine köşelerinden dolaşılır. Yol kalkış anındaki aktif kümeyle aranır;
+            # drone'un içinden geçtiği anda aktif olan (bacak sırasında açılan) zone'lar kümeye eklenip
+            # yol yeniden aranır. Küme yalnızca büyüdüğünden döngü sonlanır.
+            visibility = deliverycase.get_visibility_graph()
+            start_pos = drone.start_pos if start is None else start.pos
+            end_pos = drone.start_pos if end is None else end.pos
+            active = deliverycase.get_active_noflyzones(time)
+            expansions = visibility.expansions
+            while True:
+                route = visibility.shortest_path(start_pos, end_pos, active)
+                if route is None:
+                    break
+                crossed = deliverycase.get_crossed_noflyzones(route[1], time, drone.speed) - active
+                if not crossed:
+                    break
+                active = active | crossed
+            self.expansions += visibility.expansions - expansions
+            if route is None:
+                return None
+            corners, points, length = route
+            # Köşe düğümleri -2, -3, ... kimlikleriyle yola eklenir
+            return [start_id] + [-2 - corner for corner in corners] + [end_id], points, length, time + length / drone.speed
+
+        drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
+        path, (cost, arrival) = self.find_path(start_id, end_id, drone_graph, None, drone.speed, time)
+        if path is None:
+            return None
+        return path, [drone_graph.points[drone_graph.index[node]] for node in path], cost, arrival
+
+    def plan_route(self, deliverycase:DeliveryCase, drone:Drone, package, time:float) -> RoutePlan:
+        # Teslimat ve dönüş rotasını hesaplayıp işlenmeye hazır bir plan olarak döndürme
+        started = perf_counter()
+        self.route_evaluations += 1
+        if self.routing == "visibility":
+            deliver_leg = self.find_leg(deliverycase, drone, None, package, time)
+            return_leg = deliver_leg and self.find_leg(deliverycase, drone, package, None, deliver_leg[3])
+            if return_leg is None:
+                return None
+            return RoutePlan(
+                drone=drone,
+                package=package,
+                deliver_path=deliver_leg[0],
+                return_path=return_leg[0],
+                deliver_points=deliver_leg[1],
+                return_points=return_leg[1],
+                deliver_cost=deliver_leg[2],
+                return_cost=return_leg[2],
+                energy=(Drone.calculate_energy_consumption(deliver_leg[2], package.weight) +
+                        Drone.calculate_energy_consumption(return_leg[2], 0)),
+                delivery_time=deliver_leg[3],
+                arrival_time=return_leg[3],
+                evaluation_time=perf_counter() - started,
+                departure_time=time
+            )
+        if self.one_to_many:
+            deliver_path, return_path, temp_time = self.tree_route(deliverycase, drone, package, time)
+        else:
+            deliver_path, return_path, temp_time = self.delivery_rotue(deliverycase, drone, package, time)
+        if deliver_path is None or return_path[0] is None:
+            return None
+
+        drone_graph = self.build_drone_graph(deliverycase.get_package_graph(self.KNN), drone)
+        deliver_cost = deliver_path[1][0]
+        return_cost = return_path[1][0]
+        return RoutePlan(
+            drone=drone,
+            package=package,
+            deliver_path=deliver_path[0],
+            return_path=return_path[0],
+            deliver_points=[drone_graph.points[drone_graph.index[node]] for node in deliver_path[0]],
+            return_points=[drone_graph.points[drone_graph.index[node]] for node in return_path[0]],
+            deliver_cost=deliver_cost,
+            return_cost=return_cost,
+            energy=(Drone.calculate_energy_consumption(deliver_cost, package.weight) +
+                    Drone.calculate_energy_consumption(return_cost, 0)),
+            delivery_time=deliver_path[1][1],
+            arrival_time=temp_time,
+            evaluation_time=perf_counter() - started,
+            departure_time=time
+        )
 
-        for drone in deliverycase.drones:
+    def rank_candidate_drones(self, deliverycase:DeliveryCase, package, time):
+        # Drone'ları düz çizgi mesafesine dayalı alt sınıra göre sırala.
+        # Graf yolu düz çizgiden kısa olamaz ve ceza yalnızca ekler; bu yüzden sınırla
+        # batarya ya da zaman penceresini aşan drone için A* çalıştırmaya gerek yok.
+        slack = 1 - self.BOUND_TOLERANCE
+        candidates = []
+        for order, drone in enumerate(deliverycase.drones):
             if not drone.is_available(time) or drone.can_carry(package.weight) is False:
                 continue
-            deliver_path, return_path, temp_time = self.delivery_rotue(deliverycase, drone, package, time)
-            
-            deliver_energy_consumption = Drone.calculate_energy_consumption(deliver_path[1][0], package.weight)
-            return_energy_consumption = Drone.calculate_energy_consumption(return_path[1][0], 0)
-            
-            total_energy_consumption = deliver_energy_consumption + return_energy_consumption
-            total_cost = deliver_path[1][0] + return_path[1][0]
-            if total_cost < best_cost and package.is_within_time_window(temp_time) and total_energy_consumption < drone.battery:
-                best_drone_id = drone.id
-                best_cost = total_cost
-
-        print(f"Best Drone ID: {best_drone_id}")
-        return best_drone_id
+            distance = Drone.calculate_distance(drone.start_pos, package.pos) * slack
+            energy_bound = (Drone.calculate_energy_consumption(distance, package.weight) +
+                            Drone.calculate_energy_consumption(distance, 0))
+            if energy_bound >= drone.battery:
+                continue
+            if time + 2 * distance / drone.speed > package.time_window[1]:
+                continue
+            candidates.append((2 * distance, order, drone))
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+        return candidates
+
+    def select_best_plan(self, deliverycase:DeliveryCase, package, time) -> RoutePlan:
+        # En iyi drone rotasını seçme
+        best_plan = None
+        best_cost = float('inf')
+        best_order = 0
+
+        # Adaylar alt sınır sırasıyla, işçi sayısı kadarlık dalgalar halinde değerlendirilir. Dalga içindeki
+        # adaylar birbirinin maliyetiyle budanamadığından sıralı çözümden fazla rota değerlendirilir; bu fazlalığı
+        # azaltmak için ilk uygun plan bulunana kadar (en iyi maliyet sınırı yokken) adaylar tek tek denenir.
+        candidates = self.rank_candidate_drones(deliverycase, package, time)
+        workers = self.evaluator.workers if self.evaluator else 1
+        i = 0
+        while i < len(candidates) and candidates[i][0] <= best_cost:
+            wave = workers if best_plan is not None else 1
+            batch = []
+            for candidate in candidates[i:i + wave]:
+                if candidate[0] > best_cost:
+                    # Kalan drone'ların alt sınırı bile en iyi maliyeti geçemez
+                    break
+                batch.append(candidate)
+            i += len(batch)
+
+            if self.evaluator:
+                plans = self.evaluator.evaluate([drone for _, _, drone in batch], package, time)
+            else:
+                plans = [self.plan_route(deliverycase, drone, package, time) for _, _, drone in batch]
+
+            for (cost_bound, order, drone), plan in zip(batch, plans):
+                if plan is None:
+                    continue
+                # Eşit maliyette liste sırasında önce gelen drone seçilir
+                if (plan.total_cost, order) < (best_cost, best_order) and self.is_plan_feasible(plan):
+                    best_plan = plan
+                    best_cost = plan.total_cost
+                    best_order = order
+
+        logger.debug("Best Drone ID: %s", best_plan.drone.id if best_plan else None)
+        return best_plan
+
+    def is_plan_feasible(self, plan:RoutePlan) -> bool:
+        # Dönüş zaman penceresi içinde ve enerji bataryayı aşmıyor
+        return plan.package.is_within_time_window(plan.arrival_time) and plan.energy < plan.drone.battery
+
+    def candidate_bounds(self, packages, drones, time) -> np.ndarray:
+        # rank_candidate_drones sınırlarının paket x drone matrisi olarak vektörel hali
+        # (yük, batarya ya da zaman penceresi sınırını aşan eşler inf)
+        slack = 1 - self.BOUND_TOLERANCE
+        package_pos = np.array([package.pos for package in packages], dtype=float).reshape(-1, 2)
+        weights = np.array([package.weight for package in packages], dtype=float)
+        ends = np.array([package.time_window[1] for package in packages], dtype=float)
+        drone_pos = np.array([drone.start_pos for drone in drones], dtype=float).reshape(-1, 2)
+        max_weights = np.array([drone.max_weight for drone in drones], dtype=float)
+        batteries = np.array([drone.battery for drone in drones], dtype=float)
+        speeds = np.array([drone.speed for drone in drones], dtype=float)
+
+        delta = package_pos[:, None, :] - drone_pos[None, :, :]
+        distances = np.sqrt((delta ** 2).sum(axis=2)) * slack
+        energy_bound = (Drone.calculate_energy_consumption(distances, weights[:, None]) +
+                        Drone.calculate_energy_consumption(distances, 0))
+        feasible = ((weights[:, None] <= max_weights[None, :]) & (energy_bound < batteries[None, :]) &
+                    (time + 2 * distances / speeds[None, :] <= ends[:, None]))
+        return np.where(feasible, 2 * distances, np.inf)
+
+    def evaluate_pairs(self, deliverycase:DeliveryCase, drones, package, time, evaluated:dict) -> list:
+        # Aynı kalkış anında daha önce hesaplanan (paket, drone) planları yeniden kullanılır
+        missing = [drone for drone in drones if (package.id, drone.id) not in evaluated]
+        if missing:
+            if self.evaluator:
+                plans = self.evaluator.evaluate(missing, package, time)
+            else:
+                plans = [self.plan_route(deliverycase, drone, package, time) for drone in missing]
+            for drone, plan in zip(missing, plans):
+                evaluated[(package.id, drone.id)] = plan if plan is not None and self.is_plan_feasible(plan) else None
+        return [evaluated[(package.id, drone.id)] for drone in drones]
+
+    def assign_batch(self, deliverycase:DeliveryCase, packages, time, evaluated:dict) -> tuple:
+        # Paketler açgözlü döngüdeki öncelik sırasıyla, müsait drone sayısı kadar paketin uygun planı
+        # bulunana ya da hiçbir müsait drone'un teslim edemediği ilk pakete gelinene kadar değerlendirilir.
+        # Bu pencere için öncelik ağırlıklı en düşük maliyetli eşleme seçilir.
+        # (seçilen planlar paket sırasıyla, pencereyi kesen paket ya da None) döndürülür.
+        drones = [drone for drone in deliverycase.drones if drone.is_available(time)]
+        if not drones:
+            return [], packages[0]
+        bounds = self.candidate_bounds(packages, drones, time)
+
+        window = {}
+        blocked = None
+        for i, package in enumerate(packages):
+            columns = [j for j in np.argsort(bounds[i], kind="stable").tolist() if np.isfinite(bounds[i, j])]
+            # Önce sınırı en iyi BATCH_CANDIDATES drone; hiçbiri uygun değilse kalanlar sırayla denenir,
+            # böylece paket ancak tüm müsait drone'lar için uygunsuzsa pencereyi keser
+            k = self.BATCH_CANDIDATES or len(columns)
+            options = {}
+            for chunk in [columns[:k]] + [[j] for j in columns[k:]]:
+                plans = self.evaluate_pairs(deliverycase, [drones[j] for j in chunk], package, time, evaluated)
+                options = {j: plan for j, plan in zip(chunk, plans) if plan is not None}
+                if options:
+                    break
+            if not options:
+                blocked = package
+                break
+            window[i] = options
+            if len(window) == len(drones):
+                break
+        if not window:
+            return [], blocked
+
+        rows = list(window)
+        cost = np.full((len(rows), len(drones)), np.inf)
+        for r, i in enumerate(rows):
+            for j, plan in window[i].items():
+                cost[r, j] = plan.total_cost - self.PRIORITY_WEIGHT * packages[i].priority
+        # Uygun olmayan eşler, toplam maliyeti her zaman uygun eş sayısını en çoklayacak kadar pahalı
+        finite = cost[np.isfinite(cost)]
+        infeasible = (np.abs(finite).max() + 1) * (min(cost.shape) + 1)
+        matched, columns = min_cost_assignment(np.where(np.isfinite(cost), cost, infeasible))
+        plans = [window[rows[r]].get(j) for r, j in zip(matched.tolist(), columns.tolist())]
+        return [plan for plan in plans if plan is not None], blocked
+
+    def select_best_drone(self, deliverycase:DeliveryCase, package,time):
+        # En iyi drone'un ID'si (rota planı select_best_plan ile alınır)
+        plan = self.select_best_plan(deliverycase, package, time)
+        return plan.drone.id if plan else None
+
+    def extend_trip(self, deliverycase:DeliveryCase, plan:RoutePlan, candidates) -> TripPlan:
+        # Seçilen tek paketlik sefere, son duraktan KNN grafiği üzerinde A* bacaklarıyla
+        # yakındaki paketleri ekle. Durak ancak yük, enerji ve varış anındaki zaman penceresi
+        # uygunsa ve sefere eklemek drone'un o pakete ayrıca gidip dönmesinden kısaysa eklenir.
+        trip = TripPlan.from_route_plan(plan)
+        drone = plan.drone
+        while len(trip.packages) < self.MAX_STOPS:
+            last = trip.packages[-1]
+            depart = trip.stop_times[-1]
+            carried = sum(package.weight for package in trip.packages)
+            pool = [package for package in candidates
+                    if not package.delivered and package not in trip.packages and drone.can_carry(carried + package.weight)]
+            pool.sort(key=lambda package: Drone.calculate_distance(last.pos, package.pos))
+
+            best = None
+            for package in pool[:self.MULTI_DROP_CANDIDATES]:
+                leg = self.find_leg(deliverycase, drone, last, package, depart)
+                if leg is None or not package.is_within_time_window(leg[3]):
+                    continue
+                return_leg = self.find_leg(deliverycase, drone, package, None, leg[3])
+                if return_leg is None:
+                    continue
+                leg_cost, return_cost = leg[2], return_leg[2]
+                detour = leg_cost + return_cost - trip.leg_costs[-1]
+                if detour >= 2 * Drone.calculate_distance(drone.start_pos, package.pos):
+                    continue
+                costs = trip.leg_costs[:-1] + [leg_cost, return_cost]
+                loads = [load + package.weight for load in trip.loads()[:-1]] + [package.weight, 0]
+                energy = sum(Drone.calculate_energy_consumption(cost, load) for cost, load in zip(costs, loads))
+                if energy >= drone.battery:
+                    continue
+                if best is None or detour < best[0]:
+                    best = (detour, package, leg, return_leg, energy)
+            if best is None:
+                break
+
+            _, package, leg, return_leg, energy = best
+            trip.packages.append(package)
+            trip.legs[-1:] = [leg[0], return_leg[0]]
+            trip.leg_points[-1:] = [leg[1], return_leg[1]]
+            trip.leg_costs[-1:] = [leg[2], return_leg[2]]
+            trip.stop_times.append(leg[3])
+            trip.energy = energy
+            trip.arrival_time = return_leg[3]
+        return trip
+
+    def commit_plan(self, solution:Solution, plan):
+        # Seçilen rota ya da sefer planını çözüme işleme
+        solution.add_plan(plan)
+        for package in plan.packages:
+            package.set_delivered()
+        plan.drone.set_busy(plan.arrival_time)
+
+    def case_counters(self, deliverycase:DeliveryCase) -> dict:
+        # Vakada tutulan grafik ve no-fly zone sayaçları (çözüm başı/sonu farkı alınır)
+        return {
+            "graph_builds": sum(1 + len(graph.drone_adjacencies) for graph in deliverycase.package_graphs.values()),
+            "nfz_checks": deliverycase.noflyzone_checks,
+            "cache_hits": deliverycase.conflict_cache.hits,
+            "cache_misses": deliverycase.conflict_cache.misses,
+        }
+
+    def counters(self, deliverycase:DeliveryCase, case_start:dict, worker_counters:dict) -> dict:
+        counters = {
+            "expansions": self.expansions,
+            "edge_relaxations": self.edge_relaxations,
+            "route_evaluations": self.route_evaluations,
+        }
+        for name, value in self.case_counters(deliverycase).items():
+            counters[name] = value - case_start[name] + worker_counters.get(name, 0)
+        return counters
 
     def solve(self, deliverycase:DeliveryCase, **kwargs) -> Solution:
-        print("A* algorithm with multi-drone assignment and time windows starting...")
+        logger.debug("A* algorithm with multi-drone assignment and time windows starting...")
         
         self.deliverycase = deliverycase
-        solution = Solution()
+        self.expansions = 0
+        self.edge_relaxations = 0
+        self.route_evaluations = 0
+        self.metrics.reset()
+        self.time_horizon = None
+        case_start = self.case_counters(deliverycase)
+        worker_counters = {}
+        self.forward_trees.clear()
+        self.reverse_trees.clear()
+        # sink verilirse seferler karar anında ona aktarılır (varsayılan: bellekte tutulur)
+        solution = Solution(kwargs.get("sink"))
         solution.solverName = "A* Solver"
         solution.Case = deliverycase
-        solution.dronePaths = defaultdict(list)
 
-        print(f"Start time: {deliverycase.casetime}")
-        
-        while deliverycase.get_next_available_package(deliverycase.casetime) is not None:
-            available_packages = deliverycase.get_avabile_packages(deliverycase.casetime)
-            available_packages = deliverycase.sort_packages_by_priority(available_packages)
+        logger.debug("Start time: %s", deliverycase.to_datetime(deliverycase.casetime))
+
+        self.metrics.start_profile()
+        try:
+            with self.metrics.phase("solve"):
+                self.build_graph(deliverycase)
+                if self.workers > 1:
+                    self.evaluator = ParallelEvaluator(self.worker_factory(), deliverycase, self.workers, self.parallel_mode)
+                if self.batch_assignment:
+                    self.run_batch_dispatch(deliverycase, solution)
+                else:
+                    self.run_dispatch(deliverycase, solution)
+        finally:
+            if self.evaluator:
+                self.evaluator.close()
+                # Rotalar işçilerde hesaplandığından arama ve vaka sayaçları oradan toplanır
+                worker_counters = self.evaluator.counters
+                self.expansions += worker_counters["expansions"]
+                self.edge_relaxations += worker_counters["edge_relaxations"]
+                self.route_evaluations += worker_counters["route_evaluations"]
+                self.evaluator = None
+            self.metrics.stop_profile()
+            solution.close()
+
+        solution.metrics = self.metrics.snapshot(self.counters(deliverycase, case_start, worker_counters))
+        return solution
+
+    def run_dispatch(self, deliverycase:DeliveryCase, solution:Solution):
+        # Paket pencereleri ve drone müsaitlikleri olay kuyruklarında tutulur
+        dispatch = DispatchIndex(deliverycase)
+        while True:
+            dispatch.advance(deliverycase.casetime)
+            next_package = dispatch.next_available_package(deliverycase.casetime)
+            if next_package is None:
+                break
+            available_packages = dispatch.available_packages()
             if not available_packages:
-                print("No available packages at the moment.")
-                print(f"time {deliverycase.casetime}")
-                deliverycase.casetime = deliverycase.get_next_available_package(deliverycase.casetime).get_start_time()
-                print(f"to time {deliverycase.casetime}")
+                logger.debug("No available packages at the moment.")
+                previous_time = deliverycase.casetime
+                deliverycase.casetime = next_package.get_start_time()
+                logger.debug("time %s to time %s", deliverycase.to_datetime(previous_time), deliverycase.to_datetime(deliverycase.casetime))
                 continue
             for package in available_packages:
-                drone_id = self.select_best_drone(deliverycase, package, deliverycase.casetime)
-                if drone_id is None:
-                    print(f"No available drone for Package ID: {package.id}")
-                    print(f"time {deliverycase.casetime}")
-                    next_drones = deliverycase.next_available_drones()
-                    temp = deliverycase.casetime
-                    for drone in next_drones:
-                        if drone.atBusyDatetime > deliverycase.casetime:
-                            deliverycase.casetime = drone.atBusyDatetime
-                            break
-                    if temp == deliverycase.casetime:
+                if package.delivered:
+                    # Önceki bir sefere durak olarak eklendi
+                    continue
+                with self.metrics.phase("select_best"):
+                    plan = self.select_best_plan(deliverycase, package, deliverycase.casetime)
+                if plan is None:
+                    logger.debug("No available drone for Package ID: %s", package.id)
+                    previous_time = deliverycase.casetime
+                    next_free_time = dispatch.next_drone_free_time(deliverycase.casetime)
+                    if next_free_time is not None:
+                        deliverycase.casetime = next_free_time
+                    else:
                         package.set_cannot_deliver()
-                        print(f"Package ID: {package.id} cannot be delivered at this time.")
-                    print(f"to time {deliverycase.casetime}")
+                        logger.debug("Package ID: %s cannot be delivered at this time.", package.id)
+                    logger.debug("time %s to time %s", deliverycase.to_datetime(previous_time), deliverycase.to_datetime(deliverycase.casetime))
                     break
-                drone = deliverycase.get_drone_by_id(drone_id)
-                print(f"Selected Drone ID: {drone_id} for Package ID: {package.id}")
-                deliver_path, return_path, time = self.delivery_rotue(deliverycase, drone, package, deliverycase.casetime)
-                if deliver_path  or return_path:
-                    drone_positions = self.extract_packages_positions(deliverycase)
-                    drone_positions[-1] = drone.start_pos  # Add drone's starting position
-                    solution.dronePaths[drone_id].append(
-                        DronePath(
-                            node_path=deliver_path[0],
-                            node_positions=drone_positions,
-                            isReturn=False,
-                            cost=deliver_path[1][0]
-                        )
-                    )
-                    solution.dronePaths[drone_id].append(
-                        DronePath(
-                            node_path=return_path[0],
-                            node_positions=drone_positions,
-                            isReturn=True,
-                            cost=return_path[1][0]
-                        )
-                    )
-                    deliver_energy_consumption = Drone.calculate_energy_consumption(deliver_path[1][0], package.weight)
-                    return_energy_consumption = Drone.calculate_energy_consumption(return_path[1][0], 0)
-
-                    total_energy_consumption = deliver_energy_consumption + return_energy_consumption
-
-                    total_cost = deliver_path[1][0] + return_path[1][0]
-                    solution.totalDistance += total_cost
-                    solution.totalConsumption += total_energy_consumption
-                    package.set_delivered()
-                    drone.set_busy(time)
-
+                logger.debug("Selected Drone ID: %s for Package ID: %s", plan.drone.id, package.id)
+                if self.multi_drop:
+                    with self.metrics.phase("extend_trip"):
+                        plan = self.extend_trip(deliverycase, plan, available_packages)
+                with self.metrics.phase("commit"):
+                    self.commit_plan(solution, plan)
+                    dispatch.set_drone_busy(plan.drone)
+
+    def run_batch_dispatch(self, deliverycase:DeliveryCase, solution:Solution):
+        # run_dispatch ile aynı olay döngüsü; her anda paketler tek tek değil toplu eşlenir
+        dispatch = DispatchIndex(deliverycase)
+        evaluated, evaluated_time = {}, None
+        while True:
+            dispatch.advance(deliverycase.casetime)
+            next_package = dispatch.next_available_package(deliverycase.casetime)
+            if next_package is None:
+                break
+            available_packages = dispatch.available_packages()
+            if not available_packages:
+                deliverycase.casetime = next_package.get_start_time()
+                continue
+            if deliverycase.casetime != evaluated_time:
+                # Planlar kalkış anına bağlıdır; aynı andaki turlar önceki değerlendirmeleri kullanır
+                evaluated, evaluated_time = {}, deliverycase.casetime
+
+            with self.metrics.phase("assign_batch"):
+                plans, blocked = self.assign_batch(deliverycase, available_packages, deliverycase.casetime, evaluated)
+            logger.debug("Assigned %d of %d packages at %s", len(plans), len(available_packages), deliverycase.to_datetime(deliverycase.casetime))
+            with self.metrics.phase("commit"):
+                assigned = {plan.package.id for plan in plans}
+                for plan in plans:
+                    if self.multi_drop:
+                        # Bu turda başka drone'a eşlenen paketler durak olarak eklenmez
+                        candidates = [package for package in available_packages if package.id not in assigned]
+                        plan = self.extend_trip(deliverycase, plan, candidates)
+                    self.commit_plan(solution, plan)
+                    dispatch.set_drone_busy(plan.drone)
+            if blocked is None:
+                # Pencere müsait drone'ları doldurdu; kalan drone'lar aynı anda sonraki paketlere eşlenir
+                continue
 
-        return solution
+            next_free_time = dispatch.next_drone_free_time(deliverycase.casetime)
+            if next_free_time is not None:
+                deliverycase.casetime = next_free_time
+            else:
+                # Tüm drone'lar boşta ve hepsi değerlendirildiği halde plan bulunamayan paket teslim edilemez
+                blocked.set_cannot_deliver()
+                logger.debug("Package ID: %s cannot be delivered at this time.", blocked.id)
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Iterator, Tuple
+
+from astarsolver import AStarSolver
+from casestore import load_case_data, read_meta
+from deliverycase import DeliveryCase
+
+# main.py'deki sabit veri setleriyle aynı anahtarlar (küçük harfli kısa adlar da kabul edilir)
+CASE_KEYS = {
+    "drones": ("DRONES_DATA", "drones"),
+    "packages": ("DELIVERIES_DATA", "packages", "deliveries"),
+    "noflyzones": ("NO_FLY_ZONES_DATA", "noflyzones", "no_fly_zones"),
+}
+
+
+def read_field(record: dict, name: str) -> list:
+    for key in CASE_KEYS[name]:
+        if key in record:
+            return record[key]
+    if name == "noflyzones":
+        return []
+    raise KeyError(f"Case has no {CASE_KEYS[name][0]} field")
+
+
+def iter_cases(paths, on_error: Callable[[str, Exception], None] = None) -> Iterator[Tuple[str, dict]]:
+    ## JSON (tek vaka ya da vaka listesi), JSONL (satır başına vaka) dosyalarını ve casestore dizinlerini oku.
+    ## on_error verilirse okunamayan dosya ya da satır (kimliği, hatası) ile bildirilip atlanır; yoksa hata yükselir.
+    def failed(case_id: str, error: Exception):
+        if on_error is None:
+            raise error
+        on_error(case_id, error)
+
+    for path in paths:
+        name = os.path.basename(os.path.normpath(path))
+        if os.path.isdir(path):
+            try:
+                drones, packages, noflyzones = load_case_data(path)
+                record = {"drones": drones, "packages": packages, "noflyzones": noflyzones, "casetime": read_meta(path)["casetime"]}
+            except (OSError, ValueError, KeyError) as e:
+                failed(name, e)
+                continue
+            yield name, record
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                if path.endswith(".jsonl"):
+                    for i, line in enumerate(f):
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                            if not isinstance(record, dict):
+                                raise ValueError("Case must be a JSON object")
+                        except ValueError as e:
+                            failed(f"{name}:{i}", e)
+                            continue
+                        yield str(record.get("id", record.get("name", f"{name}:{i}"))), record
+                    continue
+                data = json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            failed(name, e)
+            continue
+        records = data if isinstance(data, list) else [data]
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                failed(f"{name}:{i}", ValueError("Case must be a JSON object"))
+                continue
+            yield str(record.get("id", record.get("name", f"{name}:{i}"))), record
+
+
+def build_case(record: dict) -> DeliveryCase:
+    casetime = record.get("casetime")
+    return DeliveryCase(
+        casetime=datetime.fromisoformat(casetime) if casetime else datetime.now(),
+        drones=read_field(record, "drones"),
+        packages=read_field(record, "packages"),
+        noflyzones=read_field(record, "noflyzones"),
+    )
+
+
+def solve_case(case_id: str, record: dict, solver_options: dict) -> dict[str, Any]:
+    ## Tek vakayı çöz ve sonuç kaydını döndür (işçi süreçte çalışır)
+    started = time.perf_counter()
+    try:
+        deliverycase = build_case(record)
+        loaded = time.perf_counter()
+        solver = AStarSolver(**solver_options)
+        solution = solver.solve(deliverycase)
+        delivery_percent = deliverycase.get_successful_delivery_percent()
+        solved = time.perf_counter()
+    except Exception as e:
+        return {"case": case_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "case": case_id,
+        "status": "ok",
+        "drones": len(deliverycase.drones),
+        "packages": len(deliverycase.packages),
+        "noflyzones": len(deliverycase.noflyzones),
+        "delivered": sum(1 for package in deliverycase.packages if package.delivered),
+        "delivery_percent": delivery_percent,
+        "total_distance": solution.totalDistance,
+        "total_consumption": solution.totalConsumption,
+        "trips": {str(drone_id): summary.trips for drone_id, summary in solution.drone_summaries.items()},
+        "route_evaluations": solver.route_evaluations,
+        "expansions": solver.expansions,
+        "counters": solution.metrics["counters"],
+        "timings": {"load": loaded - started, "solve": solved - loaded},
+    }
+
+
+def run_batch(paths, workers: int = None, solver_options: dict = None, output=sys.stdout) -> int:
+    ## Vakaları süreç havuzunda çöz, her sonucu biter bitmez JSONL olarak yaz
+    solver_options = solver_options or {}
+    failures = 0
+
+    def write(result: dict):
+        nonlocal failures
+        failures += result["status"] != "ok"
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    def read_error(case_id: str, error: Exception):
+        # Okunamayan dosya ya da satır, çözüm hatalarıyla aynı biçimde raporlanır; toplu iş sürer
+        write({"case": case_id, "status": "error", "error": f"{type(error).__name__}: {error}"})
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_case, case_id, record, solver_options)
+                   for case_id, record in iter_cases(paths, read_error)]
+        for future in as_completed(futures):
+            write(future.result())
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drone teslimat vakalarını toplu ve grafiksiz çöz")
+    parser.add_argument("cases", nargs="+", help="JSON ya da JSONL vaka dosyaları ya da casestore dizinleri")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="İşçi süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("-o", "--output", help="Sonuç JSONL dosyası (varsayılan: stdout)")
+    parser.add_argument("--one-to-many", action="store_true", help="Üs başına tek arama ağacı modunu kullan")
+    parser.add_argument("--batch-assignment", action="store_true", help="Her dağıtım anında toplu paket-drone eşlemesi kullan")
+    parser.add_argument("--multi-drop", action="store_true", help="Bir sefere birden çok paket ekle")
+    parser.add_argument("--routing", choices=AStarSolver.ROUTING_MODES, default="knn", help="Rota ağı")
+    parser.add_argument("--heuristic", choices=AStarSolver.HEURISTICS, default="euclidean", help="A* sezgiseli")
+    parser.add_argument("--bidirectional", action="store_true", help="Cezalar değişmiyorsa iki yönlü A* kullan")
+    args = parser.parse_args(argv)
+
+    solver_options = {"one_to_many": args.one_to_many, "batch_assignment": args.batch_assignment, "multi_drop": args.multi_drop,
+                      "routing": args.routing, "heuristic": args.heuristic, "bidirectional": args.bidirectional}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            failures = run_batch(args.cases, args.workers, solver_options, output)
+    else:
+        failures = run_batch(args.cases, args.workers, solver_options)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
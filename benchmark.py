@@ -0,0 +1,209 @@
+import argparse
+import gc
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from astarsolver import AStarSolver
+from deliverycase import DeliveryCase
+from randomcase import RandomCaseGenerator
+from sharding import ShardedSolver
+
+CASETIME = datetime(2025, 1, 1, 8, 0)
+
+# (drone, paket, no-fly zone, tüm gün aktif no-fly zone)
+SCENARIOS = {
+    "quick": [
+        (5, 20, 2, False), (5, 20, 2, True),
+        (10, 100, 5, False), (10, 100, 5, True),
+        (20, 300, 10, False),
+    ],
+    "full": [
+        (5, 20, 2, False), (5, 20, 2, True),
+        (10, 100, 5, False), (10, 100, 5, True),
+        (20, 500, 10, False), (20, 500, 10, True),
+        (50, 2000, 25, False), (50, 2000, 25, True),
+        (50, 5000, 50, False), (50, 5000, 50, True),
+    ],
+    # ShardedSolver'ın bölge sayısıyla ölçeklenmesi (benchmark_sharding)
+    "sharding": [
+        (16, 400, 8, False),
+    ],
+}
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def scenario_name(num_drones, num_packages, num_nfz, full_time_nfz) -> str:
+    return f"{num_drones}x{num_packages}x{num_nfz}{'-fullnfz' if full_time_nfz else ''}"
+
+
+def make_case(num_drones, num_packages, num_nfz, full_time_nfz, seed) -> DeliveryCase:
+    drones, packages, noflyzones = RandomCaseGenerator(seed).get_random_data(
+        num_drones, num_packages, num_nfz, full_time_nfz=full_time_nfz
+    )
+    return DeliveryCase(casetime=CASETIME, drones=drones, packages=packages, noflyzones=noflyzones)
+
+
+def timed(function, repeat: int, setup=None) -> float:
+    # En iyi (en kısa) süre; tekrarlar arasındaki gürültüyü azaltır.
+    # setup verilirse her tekrarda süre dışında çağrılır ve sonucu function'a aktarılır.
+    best = float("inf")
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibration_workload():
+    # Çözücünün sıcak yollarına benzeyen saf Python işi: sözlük, sıralama ve öncelik kuyruğu
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(20000)]
+    index = {i: value for i, value in enumerate(values)}
+    queue = []
+    for i in sorted(index, key=index.get):
+        heapq.heappush(queue, (index[i], i))
+    while queue:
+        heapq.heappop(queue)
+
+
+def calibrate(repeat: int = 10) -> float:
+    ## Makine hız ölçütü (s); ölçümler bu süreye bölünerek farklı makineler arasında karşılaştırılır.
+    ## Çöp toplayıcı kapalıyken ölçülür; aksi halde toplama anları süreyi %20'ye kadar oynatıyor.
+    gc.disable()
+    try:
+        return timed(calibration_workload, repeat)
+    finally:
+        gc.enable()
+
+
+def benchmark_scenario(num_drones, num_packages, num_nfz, full_time_nfz, seed=42, repeat=3, samples=20) -> dict:
+    ## Bir senaryo için build_graph, find_path, select_best_drone ve solve sürelerini ölç
+    results = {}
+    sample_random = random.Random(seed)
+    # Grafik ve arama ağaçları vakada önbelleklendiğinden her tekrar, süre dışında kurulan yeni bir vaka kullanır
+    fresh_case = lambda: make_case(num_drones, num_packages, num_nfz, full_time_nfz, seed)
+
+    results["build_graph"] = timed(AStarSolver().build_graph, repeat, fresh_case)
+
+    case = fresh_case()
+    solver = AStarSolver()
+    solver.deliverycase = case
+    package_graph = case.get_package_graph(solver.KNN)
+    drones = [sample_random.choice(case.drones) for _ in range(samples)]
+    packages = [sample_random.choice(case.packages) for _ in range(samples)]
+    for drone in drones:
+        package_graph.get_drone_adjacency(drone.start_pos)
+
+    def find_path():
+        for drone, package in zip(drones, packages):
+            solver.find_path(-1, package.id, solver.build_drone_graph(package_graph, drone), None, drone.speed, package.time_window[0])
+    results["find_path"] = timed(find_path, repeat) / samples
+
+    def select_best_drone():
+        for package in packages:
+            solver.select_best_drone(case, package, package.time_window[0])
+    results["select_best_drone"] = timed(select_best_drone, repeat) / samples
+
+    results["solve"] = timed(lambda case: AStarSolver().solve(case), repeat, fresh_case)
+    return results
+
+
+def normalise(results: dict, calibration: float) -> dict:
+    # Saniyeleri kalibrasyon süresi biriminde göreli değerlere çevir
+    return {name: {metric: seconds / calibration for metric, seconds in timings.items()} for name, timings in results.items()}
+
+
+def benchmark_sharding(num_drones, num_packages, num_nfz, full_time_nfz, seed=42, repeat=3, shards=SHARD_COUNTS) -> dict:
+    ## Tek süreçli AStarSolver ve her bölge sayısı için ShardedSolver solve süreleri (solve, solve_<bölge>)
+    fresh_case = lambda: make_case(num_drones, num_packages, num_nfz, full_time_nfz, seed)
+    results = {"solve": timed(lambda case: AStarSolver().solve(case), repeat, fresh_case)}
+    for count in shards:
+        results[f"solve_{count}"] = timed(ShardedSolver(regions=count).solve, repeat, fresh_case)
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float, min_delta: float = 0.0) -> list:
+    ## Temel ölçümden threshold oranından ve en az min_delta saniye fazla yavaşlayan ölçümleri döndür
+    regressions = []
+    for name, timings in results.items():
+        for metric, seconds in timings.items():
+            reference = baseline.get(name, {}).get(metric)
+            if reference is not None and seconds > reference * (1 + threshold) and seconds - reference > min_delta:
+                regressions.append((name, metric, reference, seconds))
+    return regressions
+
+
+def save_baseline(path: str, seed: int, calibration: float, results: dict):
+    ## Göreli sonuçları temel ölçüm dosyasına yaz; aynı tohumla kaydedilmiş diğer senaryolar korunur,
+    ## böylece quick ve full kümeleri aynı dosyada tutulur
+    saved = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("seed") == seed and previous.get("unit") == "calibration":
+            saved = previous["results"]
+    saved.update(normalise(results, calibration))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "unit": "calibration", "calibration": calibration, "results": saved}, f, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tohumlanmış senaryolarla çözücü performans ölçümü")
+    parser.add_argument("--suite", choices=sorted(SCENARIOS), default="quick", help="Senaryo kümesi")
+    parser.add_argument("--only", nargs="*", help="Yalnızca bu adlı senaryolar (örn. 10x100x5-fullnfz)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--shards", type=int, nargs="+", default=list(SHARD_COUNTS), help="sharding kümesinde denenecek bölge sayıları")
+    parser.add_argument("--save", help="Sonuçları temel ölçüm olarak bu JSON dosyasına yaz")
+    parser.add_argument("--baseline", help="Karşılaştırılacak temel ölçüm JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=0.5, help="İzin verilen yavaşlama oranı (0.5 = %%50)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Bundan küçük mutlak yavaşlamalar (s) gerileme sayılmaz; milisaniye altı ölçümler gürültülüdür")
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    results = {}
+    for scenario in SCENARIOS[args.suite]:
+        name = scenario_name(*scenario)
+        if args.suite == "sharding":
+            # Aynı boyutlu tek süreçli senaryolarla temel ölçüm dosyasında çakışmasın
+            name += "-sharded"
+        if args.only and name not in args.only:
+            continue
+        if args.suite == "sharding":
+            results[name] = benchmark_sharding(*scenario, seed=args.seed, repeat=args.repeat, shards=args.shards)
+        else:
+            results[name] = benchmark_scenario(*scenario, seed=args.seed, repeat=args.repeat)
+        print(name, " ".join(f"{metric}={seconds:.4f}s" for metric, seconds in results[name].items()), flush=True)
+    # Kalibrasyon ölçümlerin önünde ve arkasında alınır; en kısası makinenin o anki hızını temsil eder
+    calibration = min(calibration, calibrate())
+    print(f"calibration={calibration:.4f}s", flush=True)
+
+    if args.save:
+        save_baseline(args.save, args.seed, calibration, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("seed") != args.seed:
+            print(f"Baseline seed {baseline.get('seed')} differs from {args.seed}; results are not comparable")
+            return 2
+        # Göreli temel ölçüm bu makinenin kalibrasyonuyla saniyeye çevrilir; eski (saniye) dosyalar olduğu gibi kullanılır
+        scale = calibration if baseline.get("unit") == "calibration" else 1.0
+        reference = {name: {metric: value * scale for metric, value in timings.items()} for name, timings in baseline["results"].items()}
+        regressions = compare_to_baseline(results, reference, args.threshold, args.min_delta)
+        for name, metric, reference, seconds in regressions:
+            print(f"REGRESSION {name} {metric}: {reference:.4f}s -> {seconds:.4f}s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+from datetime import datetime
+from typing import Any, Tuple
+import numpy as np
+
+from columnarcase import ColumnarDeliveryCase, DroneTable, PackageTable
+
+
+class BulkCaseGenerator:
+    ## RandomCaseGenerator ile aynı değer aralıklarında, NumPy ile toplu ve tohumlanmış vaka üretimi
+    DISTRIBUTIONS = ("uniform", "clustered", "depot")  # Paket konum dağılımları
+    ARRIVALS = ("uniform", "poisson", "peaks")  # Zaman penceresi başlangıç desenleri
+    MAX_NFZ_ATTEMPTS = 100  # Çakışmayan no-fly zone yerleşimi için deneme turu
+
+    def __init__(self, seed=None, area: int = 100, horizon: int = 60, max_window: int = 60):
+        self.rng = np.random.default_rng(seed)
+        self.area = area  # Konumlar [0, area] aralığında tam sayı
+        self.horizon = horizon  # Pencere başlangıçları [0, horizon] dakika
+        self.max_window = max_window  # Pencere uzunluğu [1, max_window] dakika
+
+    def drone_arrays(self, num_drones: int, depots: int = None) -> dict:
+        ## Drone sütunları; depots verilirse drone'lar o kadar ortak üsse dağıtılır
+        rng = self.rng
+        if depots:
+            sites = rng.integers(0, self.area, size=(depots, 2), endpoint=True)
+            start_pos = sites[rng.integers(0, depots, size=num_drones)]
+        else:
+            start_pos = rng.integers(0, self.area, size=(num_drones, 2), endpoint=True)
+        return {
+            "id": np.arange(1, num_drones + 1, dtype=np.int64),
+            "max_weight": np.round(rng.uniform(2.0, 6.0, num_drones), 1),
+            "battery": rng.integers(8000, 20000, size=num_drones, endpoint=True),
+            "speed": np.round(rng.uniform(5.0, 12.0, num_drones), 1),
+            "start_pos": start_pos,
+        }
+
+    def package_positions(self, num_packages: int, distribution: str, clusters: int, depot_pos: np.ndarray) -> np.ndarray:
+        rng = self.rng
+        if distribution == "uniform":
+            return rng.integers(0, self.area, size=(num_packages, 2), endpoint=True)
+        if distribution == "clustered":
+            # Yoğunluk noktaları etrafında normal dağılım
+            centers = rng.uniform(0, self.area, size=(clusters, 2))
+            spread = rng.uniform(0.02, 0.08, size=clusters) * self.area
+            cluster = rng.integers(0, clusters, size=num_packages)
+            positions = centers[cluster] + rng.standard_normal((num_packages, 2)) * spread[cluster, None]
+        elif distribution == "depot":
+            # Üslerden uzaklaştıkça seyrelen (üstel yarıçaplı) dağılım
+            if depot_pos is None or len(depot_pos) == 0:
+                depot_pos = np.full((1, 2), self.area / 2)
+            origin = depot_pos[rng.integers(0, len(depot_pos), size=num_packages)]
+            radius = rng.exponential(0.15 * self.area, size=num_packages)
+            angle = rng.uniform(0, 2 * np.pi, size=num_packages)
+            positions = origin + np.stack([np.cos(angle), np.sin(angle)], axis=1) * radius[:, None]
+        else:
+            raise ValueError(f"Unknown package distribution: {distribution}")
+        return np.clip(np.rint(positions), 0, self.area).astype(np.int64)
+
+    def window_starts(self, num_packages: int, arrival: str, peaks: int) -> np.ndarray:
+        rng = self.rng
+        if arrival == "uniform":
+            return rng.integers(0, self.horizon, size=num_packages, endpoint=True)
+        if arrival == "poisson":
+            # Sabit hızlı geliş süreci: üstel aralıkların kümülatif toplamı ufka ölçeklenir
+            gaps = rng.exponential(1.0, size=num_packages + 1)
+            arrivals = np.cumsum(gaps)
+            starts = arrivals[:-1] / arrivals[-1] * self.horizon
+        elif arrival == "peaks":
+            # Gün içindeki yoğun saatler etrafında toplanan siparişler
+            centers = rng.uniform(0, self.horizon, size=peaks)
+            starts = centers[rng.integers(0, peaks, size=num_packages)] + rng.standard_normal(num_packages) * self.horizon * 0.05
+        else:
+            raise ValueError(f"Unknown arrival pattern: {arrival}")
+        return np.clip(np.rint(starts), 0, self.horizon).astype(np.int64)
+
+    def package_arrays(self, num_packages: int, distribution: str = "uniform", arrival: str = "uniform",
+                       clusters: int = 8, peaks: int = 3, depot_pos: np.ndarray = None) -> dict:
+        ## Paket sütunları (zaman pencereleri dakika cinsinden)
+        rng = self.rng
+        positions = self.package_positions(num_packages, distribution, clusters, depot_pos)
+        starts = self.window_starts(num_packages, arrival, peaks)
+        ends = starts + rng.integers(1, self.max_window, size=num_packages, endpoint=True)
+        return {
+            "id": np.arange(1, num_packages + 1, dtype=np.int64),
+            "pos": positions,
+            "weight": np.round(rng.uniform(0.5, 4.5, num_packages), 1),
+            "priority": rng.integers(1, 5, size=num_packages, endpoint=True),
+            "time_window": np.stack([starts, ends], axis=1),
+        }
+
+    def noflyzone_rectangles(self, num_nfz: int, avoid: np.ndarray = None) -> np.ndarray:
+        ## Birbiriyle örtüşmeyen (x1, y1, x2, y2) dikdörtgenleri; avoid noktalarını içermez
+        rng = self.rng
+        placed = np.empty((0, 4), dtype=np.int64)
+        avoid = np.empty((0, 2)) if avoid is None else np.asarray(avoid, dtype=float).reshape(-1, 2)
+        limit = max(self.area - 20, 0)
+        for _ in range(self.MAX_NFZ_ATTEMPTS):
+            if len(placed) >= num_nfz:
+                break
+            batch = max(4 * (num_nfz - len(placed)), 16)
+            x1 = rng.integers(0, limit, size=batch, endpoint=True)
+            y1 = rng.integers(0, limit, size=batch, endpoint=True)
+            candidates = np.stack([x1, y1, x1 + rng.integers(10, 20, size=batch, endpoint=True),
+                                   y1 + rng.integers(10, 20, size=batch, endpoint=True)], axis=1)
+            if len(avoid):
+                covers = ((avoid[None, :, 0] >= candidates[:, None, 0]) & (avoid[None, :, 0] <= candidates[:, None, 2]) &
+                          (avoid[None, :, 1] >= candidates[:, None, 1]) & (avoid[None, :, 1] <= candidates[:, None, 3]))
+                candidates = candidates[~covers.any(axis=1)]
+            # Adaylar sırayla kabul edilir; kenarları değen dikdörtgenler de örtüşmüş sayılır
+            for rect in candidates:
+                if len(placed) >= num_nfz:
+                    break
+                if len(placed) and ((rect[0] <= placed[:, 2]) & (placed[:, 0] <= rect[2]) &
+                                    (rect[1] <= placed[:, 3]) & (placed[:, 1] <= rect[3])).any():
+                    continue
+                placed = np.vstack([placed, rect])
+        if len(placed) < num_nfz:
+            raise ValueError(f"Could not place {num_nfz} non-overlapping no-fly zones in a {self.area}x{self.area} area")
+        return placed
+
+    def noflyzone_data(self, num_nfz: int, full_time_nfz: bool = False, avoid: np.ndarray = None) -> list[dict[str, Any]]:
+        ## RandomCaseGenerator.random_no_fly_zone ile aynı biçimde zone sözlükleri
+        rectangles = self.noflyzone_rectangles(num_nfz, avoid).tolist()
+        if full_time_nfz:
+            windows = [(0, 60 * 24)] * num_nfz
+        else:
+            starts = self.rng.integers(0, self.horizon, size=num_nfz, endpoint=True)
+            ends = starts + self.rng.integers(1, self.max_window, size=num_nfz, endpoint=True)
+            windows = list(zip(starts.tolist(), ends.tolist()))
+        return [
+            {"id": i + 1, "coordinates": [(x1, y1), (x2, y1), (x2, y2), (x1, y2)], "active_time": window}
+            for i, ((x1, y1, x2, y2), window) in enumerate(zip(rectangles, windows))
+        ]
+
+    def get_arrays(self, num_drones: int, num_packages: int, num_nfz: int, full_time_nfz: bool = False,
+                   distribution: str = "uniform", arrival: str = "uniform", depots: int = None,
+                   clusters: int = 8, peaks: int = 3) -> Tuple[dict, dict, list]:
+        ## Drone ve paket sütunları ile zone sözlükleri
+        drones = self.drone_arrays(num_drones, depots)
+        packages = self.package_arrays(num_packages, distribution, arrival, clusters, peaks, drones["start_pos"])
+        noflyzones = self.noflyzone_data(num_nfz, full_time_nfz, avoid=drones["start_pos"])
+        return drones, packages, noflyzones
+
+    def get_random_data(self, num_drones: int, num_packages: int, num_nfz: int, full_time_nfz: bool = False, **options):
+        ## RandomCaseGenerator.get_random_data ile aynı sözlük şeması
+        drones, packages, noflyzones = self.get_arrays(num_drones, num_packages, num_nfz, full_time_nfz, **options)
+        drone_dicts = [
+            {"id": i, "max_weight": w, "battery": b, "speed": s, "start_pos": tuple(pos)}
+            for i, w, b, s, pos in zip(drones["id"].tolist(), drones["max_weight"].tolist(), drones["battery"].tolist(),
+                                       drones["speed"].tolist(), drones["start_pos"].tolist())
+        ]
+        package_dicts = [
+            {"id": i, "pos": tuple(pos), "weight": w, "priority": p, "time_window": tuple(window), "delivered": False}
+            for i, pos, w, p, window in zip(packages["id"].tolist(), packages["pos"].tolist(), packages["weight"].tolist(),
+                                            packages["priority"].tolist(), packages["time_window"].tolist())
+        ]
+        return drone_dicts, package_dicts, noflyzones
+
+    def get_columnar_data(self, num_drones: int, num_packages: int, num_nfz: int, full_time_nfz: bool = False,
+                          **options) -> Tuple[DroneTable, PackageTable, list]:
+        ## Sözlük oluşturmadan doğrudan sütun tabloları (zaman pencereleri saniye cinsinden)
+        drones, packages, noflyzones = self.get_arrays(num_drones, num_packages, num_nfz, full_time_nfz, **options)
+        drone_table = DroneTable(drones["id"], drones["max_weight"], drones["battery"], drones["speed"], drones["start_pos"])
+        package_table = PackageTable(packages["id"], packages["pos"], packages["weight"], packages["priority"],
+                                     packages["time_window"] * 60.0)
+        return drone_table, package_table, noflyzones
+
+    def get_case(self, casetime: datetime, num_drones: int, num_packages: int, num_nfz: int,
+                 full_time_nfz: bool = False, **options) -> ColumnarDeliveryCase:
+        ## Üretilen sütunlardan doğrudan ColumnarDeliveryCase
+        drone_table, package_table, noflyzones = self.get_columnar_data(num_drones, num_packages, num_nfz, full_time_nfz, **options)
+        return ColumnarDeliveryCase.from_tables(casetime, drone_table, package_table, noflyzones)
@@ -0,0 +1,326 @@
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from columnarcase import ColumnarDeliveryCase, DroneTable, PackageTable
+from solver import DronePath, DroneSummary, Solution
+
+## Vakalar ve çözümler için sütunlu dizin biçimi: her sütun ayrı bir .npy dosyası, şema
+## bilgileri meta.json'da. Dosyalar np.load(mmap_mode="r") ile açılır; yalnızca dokunulan
+## sayfalar belleğe okunur.
+##
+##   meta.json                         biçim sürümü, casetime, tablo başına satır sayısı ve sütun tipleri
+##   drones.<alan>.npy                 id, max_weight, battery, speed, start_pos (n, 2)
+##   packages.<alan>.npy               id, pos (n, 2), weight, priority, time_window (n, 2) dakika,
+##                                     delivered (isteğe bağlı anahtar), time_window_seconds (türetilmiş)
+##   noflyzones.<alan>.npy             id, active_time (n, 2), coordinates (toplam köşe, 2) + offsets (n + 1)
+##   <alan>.isint.npy                  int/float karışık sütunlarda hangi değerin int olduğu
+##
+## Sözlük şemasıyla birebir gidiş-dönüş: int/float tipleri, tuple/list kapları, anahtar sırası
+## ve "delivered" anahtarının varlığı korunur.
+
+FORMAT_VERSION = 1
+CASE_META = "meta.json"
+SOLUTION_META = "solution.json"
+
+# Tablo -> (tekil sayısal alanlar, çift alanlar)
+TABLES = {
+    "drones": (("id", "max_weight", "battery", "speed"), ("start_pos",)),
+    "packages": (("id", "weight", "priority"), ("pos", "time_window")),
+    "noflyzones": (("id",), ("active_time",)),
+}
+OPTIONAL_FIELDS = {"packages": ("delivered",)}
+# Tablolarda int64 tutulan alanlar; diğerleri float64 saklanır ki mmap dizileri kopyalanmadan kullanılsın
+INT_FIELDS = ("id", "battery", "priority")
+
+
+def column_kind(values: np.ndarray) -> str:
+    # Sütunun tamamı int mi, float mı, karışık mı
+    if values.dtype.kind in "iu":
+        return "int"
+    if values.dtype.kind == "f":
+        return "float"
+    return "mixed"
+
+
+def storage_array(values, field: str, kind: str) -> np.ndarray:
+    # Tamamı int olan INT_FIELDS int64, geri kalan her şey float64 (2**53'e kadar int değerler birebir)
+    return np.asarray(values, dtype=np.int64 if field in INT_FIELDS and kind == "int" else np.float64)
+
+
+def encode_values(values: list, field: str) -> Tuple[np.ndarray, str, Optional[np.ndarray]]:
+    ## Python sayıları -> (saklanan dizi, tip, int maskesi); tip "int", "float" ya da "mixed"
+    is_int = np.fromiter((isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values),
+                         dtype=bool, count=len(values))
+    kind = "int" if is_int.all() else "float" if not is_int.any() else "mixed"
+    return storage_array(values, field, kind), kind, is_int if kind == "mixed" else None
+
+
+def decode_values(array: np.ndarray, kind: str, is_int: Optional[np.ndarray]) -> list:
+    ## encode_values'un tersi: düz Python int/float listesi
+    values = np.asarray(array).reshape(-1)
+    if kind == "int":
+        return values.astype(np.int64).tolist()
+    if kind == "float":
+        return values.astype(np.float64).tolist()
+    return [int(v) if i else v for v, i in zip(values.astype(np.float64).tolist(), np.asarray(is_int).reshape(-1).tolist())]
+
+
+def container_kind(records: List[dict], field: str) -> str:
+    # Çift alanlarının kabı (tuple ya da list); tüm kayıtlarda aynı olmalı
+    kinds = {type(record[field]) for record in records}
+    if len(kinds) > 1:
+        raise ValueError(f"Field {field!r} mixes container types {sorted(kind.__name__ for kind in kinds)}")
+    kind = kinds.pop() if kinds else tuple
+    return "list" if kind is list else "tuple"
+
+
+def write_column(directory: str, table: str, field: str, array: np.ndarray, is_int: Optional[np.ndarray] = None):
+    np.save(os.path.join(directory, f"{table}.{field}.npy"), array)
+    if is_int is not None:
+        np.save(os.path.join(directory, f"{table}.{field}.isint.npy"), is_int)
+
+
+def read_column(directory: str, table: str, field: str, mmap_mode: Optional[str] = "r") -> np.ndarray:
+    return np.load(os.path.join(directory, f"{table}.{field}.npy"), mmap_mode=mmap_mode)
+
+
+def read_mask(directory: str, table: str, field: str, column: dict) -> Optional[np.ndarray]:
+    if column["kind"] != "mixed":
+        return None
+    return np.load(os.path.join(directory, f"{table}.{field}.isint.npy"))
+
+
+def write_records(directory: str, table: str, records: List[dict]) -> dict:
+    ## Sözlük kayıtlarını sütunlara yaz; tablo meta bilgisini döndürür
+    scalars, pairs = TABLES[table]
+    optional = OPTIONAL_FIELDS.get(table, ())
+    known = set(scalars) | set(pairs) | set(optional) | ({"coordinates"} if table == "noflyzones" else set())
+    keys = list(records[0]) if records else list(scalars + pairs)
+    for record in records:
+        unknown = set(record) - known
+        if unknown:
+            raise ValueError(f"Unsupported {table} fields: {sorted(unknown)}")
+    for record in records:
+        # Anahtar sırası isteğe bağlı alanları da içeren ilk kayıttan alınır
+        if all(field in record for field in optional):
+            keys = list(record)
+            break
+
+    columns = {}
+    for field in scalars:
+        array, kind, is_int = encode_values([record[field] for record in records], field)
+        write_column(directory, table, field, array, is_int)
+        columns[field] = {"kind": kind}
+    for field in pairs:
+        array, kind, is_int = encode_values([value for record in records for value in record[field]], field)
+        write_column(directory, table, field, array.reshape(-1, 2), None if is_int is None else is_int.reshape(-1, 2))
+        columns[field] = {"kind": kind, "container": container_kind(records, field)}
+    for field in optional:
+        present = np.fromiter((field in record for record in records), dtype=bool, count=len(records))
+        values = np.fromiter((bool(record.get(field, False)) for record in records), dtype=bool, count=len(records))
+        write_column(directory, table, field, values)
+        if not present.all() and present.any():
+            np.save(os.path.join(directory, f"{table}.{field}.present.npy"), present)
+        columns[field] = {"kind": "bool", "present": "all" if present.all() else "some" if present.any() else "none"}
+    if table == "noflyzones":
+        # Poligonlar düz köşe dizisi ve zone başına başlangıç ofsetleri olarak saklanır
+        array, kind, is_int = encode_values([value for record in records for point in record["coordinates"] for value in point], "coordinates")
+        write_column(directory, table, "coordinates", array.reshape(-1, 2), None if is_int is None else is_int.reshape(-1, 2))
+        offsets = np.concatenate([[0], np.cumsum([len(record["coordinates"]) for record in records])]).astype(np.int64)
+        write_column(directory, table, "offsets", offsets)
+        point_kinds = {type(point) for record in records for point in record["coordinates"]}
+        outer_kinds = {type(record["coordinates"]) for record in records}
+        if len(point_kinds) > 1 or len(outer_kinds) > 1:
+            raise ValueError("Field 'coordinates' mixes container types")
+        columns["coordinates"] = {"kind": kind, "container": "list" if point_kinds == {list} else "tuple",
+                                  "outer": "tuple" if outer_kinds == {tuple} else "list"}
+    if table == "packages":
+        # Çözücünün saniye cinsinden pencereleri; mmap yüklemede kopya oluşturmamak için türetilmiş sütun
+        write_column(directory, table, "time_window_seconds", read_column(directory, table, "time_window", None).astype(np.float64) * 60.0)
+    return {"count": len(records), "keys": keys, "columns": columns}
+
+
+def write_arrays(directory: str, table: str, arrays: Dict[str, np.ndarray]) -> dict:
+    ## BulkCaseGenerator.get_arrays sütunlarını doğrudan yaz (sözlük oluşturmadan)
+    scalars, pairs = TABLES[table]
+    columns = {}
+    for field in scalars:
+        kind = column_kind(np.asarray(arrays[field]))
+        write_column(directory, table, field, storage_array(arrays[field], field, kind))
+        columns[field] = {"kind": kind}
+    for field in pairs:
+        kind = column_kind(np.asarray(arrays[field]))
+        write_column(directory, table, field, storage_array(arrays[field], field, kind).reshape(-1, 2))
+        columns[field] = {"kind": kind, "container": "tuple"}
+    # get_random_data ile aynı anahtar sırası
+    keys = list(scalars + pairs)
+    if table == "packages":
+        keys = ["id", "pos", "weight", "priority", "time_window", "delivered"]
+        write_column(directory, table, "delivered", np.zeros(len(arrays["id"]), dtype=bool))
+        columns["delivered"] = {"kind": "bool", "present": "all"}
+        write_column(directory, table, "time_window_seconds", np.asarray(arrays["time_window"], dtype=np.float64).reshape(-1, 2) * 60.0)
+    return {"count": len(arrays["id"]), "keys": keys, "columns": columns}
+
+
+def write_meta(directory: str, tables: dict, casetime: datetime = None):
+    meta = {"format": FORMAT_VERSION, "casetime": casetime.isoformat() if casetime else None, "tables": tables}
+    with open(os.path.join(directory, CASE_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+
+def read_meta(directory: str, name: str = CASE_META) -> dict:
+    with open(os.path.join(directory, name), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported case format {meta.get('format')} in {directory}")
+    return meta
+
+
+def save_case_data(directory: str, drones: List[dict], packages: List[dict], noflyzones: List[dict], casetime: datetime = None):
+    ## Sözlük şemasındaki vakayı dizine yaz
+    os.makedirs(directory, exist_ok=True)
+    tables = {
+        "drones": write_records(directory, "drones", drones),
+        "packages": write_records(directory, "packages", packages),
+        "noflyzones": write_records(directory, "noflyzones", noflyzones),
+    }
+    write_meta(directory, tables, casetime)
+
+
+def save_case_arrays(directory: str, drones: Dict[str, np.ndarray], packages: Dict[str, np.ndarray], noflyzones: List[dict],
+                     casetime: datetime = None):
+    ## BulkCaseGenerator.get_arrays çıktısını dizine yaz; büyük vakalar hiç sözlüğe çevrilmez
+    os.makedirs(directory, exist_ok=True)
+    tables = {
+        "drones": write_arrays(directory, "drones", drones),
+        "packages": write_arrays(directory, "packages", packages),
+        "noflyzones": write_records(directory, "noflyzones", noflyzones),
+    }
+    write_meta(directory, tables, casetime)
+
+
+def read_records(directory: str, table: str, meta: dict) -> List[dict]:
+    ## Tablo sütunlarından sözlük kayıtları (yazılan tipler ve kaplarla)
+    info = meta["tables"][table]
+    columns = info["columns"]
+    count = info["count"]
+    scalars, pairs = TABLES[table]
+    values = {}
+    for field in scalars:
+        values[field] = decode_values(read_column(directory, table, field), columns[field]["kind"], read_mask(directory, table, field, columns[field]))
+    for field in pairs:
+        flat = decode_values(read_column(directory, table, field), columns[field]["kind"], read_mask(directory, table, field, columns[field]))
+        container = list if columns[field]["container"] == "list" else tuple
+        values[field] = [container(flat[i:i + 2]) for i in range(0, len(flat), 2)]
+    present = {}
+    for field in OPTIONAL_FIELDS.get(table, ()):
+        values[field] = read_column(directory, table, field).tolist()
+        state = columns[field]["present"]
+        if state == "some":
+            present[field] = np.load(os.path.join(directory, f"{table}.{field}.present.npy")).tolist()
+        else:
+            present[field] = [state == "all"] * count
+    if table == "noflyzones":
+        column = columns["coordinates"]
+        flat = decode_values(read_column(directory, table, "coordinates"), column["kind"], read_mask(directory, table, "coordinates", column))
+        point = list if column["container"] == "list" else tuple
+        outer = tuple if column["outer"] == "tuple" else list
+        points = [point(flat[i:i + 2]) for i in range(0, len(flat), 2)]
+        offsets = read_column(directory, table, "offsets").tolist()
+        values["coordinates"] = [outer(points[offsets[i]:offsets[i + 1]]) for i in range(count)]
+
+    records = []
+    for i in range(count):
+        record = {}
+        for key in info["keys"]:
+            if key in present and not present[key][i]:
+                continue
+            record[key] = values[key][i]
+        records.append(record)
+    return records
+
+
+def load_case_data(directory: str) -> Tuple[List[dict], List[dict], List[dict]]:
+    ## Dizindeki vakayı sözlük şemasında oku (drones, packages, noflyzones)
+    meta = read_meta(directory)
+    return tuple(read_records(directory, table, meta) for table in ("drones", "packages", "noflyzones"))
+
+
+def load_case(directory: str, casetime: datetime = None) -> ColumnarDeliveryCase:
+    ## Sütunları bellek eşlemeli açarak ColumnarDeliveryCase oluştur; paket verisi kopyalanmaz.
+    ## Değişen durum sütunları (delivered, can_deliver, atBusyTime) bellekte tutulur.
+    meta = read_meta(directory)
+    if casetime is None:
+        casetime = datetime.fromisoformat(meta["casetime"]) if meta["casetime"] else datetime.now()
+    drone_table = DroneTable(*(read_column(directory, "drones", field) for field in ("id", "max_weight", "battery", "speed", "start_pos")))
+    package_table = PackageTable(
+        ids=read_column(directory, "packages", "id"),
+        pos=read_column(directory, "packages", "pos"),
+        weight=read_column(directory, "packages", "weight"),
+        priority=read_column(directory, "packages", "priority"),
+        time_window=read_column(directory, "packages", "time_window_seconds"),
+        delivered=read_column(directory, "packages", "delivered", mmap_mode="c"),
+    )
+    return ColumnarDeliveryCase.from_tables(casetime, drone_table, package_table, read_records(directory, "noflyzones", meta))
+
+
+def save_solution(directory: str, solution: Solution):
+    ## Çözüm bacaklarını sütunlara yaz: bacak başına drone, dönüş bayrağı, maliyet, başlangıç anı
+    ## ve düz nokta dizisindeki ofset, hedef paket. Drone özetleri meta dosyasında tutulur.
+    drone_paths = solution.get_drone_paths()
+    os.makedirs(directory, exist_ok=True)
+    drone_ids, returns, costs, starts, package_ids, lengths, points = [], [], [], [], [], [], []
+    for drone_id, paths in drone_paths.items():
+        for path in paths:
+            drone_ids.append(drone_id)
+            returns.append(path.isReturn)
+            costs.append(path.cost)
+            starts.append(np.nan if path.start_time is None else path.start_time)
+            package_ids.append(np.nan if path.package_id is None else path.package_id)
+            lengths.append(len(path.points))
+            points.extend(path.points)
+    np.save(os.path.join(directory, "paths.drone.npy"), np.asarray(drone_ids, dtype=np.int64))
+    np.save(os.path.join(directory, "paths.return.npy"), np.asarray(returns, dtype=bool))
+    np.save(os.path.join(directory, "paths.cost.npy"), np.asarray(costs, dtype=np.float64))
+    np.save(os.path.join(directory, "paths.start_time.npy"), np.asarray(starts, dtype=np.float64))
+    np.save(os.path.join(directory, "paths.package.npy"), np.asarray(package_ids, dtype=np.float64))
+    np.save(os.path.join(directory, "paths.offsets.npy"), np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64))
+    np.save(os.path.join(directory, "paths.points.npy"), np.asarray(points, dtype=np.float64).reshape(-1, 2))
+    meta = {"format": FORMAT_VERSION, "solverName": solution.solverName, "totalDistance": solution.totalDistance,
+            "totalConsumption": solution.totalConsumption, "paths": len(drone_ids),
+            "droneSummaries": {str(drone_id): asdict(summary) for drone_id, summary in solution.drone_summaries.items()}}
+    with open(os.path.join(directory, SOLUTION_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+
+def load_solution(directory: str, case=None) -> Solution:
+    ## save_solution ile yazılan çözümü oku (noktalar float olarak döner)
+    meta = read_meta(directory, SOLUTION_META)
+    drone_ids = np.load(os.path.join(directory, "paths.drone.npy")).tolist()
+    returns = np.load(os.path.join(directory, "paths.return.npy")).tolist()
+    costs = np.load(os.path.join(directory, "paths.cost.npy")).tolist()
+    starts = np.load(os.path.join(directory, "paths.start_time.npy")).tolist()
+    # Hedef paket sütunu olmayan eski çözümlerde bacakların paketi bilinmez
+    package_path = os.path.join(directory, "paths.package.npy")
+    package_ids = np.load(package_path).tolist() if os.path.exists(package_path) else [np.nan] * len(drone_ids)
+    offsets = np.load(os.path.join(directory, "paths.offsets.npy")).tolist()
+    points = [tuple(point) for point in np.load(os.path.join(directory, "paths.points.npy"), mmap_mode="r").tolist()]
+
+    solution = Solution()
+    solution.solverName = meta["solverName"]
+    solution.Case = case
+    for i, drone_id in enumerate(drone_ids):
+        leg = points[offsets[i]:offsets[i + 1]]
+        start = None if np.isnan(starts[i]) else starts[i]
+        package_id = None if np.isnan(package_ids[i]) else int(package_ids[i])
+        path = DronePath(list(range(len(leg))), leg, isReturn=returns[i], cost=costs[i], start_time=start, package_id=package_id)
+        solution.dronePaths.setdefault(drone_id, []).append(path)
+    solution.totalDistance = meta["totalDistance"]
+    solution.totalConsumption = meta["totalConsumption"]
+    # JSON anahtarları metin; drone kimlikleri int'e döndürülür
+    solution.drone_summaries = {int(drone_id): DroneSummary(**summary) for drone_id, summary in meta.get("droneSummaries", {}).items()}
+    return solution
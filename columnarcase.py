@@ -0,0 +1,313 @@
+from datetime import datetime
+import logging
+from typing import Any, List
+import numpy as np
+
+from deliverycase import DeliveryCase
+from drone import Drone
+from package import Package
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnTable:
+    ## Sütun dizileri ve ID -> satır indeksi
+    ids: np.ndarray
+    order: np.ndarray = None  # ids'i sıralayan permütasyon (searchsorted için); ilk sorguda oluşturulur
+
+    def build_index(self):
+        self.order = np.argsort(self.ids, kind="stable")
+        self.sorted_ids = self.ids[self.order]
+
+    def row_of(self, item_id) -> int:
+        ## ID'ye karşılık gelen satır, yoksa -1
+        if self.order is None:
+            # Bellek eşlemeli tablolarda açılışta tüm ID sütununu okumamak için tembel
+            self.build_index()
+        i = int(np.searchsorted(self.sorted_ids, item_id))
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == item_id:
+            return int(self.order[i])
+        return -1
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PackageTable(ColumnTable):
+    def __init__(self, ids, pos, weight, priority, time_window, delivered=None, can_deliver=None):
+        n = len(ids)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.pos = np.asarray(pos, dtype=float).reshape(n, 2)
+        self.weight = np.asarray(weight, dtype=float)
+        self.priority = np.asarray(priority, dtype=np.int64)
+        self.time_window = np.asarray(time_window, dtype=float).reshape(n, 2)
+        self.delivered = np.zeros(n, dtype=bool) if delivered is None else np.asarray(delivered, dtype=bool)
+        self.can_deliver = np.ones(n, dtype=bool) if can_deliver is None else np.asarray(can_deliver, dtype=bool)
+        self.buffers = {}  # Sütun adı -> eklemelerde sütunun görünümü olduğu, büyüyen tampon
+
+    COLUMNS = ("ids", "pos", "weight", "priority", "time_window", "delivered", "can_deliver")
+
+    def append(self, package: Package) -> int:
+        ## Sona bir satır ekle ve satır indeksini döndür. Sütunlar iki katına büyüyen tamponların
+        ## görünümleridir, ekleme amortize O(1) olur (bellek eşlemeli sütunlar ilk eklemede belleğe
+        ## kopyalanır); mevcut satır indeksleri ve görünümler geçerli kalır.
+        row = len(self.ids)
+        values = (package.id, package.pos, package.weight, package.priority, package.time_window,
+                  package.delivered, package.can_deliver)
+        for name, value in zip(self.COLUMNS, values):
+            column = getattr(self, name)
+            buffer = self.buffers.get(name)
+            if buffer is None or column.base is not buffer or len(buffer) <= row:
+                buffer = np.empty((max(2 * row, 16),) + column.shape[1:], dtype=column.dtype)
+                buffer[:row] = column
+                self.buffers[name] = buffer
+            buffer[row] = value
+            setattr(self, name, buffer[:row + 1])
+        if self.order is not None:
+            # ID dizini yeniden sıralanmadan güncellenir
+            i = int(np.searchsorted(self.sorted_ids, self.ids[row], side="right"))
+            self.order = np.insert(self.order, i, row)
+            self.sorted_ids = np.insert(self.sorted_ids, i, self.ids[row])
+        return row
+
+    def truncate(self, rows: int):
+        ## İlk rows satırı bırak
+        for name in self.COLUMNS:
+            setattr(self, name, getattr(self, name)[:rows])
+        self.order = None
+
+
+class DroneTable(ColumnTable):
+    def __init__(self, ids, max_weight, battery, speed, start_pos, atBusyTime=None):
+        n = len(ids)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.max_weight = np.asarray(max_weight, dtype=float)
+        self.battery = np.asarray(battery, dtype=np.int64)
+        self.speed = np.asarray(speed, dtype=float)
+        self.start_pos = np.asarray(start_pos, dtype=float).reshape(n, 2)
+        self.atBusyTime = np.zeros(n, dtype=float) if atBusyTime is None else np.asarray(atBusyTime, dtype=float)
+
+
+class PackageView(Package):
+    ## PackageTable'ın bir satırına bakan hafif Package görünümü
+    def __init__(self, table: PackageTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def id(self) -> int:
+        return int(self.table.ids[self.row])
+
+    @property
+    def pos(self):
+        x, y = self.table.pos[self.row]
+        return (float(x), float(y))
+
+    @property
+    def weight(self) -> float:
+        return float(self.table.weight[self.row])
+
+    @property
+    def priority(self) -> int:
+        return int(self.table.priority[self.row])
+
+    @property
+    def time_window(self):
+        start, end = self.table.time_window[self.row]
+        return (float(start), float(end))
+
+    @property
+    def delivered(self) -> bool:
+        return bool(self.table.delivered[self.row])
+
+    @delivered.setter
+    def delivered(self, value: bool):
+        self.table.delivered[self.row] = value
+
+    @property
+    def can_deliver(self) -> bool:
+        return bool(self.table.can_deliver[self.row])
+
+    @can_deliver.setter
+    def can_deliver(self, value: bool):
+        self.table.can_deliver[self.row] = value
+
+
+class DroneView(Drone):
+    ## DroneTable'ın bir satırına bakan hafif Drone görünümü
+    def __init__(self, table: DroneTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def id(self) -> int:
+        return int(self.table.ids[self.row])
+
+    @property
+    def max_weight(self) -> float:
+        return float(self.table.max_weight[self.row])
+
+    @property
+    def battery(self) -> int:
+        return int(self.table.battery[self.row])
+
+    @property
+    def speed(self) -> float:
+        return float(self.table.speed[self.row])
+
+    @property
+    def start_pos(self):
+        x, y = self.table.start_pos[self.row]
+        return (float(x), float(y))
+
+    @property
+    def atBusyTime(self) -> float:
+        return float(self.table.atBusyTime[self.row])
+
+    @atBusyTime.setter
+    def atBusyTime(self, value: float):
+        self.table.atBusyTime[self.row] = value
+
+
+class TableSequence:
+    ## Tablonun satırlarını istendiğinde görünüm olarak üreten dizi
+    def __init__(self, table: ColumnTable, view):
+        self.table = table
+        self.view = view
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.view(self.table, i) for i in range(*row.indices(len(self.table)))]
+        if row < 0:
+            row += len(self.table)
+        if not 0 <= row < len(self.table):
+            raise IndexError(row)
+        return self.view(self.table, row)
+
+    def __iter__(self):
+        for row in range(len(self.table)):
+            yield self.view(self.table, row)
+
+    def views(self, rows) -> list:
+        view, table = self.view, self.table
+        return [view(table, row) for row in np.asarray(rows).tolist()]
+
+
+class ColumnarDeliveryCase(DeliveryCase):
+    package_table: PackageTable
+    drone_table: DroneTable
+
+    def load_drones(self, drones: list[dict[str, Any]]):
+        # Drone'ları sütun dizilerine yükle
+        self.set_drone_table(DroneTable(
+            ids=[d["id"] for d in drones],
+            max_weight=[d["max_weight"] for d in drones],
+            battery=[d["battery"] for d in drones],
+            speed=[d["speed"] for d in drones],
+            start_pos=[d["start_pos"] for d in drones],
+        ))
+
+    def load_packages(self, packages: list[dict[str, Any]]):
+        # Paketleri sütun dizilerine yükle (zaman pencereleri dakikadan saniyeye)
+        self.set_package_table(PackageTable(
+            ids=[d["id"] for d in packages],
+            pos=[d["pos"] for d in packages],
+            weight=[d["weight"] for d in packages],
+            priority=[d["priority"] for d in packages],
+            time_window=np.asarray([d["time_window"] for d in packages], dtype=float).reshape(-1, 2) * 60.0,
+        ))
+
+    def append_package(self, package: Package) -> Package:
+        ## Paketi tabloya satır olarak ekle; satırın görünümünü döndürür
+        row = self.package_table.append(package)
+        view = self.packages[row]
+        for graph in self.package_graphs.values():
+            graph.add_package(view.id, view.pos)
+        return view
+
+    def pop_packages(self, count: int):
+        ## Son eklenen count satırı tablodan çıkar
+        self.package_table.truncate(len(self.package_table) - count)
+        # Geri alma seyrek; grafikler bir sonraki sorguda yeniden oluşturulur
+        self.package_graphs.clear()
+
+    def set_drone_table(self, table: DroneTable):
+        self.drone_table = table
+        self.drones = TableSequence(table, DroneView)
+
+    def set_package_table(self, table: PackageTable):
+        self.package_table = table
+        self.packages = TableSequence(table, PackageView)
+
+    @classmethod
+    def from_tables(cls, casetime: datetime, drone_table: DroneTable, package_table: PackageTable,
+                    noflyzones: list[dict[str, Any]]) -> "ColumnarDeliveryCase":
+        ## Hazır sütun tablolarından vaka oluştur (sözlük listeleri olmadan)
+        case = cls.__new__(cls)
+        case.starttime = casetime
+        case.casetime = 0.0
+        case.package_graphs = {}
+        case.set_drone_table(drone_table)
+        case.set_package_table(package_table)
+        case.load_noflyzones(noflyzones)
+        return case
+
+    def get_package_positions(self):
+        ## Paket ID'leri ve konumları (grafik oluşturma için)
+        return self.package_table.ids.tolist(), list(map(tuple, self.package_table.pos.tolist()))
+
+    def get_avabile_packages(self, time: float) -> List[Package]:
+        ## Verilen zamana göre teslim edilebilecek paketleri döndür (vektörel maske)
+        table = self.package_table
+        mask = (~table.delivered & table.can_deliver &
+                (table.time_window[:, 0] <= time) & (time <= table.time_window[:, 1]))
+        return self.packages.views(np.flatnonzero(mask))
+
+    def sort_packages_by_priority(self, packages: List[Package]) -> List[Package]:
+        ## Paketleri önceliğe göre sırala (eşit önceliklerde sıra korunur)
+        rows = np.fromiter((package.row for package in packages), dtype=np.intp, count=len(packages))
+        order = np.argsort(-self.package_table.priority[rows], kind="stable")
+        return [packages[i] for i in order.tolist()]
+
+    def get_next_available_package(self, time: float) -> Package:
+        ## Verilen zamana göre en yakın teslim edilebilecek paketi döndür (vektörel maske)
+        table = self.package_table
+        rows = np.flatnonzero((table.time_window[:, 0] >= time) & ~table.delivered & table.can_deliver)
+        if rows.size == 0:
+            return None
+        return self.packages[int(rows[np.argmin(table.time_window[rows, 0])])]
+
+    def find_nearest_drone(self, package: Package, time: float) -> Drone:
+        ## Verilen pakete en yakın dronu bul (vektörel maske)
+        table = self.drone_table
+        mask = (table.battery > 0) & (package.weight <= table.max_weight) & (time >= table.atBusyTime)
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return None
+        delta = table.start_pos[rows] - np.asarray(package.pos, dtype=float)
+        distances = np.sqrt((delta ** 2).sum(axis=1))
+        return self.drones[int(rows[np.argmin(distances)])]
+
+    def get_drone_by_id(self, drone_id: int) -> Drone:
+        ## Drone ID'sine göre dronu döndür (ID indeksi)
+        row = self.drone_table.row_of(drone_id)
+        return self.drones[row] if row >= 0 else None
+
+    def get_package_by_id(self, package_id: int) -> Package:
+        ## Paket ID'sine göre paketi döndür (ID indeksi)
+        row = self.package_table.row_of(package_id)
+        return self.packages[row] if row >= 0 else None
+
+    def is_case_completed(self) -> bool:
+        return bool(self.package_table.delivered.all())
+
+    def get_successful_delivery_percent(self) -> float:
+        ## Başarılı teslimat yüzdesini döndür
+        if len(self.package_table) == 0:
+            return 0.0
+        successful_deliveries = int(self.package_table.delivered.sum())
+        logger.debug("Successful Deliveries: %d out of %d", successful_deliveries, len(self.package_table))
+        return (successful_deliveries / len(self.package_table)) * 100.0
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+
+class ConflictCache:
+    max_size: int  # Saklanacak en fazla sonuç sayısı
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, max_size: int = 200000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        ## Önbellekteki sonucu döndür, yoksa None
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, value: bool):
+        ## Sonucu sakla, kapasite aşılırsa en eski kullanılanı çıkar
+        self.entries[key] = value
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        ## Önbellek istatistiklerini döndür
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -1,47 +1,73 @@
 
+from bisect import bisect_left
+import copy
 from datetime import datetime, timedelta
+import logging
+from numbers import Integral, Real
 from typing import Any, List
+import numpy as np
+import shapely
+from shapely import LineString, STRtree
+from conflictcache import ConflictCache
 from drone import Drone
 from noflyzone import NoFlyZone
 from package import Package
+from packagegraph import PackageGraph
+from visibility import VisibilityGraph
+
+logger = logging.getLogger(__name__)
 
 class DeliveryCase:
-    casetime: datetime = datetime.now()
+    starttime: datetime  # Vakanın başlangıç anı (tüm zamanların referansı)
+    casetime: float  # Vaka saati, starttime'dan itibaren saniye
     drones:List[Drone]
     packages:List[Package]
     noflyzones:List[NoFlyZone]
+    noflyzone_index: STRtree  # No-fly zone zarfları için uzamsal indeks
+    noflyzone_boundaries: List[float]  # Aktif no-fly zone kümesinin değişebileceği anlar
+    noflyzone_epochs: List[int]  # Temel zaman aralığı -> aktif küme kimliği
+    noflyzone_active_sets: dict[int, frozenset]  # Aktif küme kimliği -> aktif zone indeksleri
+    noflyzone_keys: dict[frozenset, int]  # Aktif zone indeksleri -> kalıcı küme kimliği
+    visibility_graph: VisibilityGraph  # Zone köşeleri görünürlük grafiği (tembel oluşturulur)
+    conflict_cache: ConflictCache  # (kenar, aktif küme) -> çakışma sonucu
+    noflyzone_checks: int  # Önbelleğe takılmadan yapılan geometrik çakışma testi sayısı
+    package_graphs: dict[int, PackageGraph]  # KNN -> paket grafiği önbelleği
 
     def __init__(self,casetime:datetime, drones: list[dict[str, Any]], packages: list[dict[str, Any]], noflyzones: list[dict[str, Any]]):
         
-        
-        self.casetime = casetime
-        self.drones = []
-        self.packages = []
-        self.noflyzones = []
+        # Tüm zaman alanları casetime'a göre saniye cinsinden float değerlere dönüştürülür
+        self.starttime = casetime
+        self.casetime = 0.0
+        self.package_graphs = {}
+
+        self.load_drones(drones)
+        self.load_packages(packages)
+        self.load_noflyzones(noflyzones)
 
+    def load_drones(self, drones: list[dict[str, Any]]):
         # Drone'ları yükle
+        self.drones = []
         for d in drones:
             drone = Drone(
                 id=d["id"],
                 max_weight=d["max_weight"],
                 battery=d["battery"],
                 speed=d["speed"],
-                start_pos=d["start_pos"],
-                atBusyDatetime=self.casetime
+                start_pos=tuple(d["start_pos"]),
+                atBusyTime=self.casetime
             )
             self.drones.append(drone)
 
+    def load_packages(self, packages: list[dict[str, Any]]):
         # Paketleri yükle
+        self.packages = []
         for d in packages:
-            start_minutes = d["time_window"][0]
-            end_minutes = d["time_window"][1]
-
-            start_time = self.casetime + timedelta(minutes=start_minutes)
-            end_time = self.casetime + timedelta(minutes=end_minutes)
+            start_time = d["time_window"][0] * 60.0
+            end_time = d["time_window"][1] * 60.0
 
             package = Package(
                 id=d["id"],
-                pos=d["pos"],
+                pos=tuple(d["pos"]),
                 weight=d["weight"],
                 priority=d["priority"],
                 time_window=(start_time, end_time),
@@ -50,13 +76,12 @@ class DeliveryCase:
             # package.delivered = False
             self.packages.append(package)
 
+    def load_noflyzones(self, noflyzones: list[dict[str, Any]]):
         # No-fly zone'ları yükle
+        self.noflyzones = []
         for nfz in noflyzones:
-            start_minutes = nfz["active_time"][0]
-            end_minutes = nfz["active_time"][1]
-
-            start_time = self.casetime + timedelta(minutes=start_minutes)
-            end_time = self.casetime + timedelta(minutes=end_minutes)
+            start_time = nfz["active_time"][0] * 60.0
+            end_time = nfz["active_time"][1] * 60.0
 
             zone = NoFlyZone(
                 id=nfz["id"],
@@ -65,11 +90,158 @@ class DeliveryCase:
             )
             self.noflyzones.append(zone)
 
-    def get_avabile_packages(self,datetime: datetime) -> List[Package]:
-        ## Verilen tarihe göre teslim edilebilecek paketleri döndür
+        self.noflyzone_index = STRtree([zone.polygon for zone in self.noflyzones])
+        self.noflyzone_keys = {}
+        self.build_noflyzone_epochs()
+        self.conflict_cache = ConflictCache()
+        self.noflyzone_checks = 0
+        self.visibility_graph = None
+
+    def build_noflyzone_epochs(self):
+        ## Sınır anları ve aralarındaki açık aralıklar için aktif zone kümelerini hesapla
+        boundaries = sorted({t for zone in self.noflyzones for t in zone.active_time})
+        representatives = []
+        for i, boundary in enumerate(boundaries):
+            previous = boundaries[i - 1] if i > 0 else boundary - 1.0
+            representatives.append(previous + (boundary - previous) / 2)
+            representatives.append(boundary)
+        representatives.append(boundaries[-1] + 1.0 if boundaries else 0.0)
+
+        # Kimlikler yeniden hesaplamalarda korunur; önbellekteki çakışma sonuçları geçerli kalır
+        active_sets = self.noflyzone_keys
+        self.noflyzone_boundaries = boundaries
+        self.noflyzone_epochs = []
+        for time in representatives:
+            active = frozenset(i for i, zone in enumerate(self.noflyzones) if zone.is_active(time))
+            self.noflyzone_epochs.append(active_sets.setdefault(active, len(active_sets) if active else -1))
+        self.noflyzone_active_sets = {key: active for active, key in active_sets.items()}
+
+    def add_package(self, data: dict[str, Any]) -> Package:
+        ## Vakaya sonradan gelen paketi ekle (zaman penceresi dakika cinsinden)
+        return self.append_package(self.create_package(data))
+
+    def create_package(self, data: dict[str, Any]) -> Package:
+        ## Sözlük şemasındaki paketi doğrulayıp oluştur; vaka değişmez (hatalı alanlarda ValueError)
+        is_number = lambda value: isinstance(value, Real) and not isinstance(value, bool)
+        pos = data["pos"]
+        window = data["time_window"]
+        if not isinstance(data["id"], Integral) or isinstance(data["id"], bool):
+            raise ValueError(f"Package id must be an integer, got {data['id']!r}")
+        if not isinstance(pos, (list, tuple)) or len(pos) != 2 or not all(map(is_number, pos)):
+            raise ValueError(f"Package {data['id']}: pos must be two numbers, got {pos!r}")
+        if not isinstance(window, (list, tuple)) or len(window) != 2 or not all(map(is_number, window)) or window[0] > window[1]:
+            raise ValueError(f"Package {data['id']}: time_window must be two ordered numbers, got {window!r}")
+        if not is_number(data["weight"]) or not is_number(data["priority"]):
+            raise ValueError(f"Package {data['id']}: weight and priority must be numbers")
+        return Package(
+            id=data["id"],
+            pos=tuple(pos),
+            weight=data["weight"],
+            priority=data["priority"],
+            time_window=(window[0] * 60.0, window[1] * 60.0),
+            delivered=False
+        )
+
+    def append_package(self, package: Package) -> Package:
+        ## Paketi vakaya ekle; vakadaki paket nesnesini döndürür
+        self.packages.append(package)
+        # KNN grafikleri yeni paketle yerinde güncellenir (baştan oluşturulanla aynı kenarlar)
+        for graph in self.package_graphs.values():
+            graph.add_package(package.id, package.pos)
+        return package
+
+    def pop_packages(self, count: int):
+        ## Son eklenen count paketi vakadan çıkar (başarısız eklemenin geri alınması)
+        del self.packages[len(self.packages) - count:]
+        # Geri alma seyrek; grafikler bir sonraki sorguda yeniden oluşturulur
+        self.package_graphs.clear()
+
+    def add_noflyzone(self, data: dict[str, Any]) -> int:
+        ## Yeni no-fly zone ekle (aktif zaman dakika cinsinden); zone indeksini döndürür.
+        ## Mevcut zone indeksleri değişmediğinden çakışma önbelleği temizlenmez.
+        zone = NoFlyZone(
+            id=data["id"],
+            coordinates=data["coordinates"],
+            active_time=(data["active_time"][0] * 60.0, data["active_time"][1] * 60.0)
+        )
+        self.noflyzones.append(zone)
+        self.noflyzone_index = STRtree([zone.polygon for zone in self.noflyzones])
+        self.build_noflyzone_epochs()
+        if self.visibility_graph is not None:
+            self.visibility_graph.add_zone(len(self.noflyzones) - 1)
+        return len(self.noflyzones) - 1
+
+    def set_noflyzone_active_time(self, index: int, active_time: tuple[float, float]):
+        ## Zone'un aktif aralığını değiştir (saniye); geometri aynı kaldığından yalnızca epoch'lar yenilenir
+        self.noflyzones[index].active_time = active_time
+        self.build_noflyzone_epochs()
+
+    def get_noflyzone_index(self, zone_id: int) -> int:
+        ## Zone ID'sine göre listedeki indeks (bulunamazsa None)
+        for i, zone in enumerate(self.noflyzones):
+            if zone.id == zone_id:
+                return i
+        return None
+
+    def to_datetime(self, time: float) -> datetime:
+        ## Saniye cinsinden vaka zamanını datetime'a çevir
+        return self.starttime + timedelta(seconds=time)
+
+    def to_time(self, moment: datetime) -> float:
+        ## datetime'ı vaka başlangıcından itibaren saniyeye çevir
+        return (moment - self.starttime).total_seconds()
+
+    def get_noflyzone_epoch(self, time: float) -> int:
+        ## Verilen anı içeren temel aralığın indeksi (sınır anları kendi aralığıdır)
+        i = bisect_left(self.noflyzone_boundaries, time)
+        if i < len(self.noflyzone_boundaries) and self.noflyzone_boundaries[i] == time:
+            return 2 * i + 1
+        return 2 * i
+
+    def get_active_noflyzone_key(self, time: float) -> int:
+        ## Verilen anda aktif olan zone kümesinin kimliği (-1: aktif zone yok)
+        return self.noflyzone_epochs[self.get_noflyzone_epoch(time)]
+
+    def get_active_noflyzones(self, time: float) -> frozenset:
+        ## Verilen anda aktif olan zone indeksleri
+        return self.noflyzone_active_sets.get(self.get_active_noflyzone_key(time), frozenset())
+
+    def has_constant_noflyzones(self, time: float, horizon: float) -> bool:
+        ## [time, horizon] aralığındaki her temel aralıkta aktif zone kümesi aynı mı
+        first, last = self.get_noflyzone_epoch(time), self.get_noflyzone_epoch(horizon)
+        return len(set(self.noflyzone_epochs[first:last + 1])) == 1
+
+    def get_persistent_noflyzones(self, time: float, horizon: float) -> frozenset:
+        ## [time, horizon] aralığının tamamında aktif kalan zone indeksleri
+        return frozenset(i for i, zone in enumerate(self.noflyzones)
+                         if zone.active_time[0] <= time and horizon <= zone.active_time[1])
+
+    def get_time_horizon(self) -> float:
+        ## Hiçbir teslimatın kabul edilemeyeceği an (en geç zaman penceresi bitişi)
+        return max((package.time_window[1] for package in self.packages), default=self.casetime)
+
+    def get_visibility_graph(self) -> VisibilityGraph:
+        ## Zone köşeleri görünürlük grafiğini bir kez oluştur
+        if self.visibility_graph is None:
+            self.visibility_graph = VisibilityGraph(self.noflyzones)
+        return self.visibility_graph
+
+    def thread_view(self) -> "DeliveryCase":
+        ## Eşzamanlı değerlendirme için vaka görünümü: paketler, drone'lar, zone'lar ve hazır grafikler paylaşılır,
+        ## çakışma önbelleği, sayaç ve görünürlük önbellekleri görünüme özeldir
+        view = copy.copy(self)
+        view.conflict_cache = ConflictCache(self.conflict_cache.max_size)
+        view.noflyzone_checks = 0
+        view.package_graphs = dict(self.package_graphs)
+        if self.visibility_graph is not None:
+            view.visibility_graph = self.visibility_graph.thread_view()
+        return view
+
+    def get_avabile_packages(self,time: float) -> List[Package]:
+        ## Verilen zamana göre teslim edilebilecek paketleri döndür
         available_packages = []
         for package in self.packages:
-            if not package.delivered and package.is_within_time_window(datetime) and package.can_deliver:
+            if not package.delivered and package.is_within_time_window(time) and package.can_deliver:
                 available_packages.append(package)
         return available_packages
     
@@ -77,14 +249,14 @@ class DeliveryCase:
         ## Paketleri önceliğe göre sırala
         return sorted(packages, key=lambda p: p.priority, reverse=True)
 
-    def get_next_available_package(self, datetime: datetime) -> Package:
-        ## Verilen tarihe göre en yakın teslim edilebilecek paketi döndür
-        future_package = [package for package in self.packages if package.time_window[0] >= datetime and not package.delivered and package.can_deliver]
+    def get_next_available_package(self, time: float) -> Package:
+        ## Verilen zamana göre en yakın teslim edilebilecek paketi döndür
+        future_package = [package for package in self.packages if package.time_window[0] >= time and not package.delivered and package.can_deliver]
         if future_package == []:
             return None
         return min(future_package, key=lambda p: p.time_window[0])
 
-    def find_nearest_drone(self, package: Package, time:datetime) -> Drone:
+    def find_nearest_drone(self, package: Package, time:float) -> Drone:
         ## Verilen pakete en yakın dronu bul
         nearest_drone = None
         min_distance = float('inf')
@@ -100,7 +272,7 @@ class DeliveryCase:
     def next_available_drones(self) -> Drone:
         ## En yakın işi bitecek dronu bul
         next_drone = None
-        sorted_drones = sorted(self.drones, key=lambda d: d.atBusyDatetime if d.atBusyDatetime else datetime.max)
+        sorted_drones = sorted(self.drones, key=lambda d: d.atBusyTime if d.atBusyTime is not None else float('inf'))
         
         return sorted_drones
 
@@ -108,14 +280,79 @@ class DeliveryCase:
         ## Tüm paketler teslim edildiyse True döndür
         return all(package.delivered for package in self.packages)
     
-    def is_edge_conflict_noflyzone(self, start_pos: tuple[float, float], end_pos: tuple[float, float], time: datetime) -> bool:
+    def is_edge_conflict_noflyzone(self, start_pos: tuple[float, float], end_pos: tuple[float, float], time: float) -> bool:
         ## Verilen başlangıç ve bitiş konumları için no-fly zone ile çakışma var mı kontrol et
-        for zone in self.noflyzones:
-            if zone.is_active(time):
-                if zone.is_path_conflict(start_pos, end_pos):
-                    return True
+        active_key = self.get_active_noflyzone_key(time)
+        if active_key < 0 or start_pos == end_pos:
+            return False
+        if end_pos < start_pos:
+            start_pos, end_pos = end_pos, start_pos
+        key = (start_pos, end_pos, active_key)
+        conflict = self.conflict_cache.get(key)
+        if conflict is None:
+            conflict = self.check_edge_conflict_noflyzone(start_pos, end_pos, time)
+            self.conflict_cache.put(key, conflict)
+        return conflict
+
+    def check_edge_conflict_noflyzone(self, start_pos: tuple[float, float], end_pos: tuple[float, float], time: float) -> bool:
+        ## Önbelleği kullanmadan geometrik çakışma kontrolü
+        if start_pos == end_pos:
+            return False
+        self.noflyzone_checks += 1
+        line = LineString([start_pos, end_pos])
+        for i in self.noflyzone_index.query(line):
+            zone = self.noflyzones[i]
+            if zone.is_active(time) and zone.is_line_conflict(line):
+                return True
         return False
 
+    def get_crossed_noflyzones(self, points: list, time: float, speed: float) -> frozenset:
+        ## time anında kalkıp points boyunca speed ile uçan drone'un içindeyken aktif olan zone indeksleri
+        crossed = set()
+        for start, end in zip(points, points[1:]):
+            line = LineString([start, end])
+            for i in self.noflyzone_index.query(line).tolist():
+                zone = self.noflyzones[i]
+                span = zone.crossing_span(start, end)
+                if span is not None and time + span[0] / speed <= zone.active_time[1] and zone.active_time[0] <= time + span[1] / speed:
+                    crossed.add(i)
+            time += line.length / speed
+        return frozenset(crossed)
+
+    def are_edges_conflict_noflyzone(self, start_positions, end_positions, time: float, zones: frozenset = None) -> np.ndarray:
+        ## Birden çok kenarı tek seferde no-fly zone çakışması için kontrol et
+        ## (zones verilirse verilen andaki aktif küme yerine bu zone indeksleri kullanılır)
+        starts = np.asarray(start_positions, dtype=float).reshape(-1, 2)
+        ends = np.asarray(end_positions, dtype=float).reshape(-1, 2)
+        conflicts = np.zeros(len(starts), dtype=bool)
+        if zones is None:
+            active = np.array([zone.is_active(time) for zone in self.noflyzones], dtype=bool)
+        else:
+            active = np.isin(np.arange(len(self.noflyzones)), list(zones))
+        if not active.any() or len(starts) == 0:
+            return conflicts
+
+        lines = shapely.linestrings(np.stack([starts, ends], axis=1))
+        line_idx, zone_idx = self.noflyzone_index.query(lines)
+        keep = active[zone_idx] & (starts[line_idx] != ends[line_idx]).any(axis=1)
+        line_idx, zone_idx = line_idx[keep], zone_idx[keep]
+        self.noflyzone_checks += len(starts)
+        if line_idx.size:
+            polygons = self.noflyzone_index.geometries[zone_idx]
+            hits = NoFlyZone.lines_conflict(lines[line_idx], polygons)
+            conflicts[line_idx[hits]] = True
+        return conflicts
+
+    def get_package_positions(self):
+        ## Paket ID'leri ve konumları (grafik oluşturma için)
+        return [package.id for package in self.packages], [package.pos for package in self.packages]
+
+    def get_package_graph(self, knn: int) -> PackageGraph:
+        ## Paket KNN grafiğini bir kez oluştur ve sonraki sorgular için sakla
+        if knn not in self.package_graphs:
+            self.package_graphs[knn] = PackageGraph.from_case(self, knn)
+        return self.package_graphs[knn]
+
     def get_drone_by_id(self, drone_id: int) -> Drone:
         ## Drone ID'sine göre dronu döndür
         for drone in self.drones:
@@ -123,12 +360,19 @@ class DeliveryCase:
                 return drone
         return None
     
+    def get_package_by_id(self, package_id: int) -> Package:
+        ## Paket ID'sine göre paketi döndür
+        for package in self.packages:
+            if package.id == package_id:
+                return package
+        return None
+
     def get_successful_delivery_percent(self) -> float:
         ## Başarılı teslimat yüzdesini döndür
         if not self.packages:
             return 0.0
         successful_deliveries = sum(1 for package in self.packages if package.delivered)
-        print(f"Successful Deliveries: {successful_deliveries} out of {len(self.packages)}")
+        logger.debug("Successful Deliveries: %d out of %d", successful_deliveries, len(self.packages))
         return (successful_deliveries / len(self.packages)) * 100.0
 
     def case_summary(self):
@@ -138,7 +382,7 @@ class DeliveryCase:
             print(f"Drone ID: {drone.id}, Max Weight: {drone.max_weight}, Battery: {drone.battery}, Speed: {drone.speed}, Start Position: {drone.start_pos}")
         print("Paket Sayısı:", len(self.packages))
         for package in self.packages:
-            print(f"Package ID: {package.id}, Position: {package.pos}, Weight: {package.weight}, Priority: {package.priority}, Time Window: {package.time_window[0].strftime('%X')} to {package.time_window[1].strftime('%X')}, Delivered: {package.delivered}")
+            print(f"Package ID: {package.id}, Position: {package.pos}, Weight: {package.weight}, Priority: {package.priority}, Time Window: {self.to_datetime(package.time_window[0]).strftime('%X')} to {self.to_datetime(package.time_window[1]).strftime('%X')}, Delivered: {package.delivered}")
         print("No-Fly Zone Sayısı:", len(self.noflyzones))
         for zone in self.noflyzones:
-            print(f"No-Fly Zone ID: {zone.id}, Coordinates: {zone.coordinates}, Active Time: {zone.active_time[0].strftime('%X')} to {zone.active_time[1].strftime('%X')}")
\ No newline at end of file
+            print(f"No-Fly Zone ID: {zone.id}, Coordinates: {zone.coordinates}, Active Time: {self.to_datetime(zone.active_time[0]).strftime('%X')} to {self.to_datetime(zone.active_time[1]).strftime('%X')}")
\ No newline at end of file
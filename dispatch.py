@@ -0,0 +1,79 @@
+from heapq import heappop, heappush
+from typing import List, Optional
+
+from deliverycase import DeliveryCase
+from drone import Drone
+from package import Package
+
+
+class DispatchIndex:
+    ## Ayrık olay tabanlı dağıtım için paket zaman penceresi ve drone müsaitlik indeksleri
+    deliverycase: DeliveryCase
+    opens: List[int]  # "Pencere açılıyor" olayları: başlangıç zamanına göre sıralı paket indeksleri
+    closes: list  # "Pencere kapanıyor" olayları: (bitiş, paket indeksi) min-heap
+    frees: list  # "Drone boşa çıkıyor" olayları: (atBusyTime, drone indeksi) min-heap
+    window: dict  # Penceresi açık paket indeksleri
+
+    def __init__(self, deliverycase: DeliveryCase):
+        self.deliverycase = deliverycase
+        self.packages = list(deliverycase.packages)
+        self.drones = list(deliverycase.drones)
+        self.drone_rows = {drone.id: i for i, drone in enumerate(self.drones)}
+
+        self.starts = [package.time_window[0] for package in self.packages]
+        self.ends = [package.time_window[1] for package in self.packages]
+        self.priorities = [package.priority for package in self.packages]
+        self.opens = sorted(range(len(self.packages)), key=lambda i: (self.starts[i], i))
+        self.next_open = 0  # Henüz açılmamış ilk pencere
+        self.next_start = 0  # Gelecekte başlayan ilk uygun paket adayı
+        self.closes = []
+        self.window = {}
+
+        self.frees = []
+        for i, drone in enumerate(self.drones):
+            if drone.atBusyTime is not None:
+                heappush(self.frees, (drone.atBusyTime, i))
+
+    def is_pending(self, i: int) -> bool:
+        package = self.packages[i]
+        return not package.delivered and package.can_deliver
+
+    def advance(self, time: float):
+        ## Verilen zamana kadar olan pencere açılış/kapanış olaylarını işle
+        while self.next_open < len(self.opens) and self.starts[self.opens[self.next_open]] <= time:
+            i = self.opens[self.next_open]
+            self.next_open += 1
+            if self.is_pending(i):
+                self.window[i] = None
+                heappush(self.closes, (self.ends[i], i))
+        while self.closes and self.closes[0][0] < time:
+            _, i = heappop(self.closes)
+            self.window.pop(i, None)
+
+    def next_available_package(self, time: float) -> Optional[Package]:
+        ## Başlangıcı verilen zamandan sonra olan en erken uygun paket (get_next_available_package)
+        while self.next_start < len(self.opens):
+            i = self.opens[self.next_start]
+            if self.starts[i] >= time and self.is_pending(i):
+                return self.packages[i]
+            self.next_start += 1
+        return None
+
+    def available_packages(self) -> List[Package]:
+        ## Penceresi açık paketler, önceliğe göre (eşitlikte liste sırası)
+        for i in [i for i in self.window if not self.is_pending(i)]:
+            del self.window[i]
+        return [self.packages[i] for i in sorted(self.window, key=lambda i: (-self.priorities[i], i))]
+
+    def set_drone_busy(self, drone: Drone):
+        ## Drone'un yeni müsaitlik zamanını heap'e ekle
+        heappush(self.frees, (drone.atBusyTime, self.drone_rows[drone.id]))
+
+    def next_drone_free_time(self, time: float) -> Optional[float]:
+        ## Verilen zamandan sonra boşa çıkacak ilk drone'un zamanı
+        while self.frees:
+            busy_until, i = self.frees[0]
+            if busy_until > time and busy_until == self.drones[i].atBusyTime:
+                return busy_until
+            heappop(self.frees)
+        return None
@@ -1,8 +1,10 @@
 
 from dataclasses import dataclass
-from datetime import datetime
+import logging
 from typing import Tuple
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class Drone:
     id: int
@@ -10,7 +12,7 @@ class Drone:
     battery: int
     speed: float
     start_pos: Tuple[float, float]
-    atBusyDatetime: datetime = datetime.now()
+    atBusyTime: float = 0.0  # Vaka başlangıcından itibaren saniye
 
     @staticmethod
     def calculate_distance(pos1:tuple,pos2:tuple):
@@ -19,14 +21,14 @@ class Drone:
     def can_carry(self, weight: float) -> bool:
         return weight <= self.max_weight
     
-    def set_busy(self, datetime: datetime):
-        print(f"Drone {self.id} is now busy until {datetime}")
-        self.atBusyDatetime = datetime
+    def set_busy(self, time: float):
+        logger.debug("Drone %s is now busy until %.1fs", self.id, time)
+        self.atBusyTime = time
 
-    def is_available(self, datetime: datetime) -> bool:
-        if self.atBusyDatetime is None:
+    def is_available(self, time: float) -> bool:
+        if self.atBusyTime is None:
             return True
-        return datetime >= self.atBusyDatetime
+        return time >= self.atBusyTime
     
     @staticmethod
     def calculate_energy_consumption(distance: float, weight: float) -> float:
@@ -0,0 +1,73 @@
+from heapq import heappop, heappush
+from typing import Dict, List, Set, Tuple
+
+from adjacency import AdjacencyGraph
+from drone import Drone
+
+
+class LandmarkTable:
+    ## ALT sezgiseli: seçilen işaret düğümlerinden tüm düğümlere en kısa mesafeler.
+    ## Üçgen eşitsizliğinden |d(L, t) - d(L, n)| <= d(n, t); tablo asıl grafiğin bir üst
+    ## grafiğinde (daha fazla düğüm, daha düşük ya da eşit ağırlık) hesaplansa da alt sınırdır.
+    graph: AdjacencyGraph
+    landmarks: List[int]  # İşaret düğümlerinin indeksleri
+    rows: List[Tuple[float, ...]]  # Düğüm -> işaretlere olan mesafeler
+
+    def __init__(self, graph: AdjacencyGraph, penalties: Dict[Tuple[int, int], float], count: int):
+        self.graph = graph
+        self.penalties = penalties
+        self.landmarks = []
+        columns = []
+        n = len(graph.node_ids)
+        if n == 0 or count <= 0:
+            self.rows = [() for _ in range(n)]
+            return
+
+        # İlk işaret merkezden en uzak düğüm; sonrakiler seçilmişlere en uzak (erişilebilir) düğüm
+        cx = sum(point[0] for point in graph.points) / n
+        cy = sum(point[1] for point in graph.points) / n
+        landmark = max(range(n), key=lambda i: Drone.calculate_distance(graph.points[i], (cx, cy)))
+        nearest = [float('inf')] * n
+        for _ in range(min(count, n)):
+            self.landmarks.append(landmark)
+            distances = self.shortest_distances(landmark)
+            columns.append(distances)
+            nearest = [min(a, b) for a, b in zip(nearest, distances)]
+            candidates = [i for i in range(n) if nearest[i] != float('inf') and i not in self.landmarks]
+            if not candidates:
+                # Erişilemeyen bileşenlerden de bir işaret seç
+                candidates = [i for i in range(n) if i not in self.landmarks]
+                if not candidates:
+                    break
+                landmark = candidates[0]
+                continue
+            landmark = max(candidates, key=lambda i: nearest[i])
+        self.rows = list(zip(*columns))
+
+    def shortest_distances(self, source: int) -> List[float]:
+        ## Kaynaktan tüm düğümlere Dijkstra (ceza eklenmiş kenar ağırlıklarıyla)
+        distances = [float('inf')] * len(self.graph.node_ids)
+        distances[source] = 0.0
+        queue = [(0.0, source)]
+        settled: Set[int] = set()
+        while queue:
+            distance, current = heappop(queue)
+            if current in settled:
+                continue
+            settled.add(current)
+            for neighbor, weight in self.graph.neighbors(current):
+                total = distance + weight + self.penalties.get((current, neighbor), 0.0)
+                if total < distances[neighbor]:
+                    distances[neighbor] = total
+                    heappush(queue, (total, neighbor))
+        return distances
+
+    def bound(self, node: int, target: int) -> float:
+        ## node -> target mesafesi için alt sınır (farklı bileşenlerde sonsuz)
+        best = 0.0
+        for a, b in zip(self.rows[node], self.rows[target]):
+            if a != b:
+                difference = a - b if a > b else b - a
+                if difference > best:
+                    best = difference
+        return best
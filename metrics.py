@@ -0,0 +1,73 @@
+import cProfile
+import io
+import pstats
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Callable, Optional
+
+# Ölçüm kapalıyken aşamalar için paylaşılan boş bağlam
+NULL_PHASE = nullcontext()
+
+
+class SolverMetrics:
+    ## Aşama süreleri ve isteğe bağlı profil; kapalıyken hiçbir zaman ölçümü yapılmaz
+    enabled: bool
+    profile: bool  # Çözüm boyunca cProfile çalıştırılır
+    trace: Optional[Callable[[str, float], None]]  # Her aşama bitiminde (ad, süre) ile çağrılır
+    timings: dict  # Aşama -> toplam süre (s)
+    calls: dict  # Aşama -> çağrı sayısı
+    profiler: cProfile.Profile
+
+    def __init__(self, enabled: bool = False, profile: bool = False, trace: Callable[[str, float], None] = None):
+        self.enabled = enabled or profile or trace is not None
+        self.profile = profile
+        self.trace = trace
+        self.reset()
+
+    def reset(self):
+        self.timings = {}
+        self.calls = {}
+        self.profiler = None
+        self.profile_report = None
+
+    def phase(self, name: str):
+        ## Aşama süresini ölçen bağlam (kapalıyken boş bağlam)
+        if not self.enabled:
+            return NULL_PHASE
+        return self.timed(name)
+
+    @contextmanager
+    def timed(self, name: str):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - started
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.trace is not None:
+                self.trace(name, elapsed)
+
+    def start_profile(self):
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self, limit: int = 25):
+        ## Profili durdur ve en pahalı fonksiyonların özetini sakla
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(limit)
+        self.profile_report = report.getvalue()
+
+    def snapshot(self, counters: dict) -> dict:
+        ## Sayaçlar ve aşama sürelerinin kopyası
+        snapshot = {"counters": dict(counters)}
+        if self.enabled:
+            snapshot["timings"] = dict(self.timings)
+            snapshot["calls"] = dict(self.calls)
+        if self.profile_report is not None:
+            snapshot["profile"] = self.profile_report
+        return snapshot
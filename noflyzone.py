@@ -1,22 +1,81 @@
-
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import numpy as np
+import shapely
 from shapely import LineString, Polygon
 
 @dataclass
 class NoFlyZone:
     id: int
     coordinates: List[Tuple[float, float]]
-    active_time: Tuple[datetime, datetime]
+    active_time: Tuple[float, float]  # Vaka başlangıcından itibaren saniye
+    polygon: Polygon = field(init=False, repr=False, compare=False)  # Hazırlanmış (prepared) poligon
+    bounds: Tuple[float, float, float, float] = field(init=False, repr=False, compare=False)
+
+    # Hat, poligonun içinden geçiyor ya da kenarı boyunca ilerliyor (kesişim uzunluğu > 0)
+    CONFLICT_PATTERNS = ('T********', '*1*******')
+
+    def __post_init__(self):
+        self.polygon = Polygon(self.coordinates)
+        shapely.prepare(self.polygon)
+        self.bounds = self.polygon.bounds
+
+    def __setstate__(self, state):
+        # Pickle hazırlanmış (prepared) durumu taşımaz; süreçler arası aktarımda yeniden hazırla
+        self.__dict__.update(state)
+        shapely.prepare(self.polygon)
 
-    def is_active(self, current_time: datetime) -> bool:
+    def is_active(self, current_time: float) -> bool:
         return self.active_time[0] <= current_time <= self.active_time[1]
-    
+
+    def intersects_bounds(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+        minx, miny, maxx, maxy = self.bounds
+        return not (
+            max(start[0], end[0]) < minx or min(start[0], end[0]) > maxx or
+            max(start[1], end[1]) < miny or min(start[1], end[1]) > maxy
+        )
+
     def is_path_conflict(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
-        polygon = Polygon(self.coordinates)
+        if start == end or not self.intersects_bounds(start, end):
+            return False
+        return self.is_line_conflict(LineString([start, end]))
+
+    def is_line_conflict(self, line: LineString) -> bool:
+        if not self.polygon.intersects(line):
+            return False
+        return any(line.relate_pattern(self.polygon, pattern) for pattern in self.CONFLICT_PATTERNS)
+
+    def crossing_span(self, start: Tuple[float, float], end: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+        ## Çakışan hattın zone içinde kalan kısmının başlangıçtan uzaklık aralığı (çakışma yoksa None)
+        if not self.is_path_conflict(start, end):
+            return None
         line = LineString([start, end])
+        coordinates = shapely.get_coordinates(self.polygon.intersection(line))
+        distances = shapely.line_locate_point(line, shapely.points(coordinates))
+        return float(distances.min()), float(distances.max())
 
-        intersection = line.intersection(polygon)
+    def are_paths_conflict(self, starts, ends) -> np.ndarray:
+        ## Birden çok hattı tek seferde kontrol et (vektörel shapely 2 yüklemleri)
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        minx, miny, maxx, maxy = self.bounds
+        candidates = (
+            (np.maximum(starts[:, 0], ends[:, 0]) >= minx) & (np.minimum(starts[:, 0], ends[:, 0]) <= maxx) &
+            (np.maximum(starts[:, 1], ends[:, 1]) >= miny) & (np.minimum(starts[:, 1], ends[:, 1]) <= maxy) &
+            (starts != ends).any(axis=1)
+        )
+        conflicts = np.zeros(len(starts), dtype=bool)
+        rows = np.flatnonzero(candidates)
+        if rows.size:
+            lines = shapely.linestrings(np.stack([starts[rows], ends[rows]], axis=1))
+            conflicts[rows] = NoFlyZone.lines_conflict(lines, self.polygon)
+        return conflicts
 
-        return intersection.area > 0 or intersection.length > 0 and not line.boundary.contains(intersection)
\ No newline at end of file
+    @staticmethod
+    def lines_conflict(lines, polygons) -> np.ndarray:
+        ## Hat/poligon çiftleri için vektörel çakışma testi
+        hits = shapely.intersects(polygons, lines)
+        return hits & (
+            shapely.relate_pattern(lines, polygons, NoFlyZone.CONFLICT_PATTERNS[0]) |
+            shapely.relate_pattern(lines, polygons, NoFlyZone.CONFLICT_PATTERNS[1])
+        )
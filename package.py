@@ -1,6 +1,5 @@
 
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Tuple
 
 @dataclass
@@ -9,17 +8,17 @@ class Package:
     pos: Tuple[float, float]
     weight: float
     priority: int
-    time_window: Tuple[datetime, datetime]
+    time_window: Tuple[float, float]  # Vaka başlangıcından itibaren saniye
     delivered: bool = False
     can_deliver: bool = True
 
     def set_delivered(self):
         self.delivered = True
 
-    def is_within_time_window(self, current_time: datetime) -> bool:
+    def is_within_time_window(self, current_time: float) -> bool:
         return self.time_window[0] <= current_time <= self.time_window[1]
     
-    def get_start_time(self) -> datetime:
+    def get_start_time(self) -> float:
         return self.time_window[0]
     
     def set_cannot_deliver(self):
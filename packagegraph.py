@@ -0,0 +1,151 @@
+from bisect import insort
+from typing import List, Tuple
+import numpy as np
+
+from adjacency import AdjacencyGraph
+from drone import Drone
+
+
+class PackageGraph:
+    KNN: int  # Her paket için tutulan komşu sayısı
+    ids: List[int]  # Satır sırasına göre paket ID'leri
+    points: List[Tuple[float, float]]  # Paket konumları (orijinal değerler)
+    positions: np.ndarray  # (n, 2) paket konumları
+    edges: dict  # (package_id, neighbor_id) -> mesafe
+    neighbors: List[List[Tuple[float, int]]]  # Satır -> (mesafe, satır) KNN komşuları, mesafe ve satır sırasıyla
+    incoming: List[set]  # Satır -> kendisini KNN komşusu sayan satırlar
+    kth: np.ndarray  # Satır -> KNN'inci komşunun mesafesi (komşu listesi dolmamışsa inf)
+    adjacency: AdjacencyGraph  # CSR komşuluk yapısı (tembel oluşturulur)
+    drone_adjacencies: dict  # Drone üssü konumu -> drone katmanlı komşuluk yapısı
+    landmark_tables: dict  # (ceza alan zone'lar, işaret sayısı) -> ALT mesafe tablosu
+
+    BLOCK_SIZE = 256  # Mesafe matrisi bu kadar satırlık bloklarla hesaplanır
+
+    def __init__(self, ids: List[int], positions: List[Tuple[float, float]], knn: int):
+        self.KNN = knn
+        self.ids = list(ids)
+        self.points = list(positions)
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.edges = self.build_edges()
+        self.adjacency = None
+        self.drone_adjacencies = {}
+        self.landmark_tables = {}
+
+    @classmethod
+    def from_case(cls, deliverycase, knn: int) -> "PackageGraph":
+        ids, positions = deliverycase.get_package_positions()
+        return cls(ids, positions, knn)
+
+    def nearest(self, distances: np.ndarray, k: int) -> np.ndarray:
+        # En yakın k indeksi, eşit mesafelerde liste sırasını koruyarak döndür
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k >= distances.shape[0]:
+            return np.argsort(distances, kind="stable")
+        kth = np.partition(distances, k - 1)[k - 1]
+        candidates = np.flatnonzero(distances <= kth)
+        order = np.argsort(distances[candidates], kind="stable")
+        return candidates[order[:k]]
+
+    def build_edges(self) -> dict:
+        # Her paketi en yakın KNN komşusuna bağlayan kenarları oluştur
+        edges = {}
+        n = len(self.ids)
+        k = min(self.KNN, n - 1)
+        self.neighbors = [[] for _ in range(n)]
+        self.incoming = [set() for _ in range(n)]
+        self.kth = np.full(n, np.inf)
+        for block_start in range(0, n, self.BLOCK_SIZE):
+            block = self.positions[block_start:block_start + self.BLOCK_SIZE]
+            delta = block[:, None, :] - self.positions[None, :, :]
+            distances = np.sqrt((delta ** 2).sum(axis=2))
+            rows = np.arange(block.shape[0])
+            distances[rows, rows + block_start] = np.inf
+
+            for row in rows:
+                i = block_start + row
+                for j in self.nearest(distances[row], k).tolist():
+                    edges[(self.ids[i], self.ids[j])] = Drone.calculate_distance(self.points[i], self.points[j])
+                    self.neighbors[i].append((float(distances[row, j]), j))
+                    self.incoming[j].add(i)
+                if len(self.neighbors[i]) == self.KNN:
+                    self.kth[i] = self.neighbors[i][-1][0]
+        return edges
+
+    def add_package(self, package_id: int, pos: Tuple[float, float]):
+        # Paketi grafiğe ekle. Kenarlar paketler baştan verilerek oluşturulan grafikle aynıdır; yeni paketin
+        # mesafeleri tek vektörel satırla hesaplanır, komşuluk yapısında yalnızca değişen satırlar güncellenir.
+        new = len(self.ids)
+        point = tuple(pos)
+        distances = np.sqrt(((self.positions - np.asarray(point, dtype=float)) ** 2).sum(axis=1))
+        self.ids.append(package_id)
+        self.points.append(point)
+        self.positions = np.vstack([self.positions, np.asarray(point, dtype=float).reshape(1, 2)])
+
+        own = [(float(distances[j]), j) for j in self.nearest(distances, min(self.KNN, new)).tolist()]
+        self.neighbors.append(own)
+        self.incoming.append(set())
+        changed = {new}
+        for _, j in own:
+            self.edges[(package_id, self.ids[j])] = Drone.calculate_distance(point, self.points[j])
+            self.incoming[j].add(new)
+            changed.add(j)
+
+        # Yeni paketi KNN komşusu sayan paketler; eşit mesafede liste sırasında sonda olan yeni paket kaybeder
+        for i in np.flatnonzero(distances < self.kth).tolist():
+            row = self.neighbors[i]
+            insort(row, (float(distances[i]), new))
+            self.edges[(self.ids[i], package_id)] = Drone.calculate_distance(self.points[i], point)
+            self.incoming[new].add(i)
+            changed.add(i)
+            if len(row) > self.KNN:
+                _, evicted = row.pop()
+                del self.edges[(self.ids[i], self.ids[evicted])]
+                self.incoming[evicted].discard(i)
+                changed.add(evicted)
+            if len(row) == self.KNN:
+                self.kth[i] = row[-1][0]
+        self.kth = np.append(self.kth, own[-1][0] if len(own) == self.KNN else np.inf)
+
+        if self.adjacency is not None:
+            self.adjacency.add_node(package_id, point)
+            for u in changed:
+                linked = {j for _, j in self.neighbors[u]} | self.incoming[u]
+                self.adjacency.set_row(u, [(v, Drone.calculate_distance(self.points[u], self.points[v])) for v in sorted(linked)])
+        # Drone katmanları düğüm listesini kopyalar, ALT tabloları tüm grafiğe bağlıdır; ilk sorguda yeniden oluşturulur
+        self.drone_adjacencies.clear()
+        self.landmark_tables.clear()
+
+    def drone_edges(self, drone_pos: Tuple[float, float], node_id: int = -1) -> dict:
+        # Drone üssünü en yakın KNN pakete bağlayan küçük kenar kümesi
+        if not self.ids:
+            return {}
+        delta = self.positions - np.asarray(drone_pos, dtype=float)
+        distances = np.sqrt((delta ** 2).sum(axis=1))
+        return {
+            (node_id, self.ids[j]): Drone.calculate_distance(drone_pos, self.points[j])
+            for j in self.nearest(distances, self.KNN)
+        }
+
+    def get_adjacency(self) -> AdjacencyGraph:
+        # Paket grafiğinin CSR komşuluk yapısı (bir kez oluşturulur)
+        if self.adjacency is None:
+            self.adjacency = AdjacencyGraph.from_edges(self.edges, dict(zip(self.ids, self.points)))
+        return self.adjacency
+
+    def get_drone_adjacency(self, drone_pos: Tuple[float, float], node_id: int = -1) -> AdjacencyGraph:
+        # Drone üssü kenarlarını paylaşılan CSR yapısının üzerine ekleme (üs başına bir kez)
+        key = (tuple(drone_pos), node_id)
+        if key not in self.drone_adjacencies:
+            self.drone_adjacencies[key] = self.get_adjacency().with_overlay(
+                self.drone_edges(drone_pos, node_id), {node_id: drone_pos}
+            )
+        return self.drone_adjacencies[key]
+
+    def get_fleet_adjacency(self, drone_positions) -> AdjacencyGraph:
+        # Tüm drone üslerinin (-1, -2, ... kimlikleriyle) aynı anda eklendiği komşuluk yapısı
+        bases = list(dict.fromkeys(tuple(pos) for pos in drone_positions))
+        edges = {}
+        for k, pos in enumerate(bases):
+            edges.update(self.drone_edges(pos, node_id=-1 - k))
+        return self.get_adjacency().with_overlay(edges, {-1 - k: pos for k, pos in enumerate(bases)})
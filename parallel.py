@@ -0,0 +1,112 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+from typing import List
+
+from deliverycase import DeliveryCase
+from solver import RoutePlan
+
+# İşçi süreçteki çözücü; vaka ve grafik havuz başlatılırken bir kez aktarılır
+_worker_solver = None
+
+# İşçilerde artan ve ana çözücünün sayaçlarına eklenen değerler (çözücü ve vaka sayaçları)
+WORKER_COUNTERS = ("expansions", "edge_relaxations", "route_evaluations", "nfz_checks", "cache_hits", "cache_misses")
+
+
+def _init_worker(solver_factory, deliverycase: DeliveryCase):
+    global _worker_solver
+    _worker_solver = solver_factory()
+    _worker_solver.deliverycase = deliverycase
+
+
+def _read_counters(solver) -> tuple:
+    deliverycase = solver.deliverycase
+    return (solver.expansions, solver.edge_relaxations, solver.route_evaluations,
+            deliverycase.noflyzone_checks, deliverycase.conflict_cache.hits, deliverycase.conflict_cache.misses)
+
+
+def _plan_counted(solver, drone, package, time: float) -> tuple:
+    # Plan, değerlendirme sırasında artan sayaçlarla (WORKER_COUNTERS sırasıyla) birlikte döner
+    before = _read_counters(solver)
+    plan = solver.plan_route(solver.deliverycase, drone, package, time)
+    return plan, [after - start for start, after in zip(before, _read_counters(solver))]
+
+
+def _evaluate_in_worker(drone_row: int, package_row: int, time: float) -> tuple:
+    deliverycase = _worker_solver.deliverycase
+    return _plan_counted(_worker_solver, deliverycase.drones[drone_row], deliverycase.packages[package_row], time)
+
+
+class ParallelEvaluator:
+    ## Aday drone rotalarını süreç ya da iş parçacığı havuzunda eşzamanlı değerlendirme
+    workers: int
+    mode: str  # "process" ya da "thread"
+    executor: Executor
+    counters: dict  # WORKER_COUNTERS -> işçilerde biriken toplam
+
+    def __init__(self, solver_factory, deliverycase: DeliveryCase, workers: int, mode: str = "process"):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown parallel mode: {mode}")
+        self.solver_factory = solver_factory
+        self.deliverycase = deliverycase
+        self.workers = workers
+        self.mode = mode
+        self.drone_rows = {drone.id: i for i, drone in enumerate(deliverycase.drones)}
+        self.package_rows = {package.id: i for i, package in enumerate(deliverycase.packages)}
+        self.counters = dict.fromkeys(WORKER_COUNTERS, 0)
+
+        # Grafikler ana iş parçacığında bir kez oluşturulur: süreçlere görev başına tekrar pickle edilmez,
+        # iş parçacıkları da tembel önbellekleri aynı anda doldurmaya çalışmaz
+        solver = solver_factory()
+        if solver.routing == "visibility":
+            deliverycase.get_visibility_graph()
+        else:
+            package_graph = deliverycase.get_package_graph(solver.KNN)
+            for drone in deliverycase.drones:
+                package_graph.get_drone_adjacency(drone.start_pos)
+
+        if mode == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(solver_factory, deliverycase)
+            )
+        else:
+            # Her iş parçacığının kendi çözücüsü ve vaka görünümü olur; LRU çakışma önbelleği, görünürlük
+            # önbellekleri ve sayaçlar kilitsiz paylaşılamaz (ALT tabloları deterministik, tekrar hesaplanabilir)
+            self.local = threading.local()
+            self.thread_solvers = []
+            self.lock = threading.Lock()
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _evaluate_in_thread(self, drone, package, time: float) -> tuple:
+        solver = getattr(self.local, "solver", None)
+        if solver is None:
+            solver = self.local.solver = self.solver_factory()
+            solver.deliverycase = self.deliverycase.thread_view()
+            with self.lock:
+                self.thread_solvers.append(solver)
+        return _plan_counted(solver, drone, package, time)
+
+    def evaluate(self, drones: list, package, time: float) -> List[RoutePlan]:
+        ## Drone'lar için rota planlarını aynı sırada döndür (ulaşılamayanlar için None)
+        if self.mode == "process":
+            package_row = self.package_rows[package.id]
+            futures = [
+                self.executor.submit(_evaluate_in_worker, self.drone_rows[drone.id], package_row, time)
+                for drone in drones
+            ]
+        else:
+            futures = [self.executor.submit(self._evaluate_in_thread, drone, package, time) for drone in drones]
+
+        plans = []
+        for drone, future in zip(drones, futures):
+            plan, deltas = future.result()
+            for name, delta in zip(WORKER_COUNTERS, deltas):
+                self.counters[name] += delta
+            if plan is not None and self.mode == "process":
+                # İşçiden gelen kopyalar yerine bu süreçteki nesneler işlenir
+                plan.drone = drone
+                plan.package = package
+            plans.append(plan)
+        return plans
+
+    def close(self):
+        self.executor.shutdown()
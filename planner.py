@@ -0,0 +1,336 @@
+from bisect import bisect_left, insort
+import logging
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from astarsolver import AStarSolver
+from deliverycase import DeliveryCase
+from drone import Drone
+from package import Package
+from solver import RoutePlan, Solution, SolutionSink
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalPlanner:
+    ## Akan siparişler ve zone değişiklikleri için artımlı planlayıcı. Her drone'un planları
+    ## kalkış sırasıyla tutulur; kalkışı şimdiki andan sonra olan planlar bekleyen atamalardır.
+    ## Bir olay yalnızca etkilediği bekleyen atamaları geri alıp yeniden planlar; diğer paketlerin
+    ## planlarına, grafiklere ve önbelleklere dokunulmaz.
+    case: DeliveryCase
+    solver: AStarSolver
+    now: float  # Son olayın anı (vaka saniyesi); olaylar zaman sırasıyla gelir
+    schedules: Dict[int, List[Tuple[float, float, int]]]  # Drone ID -> (kalkış, dönüş, paket ID), kalkış sırasıyla
+    assignments: Dict[int, RoutePlan]  # Paket ID -> tamamlanmamış plan (çok duraklı seferde her paket için aynı plan)
+    completed: List[RoutePlan]  # Üsse dönüşü geçmiş planlar
+    backlog: Dict[int, Package]  # Plan bulunamayan, penceresi henüz kapanmamış paketler
+    unavailable: Dict[int, float]  # Drone ID -> yeniden kullanılabileceği an
+    latencies: List[Tuple[str, float]]  # (olay, süre) ölçümleri
+    package_ids: set  # Vakadaki tüm paket ID'leri (yinelenen sipariş kontrolü)
+
+    def __init__(self, case: DeliveryCase, solver: AStarSolver = None, plans: List[RoutePlan] = None):
+        # Varsayılan görünürlük rotası paket sayısından bağımsızdır; bacaklar, drone'un içinden geçtiği anda
+        # aktif olan (bacak sırasında açılan) zone'lardan da kaçınır. KNN rotasında yeni paket grafiğe yerinde eklenir.
+        # plans verilirse bu seferler olduğu gibi atanır, ilk plan yalnızca kalan paketler için yapılır.
+        self.case = case
+        self.solver = solver if solver is not None else AStarSolver(routing="visibility")
+        self.solver.deliverycase = case
+        self.now = case.casetime
+        self.schedules = {drone.id: [] for drone in case.drones}
+        self.assignments = {}
+        self.completed = []
+        self.backlog = {}
+        self.unavailable = {}
+        self.latencies = []
+        self.package_ids = {package.id for package in case.packages}
+
+        started = perf_counter()
+        for plan in plans or ():
+            self.assign(plan)
+        packages = [package for package in case.packages
+                    if not package.delivered and package.can_deliver and package.id not in self.assignments]
+        self.replan(packages)
+        self.latencies.append(("initial_plan", perf_counter() - started))
+
+    def free_slots(self, drone: Drone, earliest: float):
+        # Drone'un earliest anından sonraki boş aralıkları (başlangıç, bitiş) sırayla üret
+        schedule = self.schedules[drone.id]
+        i = max(bisect_left(schedule, (earliest,)) - 1, 0)
+        previous = earliest
+        for departure, arrival, _ in schedule[i:]:
+            if departure > previous:
+                yield previous, departure
+            previous = max(previous, arrival)
+        yield previous, float('inf')
+
+    def rank_drones(self, package: Package, drones: List[Drone] = None) -> list:
+        # Taşıyabilen ve batarya alt sınırını geçmeyen drone'lar, AStarSolver.rank_candidate_drones
+        # ile aynı düz çizgi alt sınırına göre sıralı
+        slack = 1 - self.solver.BOUND_TOLERANCE
+        candidates = []
+        for order, drone in enumerate(self.case.drones):
+            if drones is not None and drone not in drones:
+                continue
+            if drone.can_carry(package.weight) is False:
+                continue
+            distance = Drone.calculate_distance(drone.start_pos, package.pos) * slack
+            energy_bound = (Drone.calculate_energy_consumption(distance, package.weight) +
+                            Drone.calculate_energy_consumption(distance, 0))
+            if energy_bound >= drone.battery:
+                continue
+            candidates.append((2 * distance, order, drone))
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+        return candidates
+
+    def plan_package(self, package: Package, candidates: list) -> Optional[RoutePlan]:
+        # Her aday drone için paketin penceresindeki ilk uygun boşluğa sığan plan; en düşük maliyetli seçilir
+        best_plan = None
+        best_key = (float('inf'), float('inf'), 0)
+        for bound, order, drone in candidates:
+            if bound > best_key[0]:
+                break
+            earliest = max(self.now, package.time_window[0], self.unavailable.get(drone.id, self.now))
+            duration = bound / drone.speed
+            for gap_start, gap_end in self.free_slots(drone, earliest):
+                if gap_start + duration > package.time_window[1]:
+                    break
+                if gap_start + duration > gap_end:
+                    continue
+                plan = self.solver.plan_route(self.case, drone, package, gap_start)
+                if plan is None or not self.solver.is_plan_feasible(plan) or plan.arrival_time > gap_end:
+                    continue
+                # Eşit maliyette önce dönen, sonra liste sırasında önce gelen drone seçilir
+                key = (plan.total_cost, plan.arrival_time, order)
+                if key < best_key:
+                    best_plan = plan
+                    best_key = key
+                break
+        return best_plan
+
+    def assign(self, plan: RoutePlan):
+        # Takvimde sefer ilk paketiyle anılır; seferin tüm paketleri atanmış sayılır
+        insort(self.schedules[plan.drone.id], (plan.departure_time, plan.arrival_time, plan.package.id))
+        for package in plan.packages:
+            self.assignments[package.id] = plan
+            self.backlog.pop(package.id, None)
+
+    def unassign(self, package_id: int) -> RoutePlan:
+        # Paketin seferini geri al (çok duraklı seferin diğer paketleri de atamasız kalır)
+        plan = self.assignments[package_id]
+        for package in plan.packages:
+            del self.assignments[package.id]
+        self.schedules[plan.drone.id].remove((plan.departure_time, plan.arrival_time, plan.package.id))
+        return plan
+
+    def planned(self) -> List[RoutePlan]:
+        # Tamamlanmamış seferler (her sefer bir kez)
+        return list({id(plan): plan for plan in self.assignments.values()}.values())
+
+    def insert(self, package: Package) -> Optional[RoutePlan]:
+        ## Paketi mevcut planları bozmadan yerleştir; sığmazsa bekleme listesine al
+        candidates = self.rank_drones(package)
+        if not candidates:
+            # Hiçbir drone taşıyamıyor ya da menzil yetmiyor; boşalan kapasite de değiştirmez
+            package.set_cannot_deliver()
+            return None
+        plan = self.plan_package(package, candidates)
+        if plan is None:
+            self.backlog[package.id] = package
+            logger.debug("No slot for Package ID: %s", package.id)
+        else:
+            self.assign(plan)
+        return plan
+
+    def replan(self, packages: List[Package]) -> Dict[int, Optional[RoutePlan]]:
+        # Pencere başlangıcı, sonra öncelik sırasıyla yerleştir
+        packages = sorted(packages, key=lambda package: (package.time_window[0], -package.priority))
+        return {package.id: self.insert(package) for package in packages}
+
+    def retry_backlog(self, changes: Dict[int, Optional[RoutePlan]], drones: List[Drone] = None,
+                      start: float = 0.0, end: float = float('inf')):
+        # Boşalan kapasite için bekleyen paketleri yeniden dene: yalnızca penceresi [start, end]
+        # ile kesişenler ve yalnızca kapasitesi boşalan drone'lar. Penceresi kapananlar düşülür.
+        for package in sorted(self.backlog.values(), key=lambda package: (package.time_window[0], -package.priority)):
+            if package.time_window[1] < self.now:
+                del self.backlog[package.id]
+                package.set_cannot_deliver()
+                changes[package.id] = None
+                continue
+            if package.time_window[1] < start or package.time_window[0] > end:
+                continue
+            candidates = self.rank_drones(package, drones)
+            plan = self.plan_package(package, candidates) if candidates else None
+            if plan is not None:
+                self.assign(plan)
+                changes[package.id] = plan
+
+    def advance(self, time: float):
+        ## Saati ilerlet; dönüşü geçmiş planlar tamamlanmış sayılır
+        if time < self.now:
+            raise ValueError(f"Events must arrive in time order: {time} < {self.now}")
+        self.now = time
+        for schedule in self.schedules.values():
+            while schedule and schedule[0][1] <= time:
+                plan = self.assignments[schedule.pop(0)[2]]
+                for package in plan.packages:
+                    del self.assignments[package.id]
+                    package.set_delivered()
+                self.completed.append(plan)
+
+    def reset_solver_caches(self):
+        # Zaman bağımlı arama ağaçları eski epoch'lara göre hesaplanmış olabilir
+        self.solver.forward_trees.clear()
+        self.solver.reverse_trees.clear()
+        self.solver.time_horizon = None
+
+    def finish(self, event: str, started: float, changes: Dict[int, Optional[RoutePlan]]) -> Dict[int, Optional[RoutePlan]]:
+        elapsed = perf_counter() - started
+        self.latencies.append((event, elapsed))
+        logger.debug("%s at %.1fs: %d assignments changed in %.4fs", event, self.now, len(changes), elapsed)
+        return changes
+
+    def add_package(self, data: Dict[str, Any], time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Yeni sipariş (sözlük şeması, pencere dakika cinsinden); değişen atamaları döndürür
+        return self.add_packages([data], time)
+
+    def add_packages(self, packages: List[Dict[str, Any]], time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Aynı anda gelen siparişler birlikte, pencere ve öncelik sırasıyla yerleştirilir
+        started = perf_counter()
+        ids = [data["id"] for data in packages]
+        if len(set(ids)) != len(ids) or not self.package_ids.isdisjoint(ids):
+            raise ValueError(f"Duplicate package id in {ids}")
+        # Tüm siparişler durum değişmeden önce doğrulanır; hatalı biri varsa hiçbiri eklenmez
+        created = [self.case.create_package(data) for data in packages]
+        self.advance(time)
+        self.package_ids.update(ids)
+        packages = [self.case.append_package(package) for package in created]
+        try:
+            self.packages_changed()
+            changes = self.replan(packages)
+        except Exception:
+            self.rollback(packages)
+            raise
+        return self.finish("add_package", started, changes)
+
+    def packages_changed(self):
+        if self.solver.routing != "visibility":
+            # KNN grafiği yeni paketlerle değişti; önceki grafikteki arama ağaçları yeniden oluşturulur
+            self.reset_solver_caches()
+        self.solver.time_horizon = None
+
+    def rollback(self, packages: List[Package]):
+        # Yerleştirme yarıda kalan siparişlerin atamalarını ve vakadaki kayıtlarını geri al
+        for package in packages:
+            if package.id in self.assignments:
+                self.unassign(package.id)
+            self.backlog.pop(package.id, None)
+            self.package_ids.discard(package.id)
+        self.case.pop_packages(len(packages))
+        self.packages_changed()
+
+    def cancel_package(self, package_id: int, time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Siparişi iptal et; kalkmış bir drone'daki paket iptal edilemez
+        started = perf_counter()
+        if package_id not in self.package_ids:
+            raise ValueError(f"Unknown package: {package_id}")
+        self.advance(time)
+        changes = {}
+        plan = self.assignments.get(package_id)
+        if plan is not None and plan.departure_time <= self.now:
+            logger.debug("Package ID: %s is already in flight", package_id)
+            return self.finish("cancel_package", started, changes)
+        if plan is not None:
+            self.unassign(package_id)
+            package = next(package for package in plan.packages if package.id == package_id)
+            # Çok duraklı seferin diğer paketleri yeniden yerleştirilir
+            changes.update(self.replan([other for other in plan.packages if other.id != package_id]))
+        else:
+            package = self.backlog.pop(package_id, None)
+        if package is not None:
+            package.set_cannot_deliver()
+            changes[package_id] = None
+            if plan is not None:
+                self.retry_backlog(changes, [plan.drone], plan.departure_time, plan.arrival_time)
+        return self.finish("cancel_package", started, changes)
+
+    def activate_noflyzone(self, data: Dict[str, Any], time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Yeni zone ekle ya da var olanın aktif aralığını değiştir (sözlük şeması, dakika cinsinden)
+        started = perf_counter()
+        self.advance(time)
+        index = self.case.get_noflyzone_index(data["id"])
+        if index is None:
+            index = self.case.add_noflyzone(data)
+            previous = None
+        else:
+            previous = self.case.noflyzones[index].active_time
+            self.case.set_noflyzone_active_time(index, (data["active_time"][0] * 60.0, data["active_time"][1] * 60.0))
+        return self.finish("activate_noflyzone", started, self.zone_changed(index, previous))
+
+    def extend_noflyzone(self, zone_id: int, end_time: float, time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Zone'un aktif aralığının bitişini end_time (vaka saniyesi) yap
+        started = perf_counter()
+        self.advance(time)
+        index = self.case.get_noflyzone_index(zone_id)
+        if index is None:
+            raise ValueError(f"Unknown no-fly zone: {zone_id}")
+        previous = self.case.noflyzones[index].active_time
+        self.case.set_noflyzone_active_time(index, (previous[0], end_time))
+        return self.finish("extend_noflyzone", started, self.zone_changed(index, previous))
+
+    def crosses_zone(self, plan: RoutePlan, index: int) -> bool:
+        # Plan, zone aktifken uçulan ve zone ile çakışan bir bacak içeriyor
+        zone = self.case.noflyzones[index]
+        if plan.arrival_time < zone.active_time[0] or plan.departure_time > zone.active_time[1]:
+            return False
+        return any(zone.is_path_conflict(points[i], points[i + 1])
+                   for points in plan.leg_points for i in range(len(points) - 1))
+
+    def zone_changed(self, index: int, previous: Tuple[float, float] = None) -> Dict[int, Optional[RoutePlan]]:
+        # Yalnızca zone ile çakışan bekleyen planlar geri alınır
+        self.reset_solver_caches()
+        plans = [plan for plan in self.planned() if plan.departure_time > self.now and self.crosses_zone(plan, index)]
+        for plan in plans:
+            self.unassign(plan.package.id)
+        changes = self.replan([package for plan in plans for package in plan.packages])
+        active_time = self.case.noflyzones[index].active_time
+        if previous is not None and (active_time[0] > previous[0] or active_time[1] < previous[1]):
+            # Kısalan aktif aralık, aralığın eski kısmında bekleyen paketlere yer açabilir
+            self.retry_backlog(changes, start=previous[0], end=previous[1])
+        return changes
+
+    def mark_drone_unavailable(self, drone_id: int, time: float, until: float = None) -> Dict[int, Optional[RoutePlan]]:
+        ## Drone'u until anına kadar (None: süresiz) devre dışı bırak; bekleyen planları başka drone'lara taşınır
+        started = perf_counter()
+        self.advance(time)
+        if drone_id not in self.schedules:
+            raise ValueError(f"Unknown drone: {drone_id}")
+        until = float('inf') if until is None else until
+        self.unavailable[drone_id] = until
+        affected = [package_id for departure, _, package_id in self.schedules[drone_id]
+                    if self.now < departure < until]
+        packages = [package for package_id in affected for package in self.unassign(package_id).packages]
+        return self.finish("mark_drone_unavailable", started, self.replan(packages))
+
+    def mark_drone_available(self, drone_id: int, time: float) -> Dict[int, Optional[RoutePlan]]:
+        ## Drone'u yeniden kullanıma aç; bekleme listesindeki paketler denenir
+        started = perf_counter()
+        self.advance(time)
+        self.unavailable.pop(drone_id, None)
+        changes = {}
+        self.retry_backlog(changes, [drone for drone in self.case.drones if drone.id == drone_id])
+        return self.finish("mark_drone_available", started, changes)
+
+    def pending_assignments(self) -> Dict[int, RoutePlan]:
+        ## Henüz kalkmamış (değiştirilebilir) atamalar
+        return {package_id: plan for package_id, plan in self.assignments.items() if plan.departure_time > self.now}
+
+    def to_solution(self, sink: SolutionSink = None) -> Solution:
+        ## Tamamlanan ve planlanan tüm seferlerden çözüm
+        solution = Solution(sink)
+        solution.solverName = "Incremental Planner"
+        solution.Case = self.case
+        plans = sorted(self.completed + self.planned(), key=lambda plan: plan.departure_time)
+        for plan in plans:
+            solution.add_plan(plan)
+        solution.close()
+        return solution
@@ -1,40 +1,41 @@
 import random
 
 class RandomCaseGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, seed=None):
+        # Tohum verilirse üretim tekrarlanabilir olur; verilmezse modülün global üreteci kullanılır
+        self.random = random.Random(seed) if seed is not None else random
 
     def random_drone(self, drone_id):
         return {
             "id": drone_id,  
-            "max_weight": round(random.uniform(2.0, 6.0), 1),
-            "battery": random.randint(8000, 20000),
-            "speed": round(random.uniform(5.0, 12.0), 1),
-            "start_pos": (random.randint(0, 100), random.randint(0, 100))
+            "max_weight": round(self.random.uniform(2.0, 6.0), 1),
+            "battery": self.random.randint(8000, 20000),
+            "speed": round(self.random.uniform(5.0, 12.0), 1),
+            "start_pos": (self.random.randint(0, 100), self.random.randint(0, 100))
         }
 
     def random_delivery(self, delivery_id):
-        start_time = random.randint(0, 60)
-        end_time = random.randint(start_time + 1, start_time + 60)  
+        start_time = self.random.randint(0, 60)
+        end_time = self.random.randint(start_time + 1, start_time + 60)  
         return {
             "id": delivery_id,  
-            "pos": (random.randint(0, 100), random.randint(0, 100)),
-            "weight": round(random.uniform(0.5, 4.5), 1),
-            "priority": random.randint(1, 5),
+            "pos": (self.random.randint(0, 100), self.random.randint(0, 100)),
+            "weight": round(self.random.uniform(0.5, 4.5), 1),
+            "priority": self.random.randint(1, 5),
             "time_window": (start_time, end_time),
             "delivered": False
         }
 
     def random_no_fly_zone(self, nfz_id, FullTime=False):
-        x1, y1 = random.randint(0, 80), random.randint(0, 80)
-        x2, y2 = x1 + random.randint(10, 20), y1 + random.randint(10, 20)
+        x1, y1 = self.random.randint(0, 80), self.random.randint(0, 80)
+        x2, y2 = x1 + self.random.randint(10, 20), y1 + self.random.randint(10, 20)
         coords = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
         if FullTime:
             start_time = 0
             end_time = 60*24
         else:
-            start_time = random.randint(0, 60)
-            end_time = random.randint(start_time + 1, start_time + 60)
+            start_time = self.random.randint(0, 60)
+            end_time = self.random.randint(start_time + 1, start_time + 60)
         return {
             "id": nfz_id,  
             "coordinates": coords,
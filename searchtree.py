@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class SearchTree:
+    ## Bir kaynaktan tüm düğümlere en kısa yol ağacı (düğümler komşuluk indeksleriyle)
+    source: int
+    dist: Dict[int, float] = field(default_factory=dict)  # Düğüm -> maliyet
+    times: Dict[int, float] = field(default_factory=dict)  # Düğüm -> varış zamanı
+    came_from: Dict[int, int] = field(default_factory=dict)  # Düğüm -> ağaçtaki öncülü
+
+    def reaches(self, node: int) -> bool:
+        return node in self.dist
+
+    def path_to(self, node: int) -> List[int]:
+        ## Kaynaktan düğüme giden yol
+        return self.path_from(node)[::-1]
+
+    def path_from(self, node: int) -> List[int]:
+        ## Düğümden kaynağa giden yol (ters arama ağaçlarında dönüş yolu)
+        path = [node]
+        while node in self.came_from:
+            node = self.came_from[node]
+            path.append(node)
+        return path
@@ -0,0 +1,386 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+from astarsolver import AStarSolver
+from batch import build_case, iter_cases
+from planner import IncrementalPlanner
+from solver import RoutePlan
+
+logger = logging.getLogger(__name__)
+
+# Olay türleri (JSONL, zaman alanları dakika cinsinden):
+#   {"type": "order", "time": t, "package": {...}}
+#   {"type": "cancel", "time": t, "package_id": id}
+#   {"type": "noflyzone", "time": t, "zone": {...}}
+#   {"type": "noflyzone_extend", "time": t, "zone_id": id, "end_time": t2}
+#   {"type": "drone_status", "time": t, "drone_id": id, "available": bool, "until": t2}
+#   {"type": "stats"}
+EVENT_TYPES = ("order", "cancel", "noflyzone", "noflyzone_extend", "drone_status", "stats")
+PACKAGE_FIELDS = ("id", "pos", "weight", "priority", "time_window")
+
+Reply = Callable[[str], None]
+
+
+class DispatchService:
+    ## IncrementalPlanner'ı besleyen asyncio servisi. Okuyucular olayları sınırlı bir kuyruğa koyar
+    ## (kuyruk dolunca okuma bekler); tek işleyici kuyrukta biriken olayları bir mikro-parti olarak
+    ## alır ve rota aramalarını tek iş parçacıklı yürütücüde çalıştırır, böylece olay döngüsü
+    ## arama sırasında da okumaya devam eder. Planlayıcı durumu yalnızca bu iş parçacığında değişir.
+    planner: IncrementalPlanner
+    max_batch: int  # Bir partide işlenecek en fazla olay
+    batch_window: float  # İlk olaydan sonra partiye olay toplamak için beklenecek süre (s)
+    queue_size: int  # Kuyruk dolunca okuyucular bekler (geri basınç)
+    latencies: List[float]  # Olay alımından kararın yazılmasına kadar geçen süreler (s)
+    batch_sizes: List[int]
+
+    def __init__(self, planner: IncrementalPlanner, max_batch: int = 64, batch_window: float = 0.0, queue_size: int = 1024):
+        self.planner = planner
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.queue_size = queue_size
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        self.latencies = []
+        self.batch_sizes = []
+        self.errors = 0
+
+    async def submit(self, event: Dict[str, Any], reply: Reply) -> asyncio.Future:
+        ## Olayı kuyruğa koy (kuyruk doluysa bekle); karar yazıldığında tamamlanan future döner
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put((perf_counter(), event, reply, done))
+        return done
+
+    async def read_lines(self, readline: Callable[[], Any], reply: Reply) -> Optional[asyncio.Future]:
+        ## Satır satır JSON olaylarını oku; eşzamanlı readline (ör. stdin) varsayılan yürütücüde çağrılır.
+        ## Kuyruk sıralı işlendiğinden son olayın future'ı tüm olayların yanıtlandığını gösterir.
+        loop = asyncio.get_running_loop()
+        last = None
+        while True:
+            if asyncio.iscoroutinefunction(readline):
+                line = await readline()
+            else:
+                line = await loop.run_in_executor(None, readline)
+            if not line:
+                return last
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            event = self.parse(line, reply)
+            if event is not None:
+                last = await self.submit(event, reply)
+
+    def parse(self, line: str, reply: Reply) -> Optional[Dict[str, Any]]:
+        # Boş satırlar atlanır; bozuk satır için hata kaydı yazılır
+        if not line.strip():
+            return None
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            reply(json.dumps({"type": "error", "error": f"Invalid JSON: {e}"}) + "\n")
+            return None
+        if not isinstance(event, dict):
+            self.errors += 1
+            reply(json.dumps({"type": "error", "error": "Event must be a JSON object"}) + "\n")
+            return None
+        return event
+
+    async def replay(self, path: str, reply: Reply, speed: float = 0.0):
+        ## Kayıtlı olay dosyasını oynat; speed > 0 ise olay zamanları arası bekleme 1/speed ölçeğinde uygulanır
+        previous = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                event = self.parse(line, reply)
+                if event is None:
+                    continue
+                if speed > 0 and isinstance(event.get("time"), (int, float)):
+                    if previous is not None and event["time"] > previous:
+                        await asyncio.sleep((event["time"] - previous) * 60.0 / speed)
+                    previous = event["time"]
+                await self.submit(event, reply)
+
+    async def worker(self):
+        ## Kuyruktaki olayları partiler halinde planlayıcıya uygula (None: dur)
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if self.queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # stats olayı, partide kendisinden önceki olaylar uygulanıp kaydedildikten sonra yanıtlanır
+            segment = []
+            for item in batch:
+                if item[1].get("type") == "stats":
+                    if segment:
+                        await self.decide(segment)
+                    await self.decide([item])
+                    segment = []
+                else:
+                    segment.append(item)
+            if segment:
+                await self.decide(segment)
+            self.batch_sizes.append(len(batch))
+
+    async def decide(self, items: list):
+        # Olayları yürütücüde uygula, yanıtları yaz ve gecikmeleri kaydet. Beklenmeyen bir hata da
+        # hata kaydı olarak yanıtlanır; işleyici durmaz ve bekleyen future'lar tamamlanır.
+        loop = asyncio.get_running_loop()
+        events = [event for _, event, _, _ in items]
+        try:
+            results = await loop.run_in_executor(self.executor, self.apply_batch, events)
+        except Exception as e:
+            logger.exception("Batch of %d events failed", len(events))
+            self.errors += len(events)
+            results = [[self.error_record(event, e)] for event in events]
+        decided = perf_counter()
+        for (received, _, reply, done), records in zip(items, results):
+            for record in records:
+                reply(json.dumps(record) + "\n")
+            self.latencies.append(decided - received)
+            done.set_result(None)
+
+    def error_record(self, event: Dict[str, Any], error: Exception) -> dict:
+        return {"type": "error", "event": event.get("type"), "error": f"{type(error).__name__}: {error}"}
+
+    def apply_batch(self, events: List[Dict[str, Any]]) -> List[List[dict]]:
+        # Yürütücü iş parçacığında çalışır. Ardışık siparişler tek seferde yerleştirilir.
+        results = [None] * len(events)
+        i = 0
+        while i < len(events):
+            if events[i].get("type") == "stats":
+                results[i] = [self.stats()]
+                i += 1
+                continue
+            if events[i].get("type") == "order":
+                j = i
+                while j < len(events) and events[j].get("type") == "order":
+                    j += 1
+                self.apply_orders(events[i:j], results, i)
+                i = j
+                continue
+            try:
+                results[i] = self.assignment_records(self.apply_event(events[i]))
+            except Exception as e:
+                # Planlayıcıdan gelen her hata (ör. GEOSException) yalnızca bu olayı etkiler
+                if not isinstance(e, (KeyError, TypeError, ValueError)):
+                    logger.exception("Event %r failed", events[i].get("type"))
+                self.errors += 1
+                results[i] = [self.error_record(events[i], e)]
+            i += 1
+        return results
+
+    def apply_orders(self, events: List[Dict[str, Any]], results: list, offset: int):
+        # Hatalı siparişler ayıklanır; her siparişe kendi paketinin atama kaydı döner
+        valid = []
+        for k, event in enumerate(events):
+            package = event.get("package")
+            error = None
+            if not isinstance(package, dict) or any(field not in package for field in PACKAGE_FIELDS):
+                error = f"Order needs package fields {PACKAGE_FIELDS}"
+            else:
+                try:
+                    self.planner.case.create_package(package)
+                    self.event_time(event)
+                    if package["id"] in self.planner.package_ids or any(package["id"] == other["package"]["id"] for _, other in valid):
+                        error = f"Duplicate package id {package['id']}"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+            if error is None:
+                valid.append((k, event))
+                continue
+            self.errors += 1
+            results[offset + k] = [{"type": "error", "event": "order", "error": error}]
+        # Yalnızca aynı anda gelen siparişler birlikte yerleştirilir; her grup kendi anında planlanır, böylece
+        # sonuç parti boyutundan bağımsızdır (daha geç bir siparişin anında erken siparişin penceresi kapanmış olabilir)
+        groups = []
+        for k, event in valid:
+            if groups and groups[-1][-1][1].get("time") == event.get("time"):
+                groups[-1].append((k, event))
+            else:
+                groups.append([(k, event)])
+        for group in groups:
+            self.add_orders(group, results, offset)
+
+    def add_orders(self, group: list, results: list, offset: int):
+        time = self.event_time(group[0][1])
+        try:
+            changes = self.planner.add_packages([event["package"] for _, event in group], time)
+        except Exception:
+            # Planlayıcı grubu geri aldı; siparişler tek tek denenir, yalnızca başarısız olan reddedilir
+            logger.exception("Order batch failed, retrying orders one by one")
+            changes = {}
+            for k, event in group:
+                try:
+                    changes.update(self.planner.add_packages([event["package"]], time))
+                except Exception as e:
+                    self.errors += 1
+                    results[offset + k] = [self.error_record(event, e)]
+        records = {record["package_id"]: record for record in self.assignment_records(changes)}
+        for k, event in group:
+            if results[offset + k] is None:
+                record = records.get(event["package"]["id"])
+                results[offset + k] = [record] if record else []
+
+    def event_time(self, event: Dict[str, Any]) -> float:
+        # Dakikadan vaka saniyesine; geç gelen olaylar şimdiki anda uygulanır
+        time = event.get("time")
+        return self.planner.now if time is None else max(time * 60.0, self.planner.now)
+
+    def apply_event(self, event: Dict[str, Any]) -> Dict[int, Optional[RoutePlan]]:
+        kind = event.get("type")
+        if kind == "cancel":
+            return self.planner.cancel_package(event["package_id"], self.event_time(event))
+        if kind == "noflyzone":
+            return self.planner.activate_noflyzone(event["zone"], self.event_time(event))
+        if kind == "noflyzone_extend":
+            return self.planner.extend_noflyzone(event["zone_id"], event["end_time"] * 60.0, self.event_time(event))
+        if kind == "drone_status":
+            if event.get("available", True):
+                return self.planner.mark_drone_available(event["drone_id"], self.event_time(event))
+            until = event.get("until")
+            return self.planner.mark_drone_unavailable(event["drone_id"], self.event_time(event),
+                                                       None if until is None else until * 60.0)
+        raise ValueError(f"Unknown event type {kind!r}, expected one of {EVENT_TYPES}")
+
+    def assignment_records(self, changes: Dict[int, Optional[RoutePlan]]) -> List[dict]:
+        # Zamanlar dakika cinsinden; atanamayan paket için drone_id None
+        records = []
+        for package_id, plan in changes.items():
+            record = {"type": "assignment", "package_id": package_id, "drone_id": None}
+            if plan is not None:
+                record.update({
+                    "drone_id": plan.drone.id,
+                    "departure": plan.departure_time / 60.0,
+                    "delivery": plan.delivery_time / 60.0,
+                    "arrival": plan.arrival_time / 60.0,
+                    "cost": plan.total_cost,
+                })
+            records.append(record)
+        return records
+
+    def stats(self) -> dict:
+        ## Karar gecikmesi yüzdelikleri (ms) ve parti boyutları
+        latencies = np.asarray(self.latencies) * 1000.0
+        return {
+            "type": "stats",
+            "events": len(self.latencies),
+            "errors": self.errors,
+            "batches": len(self.batch_sizes),
+            "max_batch": max(self.batch_sizes, default=0),
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies.size else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if latencies.size else None,
+            "max_ms": float(latencies.max()) if latencies.size else None,
+            "assigned": len(self.planner.assignments) + sum(len(plan.packages) for plan in self.planner.completed),
+            "backlog": len(self.planner.backlog),
+        }
+
+    async def run(self, sources):
+        ## Kaynak korutinleri bitene kadar çalış, kalan olayları işle ve istatistikleri döndür
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        worker = asyncio.create_task(self.worker())
+        try:
+            await asyncio.gather(*sources)
+            await self.queue.put(None)
+            await worker
+        finally:
+            worker.cancel()
+            self.executor.shutdown(wait=True)
+        return self.stats()
+
+    async def serve(self, socket_path: str = None, port: int = None):
+        ## Yerel unix soketi ya da 127.0.0.1 üzerinde bağlantı başına olay akışı; kesilene kadar çalışır
+        async def handle(reader, writer):
+            reply = lambda line: writer.write(line.encode("utf-8"))
+            try:
+                last = await self.read_lines(reader.readline, reply)
+                if last is not None:
+                    await last
+                await writer.drain()
+            finally:
+                writer.close()
+
+        if socket_path:
+            server = await asyncio.start_unix_server(handle, path=socket_path)
+        else:
+            server = await asyncio.start_server(handle, host="127.0.0.1", port=port)
+        logger.info("Listening on %s", socket_path or f"127.0.0.1:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def write_stdout(line: str):
+    sys.stdout.write(line)
+    sys.stdout.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="JSONL olay akışıyla çalışan drone dağıtım servisi")
+    parser.add_argument("case", help="Başlangıç vakası (JSON ya da JSONL, ilk vaka kullanılır)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--replay", help="Olayları stdin yerine bu JSONL dosyasından oynat")
+    source.add_argument("--socket", help="Unix soketinde dinle")
+    source.add_argument("--port", type=int, help="127.0.0.1 üzerinde TCP portunda dinle")
+    parser.add_argument("--speed", type=float, default=0.0, help="Oynatma hızı (olay dakikası / gerçek saniye oranı 60*speed; 0: beklemeden)")
+    parser.add_argument("--max-batch", type=int, default=64, help="Mikro-parti başına en fazla olay")
+    parser.add_argument("--batch-window", type=float, default=0.0, help="Partiye olay toplamak için bekleme (s)")
+    parser.add_argument("--queue-size", type=int, default=1024, help="Geri basınç uygulanmadan önce kuyruktaki olay sayısı")
+    parser.add_argument("--routing", choices=AStarSolver.ROUTING_MODES, default="visibility", help="Rota ağı")
+    args = parser.parse_args(argv)
+
+    _, record = next(iter_cases([args.case]))
+    planner = IncrementalPlanner(build_case(record), AStarSolver(routing=args.routing, one_to_many=args.routing == "knn"))
+    service = DispatchService(planner, args.max_batch, args.batch_window, args.queue_size)
+
+    if args.socket or args.port:
+        service.queue = asyncio.Queue(maxsize=args.queue_size)
+
+        async def serve():
+            worker = asyncio.create_task(service.worker())
+            try:
+                await service.serve(args.socket, args.port)
+            finally:
+                worker.cancel()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        service.executor.shutdown(wait=False)
+        sys.stderr.write(json.dumps(service.stats()) + "\n")
+        return 0
+
+    if args.replay:
+        sources = [service.replay(args.replay, write_stdout, args.speed)]
+    else:
+        sources = [service.read_lines(sys.stdin.readline, write_stdout)]
+    stats = asyncio.run(service.run(sources))
+    sys.stderr.write(json.dumps(stats) + "\n")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
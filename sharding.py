@@ -0,0 +1,264 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+import os
+import sys
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import shapely
+
+from astarsolver import AStarSolver
+from batch import build_case, iter_cases
+from deliverycase import DeliveryCase
+from planner import IncrementalPlanner
+from solver import CallbackSink, Solution, Solver, TripPlan
+
+logger = logging.getLogger(__name__)
+
+
+def solve_region(record: Dict[str, Any], solver_options: dict) -> Tuple[list, float]:
+    ## Bölge vakasını çöz; seferler ve çözüm süresi döndürülür (işçi süreçte çalışır)
+    started = perf_counter()
+    deliverycase = DeliveryCase(record["casetime"], record["drones"], record["packages"], record["noflyzones"])
+    plans = []
+    AStarSolver(**solver_options).solve(deliverycase, sink=CallbackSink(plans.append))
+    return plans, perf_counter() - started
+
+
+class ShardedSolver(Solver):
+    ## Büyük vakayı drone üslerine göre bölgelere ayırır ve her bölgeyi, yalnızca bölgeye değen
+    ## no-fly zone'larla, ayrı bir süreçte AStarSolver ile çözer. Bölge sınırına yakın paketler,
+    ## bölgede teslim edilemeyenler ve bölge dışındaki bir zone'a takılan seferlerin paketleri son
+    ## global geçişte, bölge seferleri korunarak IncrementalPlanner ile boş aralıklara yerleştirilir.
+    PARTITIONS = ("kmeans", "grid")
+    KMEANS_ITERATIONS = 20
+    CHUNK = 65536  # Paket-üs uzaklık matrisinin satır bloğu (bellek sınırı)
+
+    regions: int  # Hedef bölge sayısı (üs sayısından fazla olamaz)
+    partition: str  # Üs gruplama yöntemi
+    workers: int  # İşçi süreç sayısı
+    boundary: float  # Başka bölgedeki üs en fazla (1 + boundary) kat uzaksa paket sınırda sayılır
+    margin: float  # Bölge kutusunun zone seçimi için genişletilme oranı
+    solver_options: dict  # Bölge çözücülerine aktarılan AStarSolver seçenekleri
+
+    def __init__(self, regions: int = None, partition: str = "kmeans", workers: int = None, boundary: float = 0.1,
+                 margin: float = 0.1, **solver_options):
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unknown partition method: {partition}")
+        self.regions = regions or os.cpu_count() or 1
+        self.partition = partition
+        self.workers = workers
+        self.boundary = boundary
+        self.margin = margin
+        self.solver_options = solver_options
+
+    def group_bases(self, bases: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        ## Üs konumlarını en fazla self.regions gruba ayır (üs -> grup, boş gruplar atlanır)
+        k = min(self.regions, len(bases))
+        if self.partition == "grid":
+            cols = int(np.ceil(np.sqrt(k)))
+            rows = int(np.ceil(k / cols))
+            low = bases.min(axis=0)
+            span = np.maximum(bases.max(axis=0) - low, 1e-9)
+            cells = np.minimum((bases - low) / span * (cols, rows), (cols - 1, rows - 1)).astype(np.intp)
+            labels = cells[:, 1] * cols + cells[:, 0]
+        else:
+            # Paket yüküyle ağırlıklı k-means; başlangıç merkezleri birbirine en uzak üsler
+            chosen = [int(np.argmax(weights))]
+            nearest = np.sqrt(((bases - bases[chosen[0]]) ** 2).sum(axis=1))
+            for _ in range(k - 1):
+                chosen.append(int(np.argmax(nearest)))
+                nearest = np.minimum(nearest, np.sqrt(((bases - bases[chosen[-1]]) ** 2).sum(axis=1)))
+            centers = bases[chosen].astype(float)
+            labels = None
+            for _ in range(self.KMEANS_ITERATIONS):
+                distances = ((bases[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+                updated = np.argmin(distances, axis=1)
+                if labels is not None and np.array_equal(updated, labels):
+                    break
+                labels = updated
+                for group in range(k):
+                    members = labels == group
+                    if members.any():
+                        centers[group] = np.average(bases[members], axis=0, weights=weights[members])
+        return np.unique(labels, return_inverse=True)[1]
+
+    def split(self, deliverycase: DeliveryCase) -> Tuple[List[List[int]], List[List[int]], List[int]]:
+        ## Drone ve paket satırlarını bölgelere ayır; sınırdaki paketler ayrı döndürülür.
+        ## Paket, kendisine en yakın üssün bölgesine düşer.
+        starts = np.asarray([drone.start_pos for drone in deliverycase.drones], dtype=float)
+        bases, drone_base = np.unique(starts, axis=0, return_inverse=True)
+        drone_base = drone_base.reshape(-1)
+        positions = np.asarray([package.pos for package in deliverycase.packages], dtype=float).reshape(-1, 2)
+
+        nearest = np.empty(len(positions), dtype=np.intp)
+        ratios = np.empty(len(positions))
+        for start in range(0, len(positions), self.CHUNK):
+            block = np.sqrt(((positions[start:start + self.CHUNK, None, :] - bases[None, :, :]) ** 2).sum(axis=2))
+            nearest[start:start + self.CHUNK] = np.argmin(block, axis=1)
+        weights = np.bincount(nearest, minlength=len(bases)) + 1.0
+        base_group = self.group_bases(bases, weights)
+
+        for start in range(0, len(positions), self.CHUNK):
+            block = np.sqrt(((positions[start:start + self.CHUNK, None, :] - bases[None, :, :]) ** 2).sum(axis=2))
+            own = base_group[nearest[start:start + self.CHUNK]]
+            other = np.where(base_group[None, :] == own[:, None], np.inf, block).min(axis=1)
+            closest = block.min(axis=1)
+            ratios[start:start + self.CHUNK] = np.where(closest > 0, other / np.maximum(closest, 1e-12), np.inf)
+
+        groups = base_group.max() + 1 if len(bases) else 0
+        drone_rows = [[] for _ in range(groups)]
+        for row, base in enumerate(drone_base):
+            drone_rows[base_group[base]].append(row)
+        package_rows = [[] for _ in range(groups)]
+        border = []
+        package_group = base_group[nearest] if len(positions) else nearest
+        for row, (group, ratio) in enumerate(zip(package_group.tolist(), ratios.tolist())):
+            if groups > 1 and ratio <= 1 + self.boundary:
+                border.append(row)
+            else:
+                package_rows[group].append(row)
+        return drone_rows, package_rows, border
+
+    def region_zones(self, deliverycase: DeliveryCase, drones: list, packages: list) -> List[int]:
+        ## Bölge kutusuna (margin oranında genişletilmiş) değen zone indeksleri
+        points = np.asarray([drone.start_pos for drone in drones] + [package.pos for package in packages], dtype=float)
+        low, high = points.min(axis=0), points.max(axis=0)
+        pad = self.margin * max(high - low) + 1.0
+        box = shapely.box(low[0] - pad, low[1] - pad, high[0] + pad, high[1] + pad)
+        return sorted(deliverycase.noflyzone_index.query(box).tolist())
+
+    def region_record(self, deliverycase: DeliveryCase, drones: list, packages: list, zones: List[int]) -> Dict[str, Any]:
+        # Sözlük şeması (zamanlar dakika cinsinden), DeliveryCase ile yeniden yüklenir
+        return {
+            "casetime": deliverycase.starttime,
+            "drones": [{"id": drone.id, "max_weight": drone.max_weight, "battery": drone.battery, "speed": drone.speed,
+                        "start_pos": drone.start_pos} for drone in drones],
+            "packages": [{"id": package.id, "pos": package.pos, "weight": package.weight, "priority": package.priority,
+                          "time_window": [package.time_window[0] / 60.0, package.time_window[1] / 60.0]} for package in packages],
+            "noflyzones": [{"id": zone.id, "coordinates": zone.coordinates,
+                            "active_time": [zone.active_time[0] / 60.0, zone.active_time[1] / 60.0]}
+                           for zone in (deliverycase.noflyzones[i] for i in zones)],
+        }
+
+    def attach(self, plan, drones: dict, packages: dict):
+        # İşçiden gelen kopyalar yerine bu süreçteki nesneler kullanılır
+        plan.drone = drones[plan.drone.id]
+        if isinstance(plan, TripPlan):
+            plan.packages = [packages[package.id] for package in plan.packages]
+        else:
+            plan.package = packages[plan.package.id]
+        return plan
+
+    def crossing_plans(self, deliverycase: DeliveryCase, plans: list, zones: frozenset) -> set:
+        ## Bölgeye verilmemiş zone'lardan biriyle, zone aktifken çakışan seferlerin indeksleri
+        if not zones or not plans:
+            return set()
+        starts, ends, owners = [], [], []
+        for i, plan in enumerate(plans):
+            for points in plan.leg_points:
+                starts.extend(points[:-1])
+                ends.extend(points[1:])
+                owners.extend([i] * (len(points) - 1))
+        if not starts:
+            return set()
+        hits = deliverycase.are_edges_conflict_noflyzone(starts, ends, 0.0, zones=zones)
+        crossing = set()
+        for i in set(np.asarray(owners)[hits].tolist()):
+            plan = plans[i]
+            for zone in (deliverycase.noflyzones[z] for z in zones):
+                if plan.arrival_time < zone.active_time[0] or plan.departure_time > zone.active_time[1]:
+                    continue
+                if any(zone.is_path_conflict(points[j], points[j + 1])
+                       for points in plan.leg_points for j in range(len(points) - 1)):
+                    crossing.add(i)
+                    break
+        return crossing
+
+    def solve(self, deliverycase: DeliveryCase, **kwargs) -> Solution:
+        logger.debug("Sharded A* with %d regions starting...", self.regions)
+        started = perf_counter()
+        drone_rows, package_rows, border = self.split(deliverycase)
+        drones = deliverycase.drones
+        packages = deliverycase.packages
+        records = []
+        region_zones = []
+        for rows, members in zip(drone_rows, package_rows):
+            region_drones = [drones[row] for row in rows]
+            region_packages = [packages[row] for row in members]
+            zones = self.region_zones(deliverycase, region_drones, region_packages)
+            region_zones.append(zones)
+            records.append(self.region_record(deliverycase, region_drones, region_packages, zones))
+        partitioned = perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers or min(len(records), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(solve_region, records, [self.solver_options] * len(records)))
+        solved = perf_counter()
+
+        drones_by_id = {drone.id: drone for drone in drones}
+        packages_by_id = {package.id: package for package in packages}
+        all_zones = set(range(len(deliverycase.noflyzones)))
+        kept = []
+        regions = []
+        dropped = 0
+        for (plans, elapsed), zones, record in zip(results, region_zones, records):
+            plans = [self.attach(plan, drones_by_id, packages_by_id) for plan in plans]
+            crossing = self.crossing_plans(deliverycase, plans, frozenset(all_zones.difference(zones)))
+            dropped += len(crossing)
+            kept.extend(plan for i, plan in enumerate(plans) if i not in crossing)
+            regions.append({"drones": len(record["drones"]), "packages": len(record["packages"]), "noflyzones": len(zones),
+                            "trips": len(plans), "solve": elapsed})
+
+        # Global geçiş: bölge seferleri sabit tutulur, kalan paketler tüm drone'lar arasında, bölgelerle
+        # aynı çözücü seçenekleriyle yerleştirilir
+        planner = IncrementalPlanner(deliverycase, AStarSolver(**self.solver_options), plans=kept)
+        reconciled = len(planner.assignments) - sum(len(plan.packages) for plan in kept)
+        planner.advance(float('inf'))
+        for package in planner.backlog.values():
+            package.set_cannot_deliver()
+        solution = planner.to_solution(kwargs.get("sink"))
+        solution.solverName = "Sharded A* Solver"
+        finished = perf_counter()
+
+        solution.metrics = {
+            "counters": {"regions": len(records), "border_packages": len(border), "dropped_trips": dropped,
+                         "reconciled": reconciled},
+            "timings": {"partition": partitioned - started, "regions": solved - partitioned, "reconcile": finished - solved},
+            "regions": regions,
+        }
+        return solution
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Büyük vakaları bölgelere ayırıp paralel çöz")
+    parser.add_argument("cases", nargs="+", help="JSON ya da JSONL vaka dosyaları ya da casestore dizinleri")
+    parser.add_argument("-r", "--regions", type=int, default=None, help="Bölge sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="İşçi süreç sayısı")
+    parser.add_argument("--partition", choices=ShardedSolver.PARTITIONS, default="kmeans", help="Üs gruplama yöntemi")
+    parser.add_argument("--boundary", type=float, default=0.1, help="Sınır paketi oranı")
+    parser.add_argument("--routing", choices=AStarSolver.ROUTING_MODES, default="knn", help="Bölge çözücülerinin rota ağı")
+    parser.add_argument("--multi-drop", action="store_true", help="Bölgelerde bir sefere birden çok paket ekle")
+    args = parser.parse_args(argv)
+
+    solver = ShardedSolver(regions=args.regions, partition=args.partition, workers=args.workers, boundary=args.boundary,
+                           routing=args.routing, multi_drop=args.multi_drop)
+    for case_id, record in iter_cases(args.cases):
+        deliverycase = build_case(record)
+        solution = solver.solve(deliverycase)
+        result = {
+            "case": case_id,
+            "packages": len(deliverycase.packages),
+            "delivered": sum(1 for package in deliverycase.packages if package.delivered),
+            "delivery_percent": deliverycase.get_successful_delivery_percent(),
+            "total_distance": solution.totalDistance,
+            "total_consumption": solution.totalConsumption,
+        }
+        result.update(solution.metrics)
+        sys.stdout.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 from abc import abstractmethod
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import timedelta
-from typing import List
+from datetime import datetime, timedelta
+import json
+from typing import Callable, List
 
 from deliverycase import DeliveryCase
 from drone import Drone
+from package import Package
 
 @dataclass
 class DronePath:
@@ -12,12 +15,17 @@ class DronePath:
     isReturn: bool  # True if the path is a return path, False otherwise
     cost: float
     distence: float# Total distance of the path
+    start_time: float = None  # Bacağın başladığı an (vaka saniyesi), biliniyorsa
+    package_id: int = None  # Teslimat bacağının hedef paketi; dönüş bacağında None
 
-    def __init__(self,node_path:List[float],node_positions:List[tuple[float, float]], isReturn:bool, cost:float=0.0):
+    def __init__(self,node_path:List[float],node_positions:List[tuple[float, float]], isReturn:bool, cost:float=0.0, start_time:float=None,
+                 package_id:int=None):
         self.points = [node_positions[node] for node in node_path]
         self.distence = sum(Drone.calculate_distance(self.points[i], self.points[i + 1]) for i in range(len(self.points) - 1))
         self.isReturn = isReturn
         self.cost = cost
+        self.start_time = start_time
+        self.package_id = package_id
 
     def callculate_estimated_time(self, drone: Drone) -> timedelta:
         if drone.speed <= 0:
@@ -26,12 +34,205 @@ class DronePath:
         return timedelta(seconds=total_time)
 
 
+@dataclass
+class RoutePlan:
+    drone: Drone
+    package: Package
+    deliver_path: List[int]  # Üs -> paket düğüm yolu
+    return_path: List[int]  # Paket -> üs düğüm yolu
+    deliver_points: List[tuple[float, float]]
+    return_points: List[tuple[float, float]]
+    deliver_cost: float
+    return_cost: float
+    energy: float  # Teslimat + dönüş enerji tüketimi
+    delivery_time: float  # Pakete varış (vaka saniyesi)
+    arrival_time: float  # Üsse dönüş (vaka saniyesi)
+    evaluation_time: float = 0.0  # Planı hesaplamak için harcanan süre (s)
+    departure_time: float = 0.0  # Üsten kalkış (vaka saniyesi)
+
+    @property
+    def total_cost(self) -> float:
+        return self.deliver_cost + self.return_cost
+
+    @property
+    def packages(self) -> List[Package]:
+        return [self.package]
+
+    @property
+    def leg_points(self) -> List[List[tuple[float, float]]]:
+        return [self.deliver_points, self.return_points]
+
+    def to_drone_paths(self) -> List[DronePath]:
+        return [
+            DronePath(self.deliver_path, dict(zip(self.deliver_path, self.deliver_points)), isReturn=False, cost=self.deliver_cost,
+                      start_time=self.departure_time, package_id=self.package.id),
+            DronePath(self.return_path, dict(zip(self.return_path, self.return_points)), isReturn=True, cost=self.return_cost,
+                      start_time=self.delivery_time),
+        ]
+
+
+@dataclass
+class TripPlan:
+    drone: Drone
+    packages: List[Package]  # Teslimat sırasıyla duraklar
+    legs: List[List[int]]  # Ardışık duraklar arası düğüm yolları; son bacak üsse dönüş
+    leg_points: List[List[tuple[float, float]]]
+    leg_costs: List[float]
+    stop_times: List[float]  # Her durağa varış (vaka saniyesi)
+    energy: float  # Her bacakta taşınan yüke göre toplam enerji tüketimi
+    arrival_time: float  # Üsse dönüş (vaka saniyesi)
+    departure_time: float = 0.0  # Üsten kalkış (vaka saniyesi)
+
+    @classmethod
+    def from_route_plan(cls, plan: RoutePlan) -> "TripPlan":
+        return cls(
+            drone=plan.drone,
+            packages=[plan.package],
+            legs=[plan.deliver_path, plan.return_path],
+            leg_points=[plan.deliver_points, plan.return_points],
+            leg_costs=[plan.deliver_cost, plan.return_cost],
+            stop_times=[plan.delivery_time],
+            energy=plan.energy,
+            arrival_time=plan.arrival_time,
+            departure_time=plan.departure_time,
+        )
+
+    @property
+    def total_cost(self) -> float:
+        return sum(self.leg_costs)
+
+    @property
+    def package(self) -> Package:
+        return self.packages[0]
+
+    def loads(self) -> List[float]:
+        ## Her bacakta taşınan toplam ağırlık (dönüş bacağında 0)
+        weights = [package.weight for package in self.packages]
+        return [sum(weights[i:]) for i in range(len(weights))] + [0]
+
+    def to_drone_paths(self) -> List[DronePath]:
+        last = len(self.legs) - 1
+        starts = [self.departure_time] + self.stop_times
+        return [
+            DronePath(path, dict(zip(path, points)), isReturn=i == last, cost=cost, start_time=start,
+                      package_id=None if i == last else self.packages[i].id)
+            for i, (path, points, cost, start) in enumerate(zip(self.legs, self.leg_points, self.leg_costs, starts))
+        ]
+
+
+@dataclass
+class DroneSummary:
+    ## Drone başına sabit boyutlu özet (sefer sayısından bağımsız bellek)
+    trips: int = 0
+    packages: int = 0
+    distance: float = 0.0
+    consumption: float = 0.0
+    flight_time: float = 0.0  # Kalkıştan üsse dönüşe kadar geçen sürelerin toplamı (s)
+    last_arrival: float = 0.0  # Son seferin üsse dönüş anı (vaka saniyesi)
+
+
+class SolutionSink:
+    ## Çözüme işlenen her seferi (RoutePlan ya da TripPlan) karar anında alan hedef
+    def add(self, plan):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemorySink(SolutionSink):
+    ## Varsayılan hedef: tüm rota bacaklarını drone başına bellekte tutar
+    def __init__(self):
+        self.dronePaths = defaultdict(list)
+
+    def add(self, plan):
+        self.dronePaths[plan.drone.id].extend(plan.to_drone_paths())
+
+
+class JsonlSink(SolutionSink):
+    ## Her seferi bir JSONL satırı olarak yazar; dosya yolu verilirse dosyayı kendisi açıp kapatır
+    def __init__(self, output):
+        self.owned = isinstance(output, str)
+        self.output = open(output, "w", encoding="utf-8") if self.owned else output
+
+    def add(self, plan):
+        paths = plan.to_drone_paths()
+        record = {
+            "drone_id": plan.drone.id,
+            "packages": [package.id for package in plan.packages],
+            "departure": paths[0].start_time,
+            "arrival": plan.arrival_time,
+            "cost": plan.total_cost,
+            "energy": plan.energy,
+            "legs": [{"points": [list(point) for point in path.points], "cost": path.cost, "start_time": path.start_time,
+                      "return": path.isReturn} for path in paths],
+        }
+        self.output.write(json.dumps(record) + "\n")
+
+    def close(self):
+        if self.owned:
+            self.output.close()
+        else:
+            self.output.flush()
+
+
+class CallbackSink(SolutionSink):
+    ## Her seferi verilen fonksiyona iletir
+    def __init__(self, callback: Callable):
+        self.callback = callback
+
+    def add(self, plan):
+        self.callback(plan)
+
+
 class Solution:
     solverName: str
     Case: DeliveryCase
-    dronePaths: dict[list[DronePath]] = {}
-    totalDistance: float = 0.0
-    totalConsumption: float = 0.0
+    sink: SolutionSink
+    dronePaths: dict[list[DronePath]]  # Bellek hedefinde drone -> rota bacakları; diğer hedeflerde boş
+    drone_summaries: dict[int, DroneSummary]  # Drone -> sefer özeti (her hedefte tutulur)
+    totalDistance: float
+    totalConsumption: float
+    metrics: dict  # Çözücü sayaçları ve aşama sürelerinin anlık görüntüsü
+
+    def __init__(self, sink: SolutionSink = None):
+        self.solverName = ""
+        self.Case = None
+        self.sink = sink if sink is not None else MemorySink()
+        self.dronePaths = self.sink.dronePaths if isinstance(self.sink, MemorySink) else {}
+        self.drone_summaries = {}
+        self.totalDistance = 0.0
+        self.totalConsumption = 0.0
+        self.metrics = None
+
+    def add_plan(self, plan):
+        ## Seferi hedefe aktar; toplamlar ve drone özeti artımlı güncellenir
+        self.sink.add(plan)
+        self.totalDistance += plan.total_cost
+        self.totalConsumption += plan.energy
+        summary = self.drone_summaries.get(plan.drone.id)
+        if summary is None:
+            summary = self.drone_summaries[plan.drone.id] = DroneSummary()
+        summary.trips += 1
+        summary.packages += len(plan.packages)
+        summary.distance += plan.total_cost
+        summary.consumption += plan.energy
+        summary.flight_time += plan.arrival_time - plan.departure_time
+        summary.last_arrival = max(summary.last_arrival, plan.arrival_time)
+
+    def close(self):
+        self.sink.close()
+
+    def get_drone_paths(self) -> dict:
+        ## Drone -> rota bacakları; yalnızca bellek hedefinde tutulur
+        if not isinstance(self.sink, MemorySink):
+            raise ValueError(f"Route legs were streamed to {type(self.sink).__name__} and are not kept in the solution; "
+                             "solve with the default memory sink to save or render them")
+        return self.dronePaths
+
+    def to_datetime(self, time: float) -> datetime:
+        # Çözücünün saniye cinsinden zamanını vakanın başlangıcına göre datetime'a çevir
+        return self.Case.to_datetime(time)
 
 class Solver:
     @abstractmethod
@@ -0,0 +1,31 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Modüller depo kökünde düz olarak durur
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deliverycase import DeliveryCase  # noqa: E402
+
+CASETIME = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def drone(drone_id, start_pos, speed=8.0, battery=20000, max_weight=5.0):
+    return {"id": drone_id, "max_weight": max_weight, "battery": battery, "speed": speed, "start_pos": start_pos}
+
+
+def package(package_id, pos, time_window=(0, 60), priority=1, weight=1.0):
+    return {"id": package_id, "pos": pos, "weight": weight, "priority": priority, "time_window": time_window}
+
+
+def zone(zone_id, x, y, active_time):
+    return {"id": zone_id, "coordinates": [(x[0], y[0]), (x[1], y[0]), (x[1], y[1]), (x[0], y[1])], "active_time": active_time}
+
+
+@pytest.fixture
+def make_case():
+    def make(drones, packages, noflyzones=()):
+        return DeliveryCase(CASETIME, list(drones), list(packages), list(noflyzones))
+    return make
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from astarsolver import AStarSolver
+from conftest import drone, package, zone
+from randomcase import RandomCaseGenerator
+
+
+def path_costs(deliverycase, start_time, **options):
+    solver = AStarSolver(**options)
+    solver.deliverycase = deliverycase
+    solver.build_graph(deliverycase)
+    graph = solver.build_drone_graph(deliverycase.get_package_graph(solver.KNN), deliverycase.drones[0])
+    return {package.id: solver.find_path(-1, package.id, graph, None, deliverycase.drones[0].speed, start_time)[1]
+            for package in deliverycase.packages}
+
+
+@pytest.mark.parametrize("options", [{"bidirectional": True}, {"bidirectional": True, "heuristic": "alt"}])
+def test_zone_switching_on_after_departure_is_penalised(make_case, options):
+    # Zone kalkıştan sonra (1. dakikada) açılır; drone oraya vardığında aktiftir
+    positions = [(1, 1), (1, -1), (-1, 1), (-1, -1), (65, 0), (100, 0), (100, 5), (100, -5), (105, 0)]
+    deliverycase = make_case(
+        [drone(1, (0, 0), speed=1.0, battery=1000000)],
+        [package(i + 1, pos, time_window=(0, 1000)) for i, pos in enumerate(positions)],
+        [zone(1, (70, 80), (-10, 10), (1, 1000))],
+    )
+    expected = path_costs(deliverycase, 0.0)
+    assert expected[6][0] > AStarSolver().noflyzone_penalty
+    assert path_costs(deliverycase, 0.0, **options) == expected
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_bidirectional_matches_default_search(make_case, seed):
+    random.seed(seed)
+    drones, packages, zones = RandomCaseGenerator().get_random_data(3, 40, 4, full_time_nfz=seed == 2)
+    deliverycase = make_case(drones, packages, zones)
+    for start_time in (0.0, 600.0, 1800.0):
+        expected = path_costs(deliverycase, start_time)
+        for options in ({"bidirectional": True}, {"bidirectional": True, "heuristic": "alt"}):
+            actual = path_costs(deliverycase, start_time, **options)
+            assert actual.keys() == expected.keys()
+            for package_id, (cost, arrival) in expected.items():
+                assert actual[package_id][0] == pytest.approx(cost)
+                assert actual[package_id][1] == pytest.approx(arrival)
@@ -0,0 +1,21 @@
+from astarsolver import AStarSolver
+from casestore import load_solution, save_solution
+from conftest import drone, package, zone
+
+
+def test_solution_round_trip_keeps_drone_summaries(make_case, tmp_path):
+    deliverycase = make_case([drone(1, (0, 0)), drone(2, (100, 100))],
+                             [package(i, (10 * i, 100 - 10 * i), time_window=(0, 120)) for i in range(1, 9)],
+                             [zone(1, (40, 60), (40, 60), (0, 60))])
+    solution = AStarSolver().solve(deliverycase)
+    assert solution.drone_summaries
+
+    save_solution(str(tmp_path), solution)
+    loaded = load_solution(str(tmp_path), deliverycase)
+
+    assert loaded.drone_summaries == solution.drone_summaries
+    assert loaded.totalDistance == solution.totalDistance
+    assert {drone_id: len(paths) for drone_id, paths in loaded.dronePaths.items()} == \
+           {drone_id: len(paths) for drone_id, paths in solution.dronePaths.items()}
+    assert [[path.package_id for path in paths] for paths in loaded.dronePaths.values()] == \
+           [[path.package_id for path in paths] for paths in solution.dronePaths.values()]
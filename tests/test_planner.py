@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from astarsolver import AStarSolver
+from columnarcase import ColumnarDeliveryCase
+from conftest import CASETIME, drone, package, zone
+from deliverycase import DeliveryCase
+from packagegraph import PackageGraph
+from planner import IncrementalPlanner
+
+
+def random_orders(rng, first_id, count):
+    return [package(first_id + k, (rng.uniform(0, 100), rng.uniform(0, 100)), time_window=(1, 60), priority=rng.randint(1, 5))
+            for k in range(count)]
+
+
+@pytest.mark.parametrize("case_type", [DeliveryCase, ColumnarDeliveryCase])
+def test_added_packages_update_knn_graph_like_a_rebuild(case_type):
+    rng = random.Random(4)
+    drones = [drone(1, (0, 0)), drone(2, (100, 100))]
+    packages = random_orders(rng, 1, 30)
+    deliverycase = case_type(CASETIME, drones, packages, [zone(1, (40, 60), (40, 60), (0, 60))])
+    planner = IncrementalPlanner(deliverycase, AStarSolver())
+    orders = random_orders(rng, 100, 20)
+    for k, order in enumerate(orders):
+        planner.add_package(order, 10.0 * k)
+
+    graph = deliverycase.get_package_graph(AStarSolver.KNN)
+    rebuilt = PackageGraph.from_case(deliverycase, AStarSolver.KNN)
+    assert graph.edges == rebuilt.edges
+    for i in range(len(graph.ids)):
+        assert sorted(graph.get_adjacency().neighbors(i)) == sorted(rebuilt.get_adjacency().neighbors(i))
+
+    # Artımlı grafikteki rota, tüm paketlerle baştan kurulan vakadaki rotayla aynı maliyette
+    fresh = DeliveryCase(CASETIME, drones, packages + orders, [zone(1, (40, 60), (40, 60), (0, 60))])
+    solver = AStarSolver()
+    solver.deliverycase = fresh
+    for order in orders:
+        for i in range(len(drones)):
+            expected = solver.plan_route(fresh, fresh.drones[i], fresh.get_package_by_id(order["id"]), 300.0)
+            actual = planner.solver.plan_route(deliverycase, deliverycase.drones[i], deliverycase.get_package_by_id(order["id"]), 300.0)
+            assert (actual is None) == (expected is None)
+            if expected is not None:
+                assert actual.total_cost == pytest.approx(expected.total_cost)
+
+
+def test_cancel_unknown_package_raises(make_case):
+    planner = IncrementalPlanner(make_case([drone(1, (0, 0))], [package(1, (10, 10))]))
+    with pytest.raises(ValueError):
+        planner.cancel_package(99, 0.0)
+
+
+def test_trip_plan_is_tracked_for_every_package(make_case):
+    deliverycase = make_case([drone(1, (0, 0))], [package(i, (50 + i, 50), time_window=(0, 120)) for i in (1, 2, 3)])
+    solver = AStarSolver()
+    solver.deliverycase = deliverycase
+    first = solver.plan_route(deliverycase, deliverycase.drones[0], deliverycase.packages[0], 0.0)
+    trip = solver.extend_trip(deliverycase, first, deliverycase.packages)
+    assert len(trip.packages) == 3
+
+    planner = IncrementalPlanner(deliverycase, solver, plans=[trip])
+    assert planner.planned() == [trip]
+    assert {package.id for package in trip.packages} <= set(planner.assignments)
+
+    planner.advance(trip.arrival_time)
+    assert not planner.assignments
+    assert all(package.delivered for package in deliverycase.packages)
+
+
+def test_cancelling_one_stop_replans_the_rest_of_the_trip(make_case):
+    deliverycase = make_case([drone(1, (0, 0))], [package(i, (50 + i, 50), time_window=(10, 120)) for i in (1, 2, 3)])
+    solver = AStarSolver()
+    solver.deliverycase = deliverycase
+    first = solver.plan_route(deliverycase, deliverycase.drones[0], deliverycase.packages[0], 600.0)
+    trip = solver.extend_trip(deliverycase, first, deliverycase.packages)
+    planner = IncrementalPlanner(deliverycase, solver, plans=[trip])
+
+    changes = planner.cancel_package(2, 0.0)
+    assert changes[2] is None
+    assert not deliverycase.get_package_by_id(2).can_deliver
+    assert set(planner.assignments) == {1, 3}
+    assert trip not in planner.planned()
+
+
+def test_default_routing_avoids_zone_switching_on_mid_leg(make_case):
+    # Zone 1. dakikada açılır; drone (1 m/s) oraya 70. saniyede varır
+    deliverycase = make_case(
+        [drone(1, (0, 0), speed=1.0, battery=1000000)],
+        [package(1, (100, 0), time_window=(0, 1000))],
+        [zone(1, (70, 80), (-10, 10), (1, 1000))],
+    )
+    planner = IncrementalPlanner(deliverycase)
+    plan = planner.assignments[1]
+    speed = deliverycase.drones[0].speed
+    assert not deliverycase.get_crossed_noflyzones(plan.deliver_points, plan.departure_time, speed)
+    assert not deliverycase.get_crossed_noflyzones(plan.return_points, plan.delivery_time, speed)
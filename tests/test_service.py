@@ -0,0 +1,36 @@
+from conftest import drone, package
+from planner import IncrementalPlanner
+from service import DispatchService
+
+
+def orders():
+    return [
+        {"type": "order", "time": 0, "package": package(1, (20, 0), time_window=(0, 10))},
+        {"type": "order", "time": 30, "package": package(2, (0, 20), time_window=(30, 90))},
+    ]
+
+
+def test_batched_orders_are_planned_at_their_own_time(make_case):
+    batched = DispatchService(IncrementalPlanner(make_case([drone(1, (0, 0)), drone(2, (0, 0))], [])))
+    results = batched.apply_batch(orders())
+
+    single = DispatchService(IncrementalPlanner(make_case([drone(1, (0, 0)), drone(2, (0, 0))], [])), max_batch=1)
+    expected = [single.apply_batch([event])[0] for event in orders()]
+
+    assert results == expected
+    assert results[0][0]["drone_id"] is not None
+    assert results[0][0]["departure"] < 10
+
+
+def test_invalid_order_is_rejected_alone(make_case):
+    service = DispatchService(IncrementalPlanner(make_case([drone(1, (0, 0))], [])))
+    events = [
+        {"type": "order", "time": 0, "package": package(1, (20, 0), time_window=(0, 60))},
+        {"type": "order", "time": 0, "package": dict(package(2, (0, 0)), pos="xx")},
+        {"type": "order", "time": 0, "package": package(3, (0, 20), time_window=(0, 60))},
+    ]
+    results = service.apply_batch(events)
+
+    assert [record["type"] for record, in results] == ["assignment", "error", "assignment"]
+    assert results[0][0]["drone_id"] == 1 and results[2][0]["drone_id"] == 1
+    assert service.errors == 1
@@ -0,0 +1,38 @@
+import pytest
+
+from astarsolver import AStarSolver
+from conftest import drone, package, zone
+
+
+def leg_points(deliverycase, time):
+    solver = AStarSolver(routing="visibility")
+    solver.deliverycase = deliverycase
+    return solver.find_leg(deliverycase, deliverycase.drones[0], None, deliverycase.packages[0], time)[1]
+
+
+def test_zone_switching_on_during_leg_is_avoided(make_case):
+    # Zone 1. dakikada açılır; 1 m/s hızla drone zone'a ancak 70. saniyede ulaşır
+    deliverycase = make_case(
+        [drone(1, (0, 0), speed=1.0, battery=1000000)],
+        [package(1, (100, 0), time_window=(0, 1000))],
+        [zone(1, (70, 80), (-10, 10), (1, 1000))],
+    )
+    points = leg_points(deliverycase, 0.0)
+    assert len(points) > 2
+    assert not deliverycase.get_crossed_noflyzones(points, 0.0, 1.0)
+
+
+def test_zone_switching_on_after_leg_is_ignored(make_case):
+    # Drone zone'u 80. saniyede geçmiş olur; zone 2. dakikada açılır
+    deliverycase = make_case(
+        [drone(1, (0, 0), speed=1.0, battery=1000000)],
+        [package(1, (100, 0), time_window=(0, 1000))],
+        [zone(1, (70, 80), (-10, 10), (2, 1000))],
+    )
+    assert leg_points(deliverycase, 0.0) == [(0, 0), (100, 0)]
+
+
+def test_crossing_span_measures_distance_inside_zone(make_case):
+    deliverycase = make_case([drone(1, (0, 0))], [package(1, (100, 0))], [zone(1, (70, 80), (-10, 10), (0, 60))])
+    assert deliverycase.noflyzones[0].crossing_span((0, 0), (100, 0)) == pytest.approx((70.0, 80.0))
+    assert deliverycase.noflyzones[0].crossing_span((0, 20), (100, 20)) is None
@@ -0,0 +1,19 @@
+import numpy as np
+
+from astarsolver import AStarSolver
+from conftest import drone, package
+from visualize import CaseVisualizer
+
+
+def test_timeline_matches_deliveries_by_package_id(make_case):
+    # İki paket aynı konumda, farklı pencerelerde: her biri kendi teslimat bacağının bitişinde işaretlenir
+    deliverycase = make_case([drone(1, (0, 0))],
+                             [package(1, (30, 40), time_window=(20, 60)), package(2, (30, 40), time_window=(0, 60))])
+    solution = AStarSolver().solve(deliverycase)
+    visualizer = CaseVisualizer()
+    timeline = visualizer.path_timeline(solution)
+
+    ends = {item[7]: item[2] for item in timeline if not item[6]}
+    assert set(ends) == {1, 2} and ends[1] != ends[2]
+    deliveries = visualizer.delivery_times(solution, timeline)
+    assert np.array_equal(deliveries, [ends[package.id] for package in deliverycase.packages])
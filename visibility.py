@@ -0,0 +1,223 @@
+import copy
+from heapq import heappop, heappush
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from drone import Drone
+from noflyzone import NoFlyZone
+
+
+class VisibilityGraph:
+    ## No-fly zone köşeleri arasındaki görünürlük grafiği. Köşe çiftlerini engelleyen zone'lar
+    ## bir kez hesaplanır; aktif küme değiştiğinde yalnızca açılan/kapanan zone'ların
+    ## engel sayaçları güncellenir ve her aktif küme için komşuluk listesi saklanır.
+    noflyzones: List[NoFlyZone]
+    corners: np.ndarray  # (m, 2) zone köşeleri, poligonun dışına CLEARANCE kadar kaydırılmış
+    owners: np.ndarray  # Köşe -> sahibi zone indeksi
+    pair_u: np.ndarray  # Köşe çifti (u < v)
+    pair_v: np.ndarray
+    pair_lengths: np.ndarray
+    zone_pairs: List[np.ndarray]  # Zone -> engellediği çift indeksleri
+    zone_corners: List[np.ndarray]  # Zone -> içinde (ya da sınırında) kalan köşe indeksleri
+    blocked: np.ndarray  # Çift -> aktif engelleyici zone sayısı
+    covered: np.ndarray  # Köşe -> onu örten aktif zone sayısı
+    active: FrozenSet[int]  # Sayaçların yansıttığı aktif zone kümesi
+    adjacencies: Dict[FrozenSet[int], tuple]  # Aktif küme -> (kullanılabilir köşeler, komşuluk)
+    visible: dict  # (nokta, aktif küme) -> görünür köşeler ve uzaklıkları
+    expansions: int  # shortest_path aramalarında genişletilen köşe sayısı
+
+    CLEARANCE = 1e-4  # Kenar boyunca uçuş çakışma sayıldığından köşeler dışarı kaydırılır
+
+    def __init__(self, noflyzones: List[NoFlyZone]):
+        self.noflyzones = noflyzones
+        self.index = STRtree([zone.polygon for zone in noflyzones])
+        corners = []
+        owners = []
+        for i, zone in enumerate(noflyzones):
+            ring = shapely.buffer(zone.polygon, self.CLEARANCE, join_style="mitre").exterior
+            coords = np.asarray(ring.coords)[:-1]
+            corners.append(coords)
+            owners.extend([i] * len(coords))
+        self.corners = np.vstack(corners) if corners else np.empty((0, 2))
+        self.owners = np.asarray(owners, dtype=np.intp)
+        self.corner_points = [tuple(point) for point in self.corners.tolist()]
+
+        m = len(self.corners)
+        self.pair_u, self.pair_v = np.triu_indices(m, k=1)
+        delta = self.corners[self.pair_u] - self.corners[self.pair_v]
+        self.pair_lengths = np.sqrt((delta ** 2).sum(axis=1))
+        self.zone_pairs = self.blocking_zones(self.corners[self.pair_u], self.corners[self.pair_v])
+
+        points = shapely.points(self.corners)
+        point_idx, zone_idx = self.index.query(points, predicate="intersects")
+        self.zone_corners = [point_idx[zone_idx == z] for z in range(len(noflyzones))]
+
+        self.blocked = np.zeros(len(self.pair_u), dtype=np.int32)
+        self.covered = np.zeros(m, dtype=np.int32)
+        self.active = frozenset()
+        self.adjacencies = {}
+        self.visible = {}
+        self.expansions = 0
+
+    def add_zone(self, zone: int):
+        ## Listeye sonradan eklenen zone'u işle: yeni köşeler, yeni çiftler ve yeni zone'un
+        ## eski çiftlerdeki engelleri eklenir. Eski aktif kümeler yeni zone'u içermediğinden
+        ## önbellekteki komşuluklar ve görünürlük sonuçları geçerli kalır.
+        self.index = STRtree([item.polygon for item in self.noflyzones])
+        ring = shapely.buffer(self.noflyzones[zone].polygon, self.CLEARANCE, join_style="mitre").exterior
+        new_corners = np.asarray(ring.coords)[:-1]
+        m = len(self.corners)
+        k = len(new_corners)
+        new_ids = np.arange(m, m + k)
+
+        # Eski çiftlerden yeni zone'un engelledikleri
+        old_pairs = np.flatnonzero(self.noflyzones[zone].are_paths_conflict(self.corners[self.pair_u], self.corners[self.pair_v]))
+
+        # Yeni köşelerin eski köşelerle ve kendi aralarındaki çiftleri
+        self.corners = np.vstack([self.corners, new_corners])
+        self.owners = np.concatenate([self.owners, np.full(k, zone, dtype=np.intp)])
+        self.corner_points.extend(tuple(point) for point in new_corners.tolist())
+        inner_u, inner_v = np.triu_indices(k, k=1)
+        pair_u = np.concatenate([np.repeat(np.arange(m), k), m + inner_u]).astype(np.intp)
+        pair_v = np.concatenate([np.tile(new_ids, m), m + inner_v]).astype(np.intp)
+        delta = self.corners[pair_u] - self.corners[pair_v]
+        offset = len(self.pair_u)
+        new_pairs = self.blocking_zones(self.corners[pair_u], self.corners[pair_v])
+        self.pair_u = np.concatenate([self.pair_u, pair_u])
+        self.pair_v = np.concatenate([self.pair_v, pair_v])
+        self.pair_lengths = np.concatenate([self.pair_lengths, np.sqrt((delta ** 2).sum(axis=1))])
+        self.zone_pairs = [np.concatenate([self.zone_pairs[z], offset + new_pairs[z]]) if z < zone else offset + new_pairs[z]
+                           for z in range(len(self.noflyzones))]
+        self.zone_pairs[zone] = np.concatenate([old_pairs, self.zone_pairs[zone]])
+
+        # Köşe örtüşmeleri: yeni köşeler eski zone'larda, eski köşeler yeni zone'da
+        point_idx, zone_idx = self.index.query(shapely.points(new_corners), predicate="intersects")
+        covered_new = [m + point_idx[zone_idx == z] for z in range(len(self.noflyzones))]
+        old_points = shapely.points(self.corners[:m])
+        covered_old = np.flatnonzero(shapely.intersects(self.noflyzones[zone].polygon, old_points)) if m else np.empty(0, dtype=np.intp)
+        self.zone_corners = [np.concatenate([self.zone_corners[z], covered_new[z]]) if z < zone
+                             else np.concatenate([covered_old, covered_new[z]]).astype(np.intp)
+                             for z in range(len(self.noflyzones))]
+
+        # Sayaçlar mevcut aktif kümeye göre yeni öğeler için başlatılır
+        blocked = np.zeros(len(pair_u), dtype=np.int32)
+        covered = np.zeros(k, dtype=np.int32)
+        for z in self.active:
+            blocked[new_pairs[z]] += 1
+            covered[covered_new[z] - m] += 1
+        self.blocked = np.concatenate([self.blocked, blocked])
+        self.covered = np.concatenate([self.covered, covered])
+
+    def blocking_zones(self, starts: np.ndarray, ends: np.ndarray) -> List[np.ndarray]:
+        ## Her zone için, o zone aktifken çakışan hatların indeksleri
+        if len(starts) == 0:
+            return [np.empty(0, dtype=np.intp) for _ in self.noflyzones]
+        lines = shapely.linestrings(np.stack([starts, ends], axis=1))
+        line_idx, zone_idx = self.index.query(lines)
+        hits = NoFlyZone.lines_conflict(lines[line_idx], self.index.geometries[zone_idx])
+        line_idx, zone_idx = line_idx[hits], zone_idx[hits]
+        return [line_idx[zone_idx == z] for z in range(len(self.noflyzones))]
+
+    def thread_view(self) -> "VisibilityGraph":
+        ## Geometri dizileri paylaşılır; aktif küme sayaçları, önbellekler ve genişletme sayacı kopyalanır
+        view = copy.copy(self)
+        view.blocked = self.blocked.copy()
+        view.covered = self.covered.copy()
+        view.adjacencies = dict(self.adjacencies)
+        view.visible = dict(self.visible)
+        view.expansions = 0
+        return view
+
+    def set_active(self, active: FrozenSet[int]):
+        ## Sayaçları yeni aktif kümeye taşı (yalnızca değişen zone'lar işlenir)
+        for zone, step in [(z, 1) for z in active - self.active] + [(z, -1) for z in self.active - active]:
+            self.blocked[self.zone_pairs[zone]] += step
+            self.covered[self.zone_corners[zone]] += step
+        self.active = active
+
+    def get_adjacency(self, active: FrozenSet[int]) -> tuple:
+        ## Aktif küme için kullanılabilir köşe maskesi ve köşe komşuluk listesi (önbellekli)
+        if active not in self.adjacencies:
+            self.set_active(active)
+            usable = np.isin(self.owners, list(active)) & (self.covered == 0)
+            edges = np.flatnonzero((self.blocked == 0) & usable[self.pair_u] & usable[self.pair_v])
+            adjacency = {}
+            for u, v, length in zip(self.pair_u[edges].tolist(), self.pair_v[edges].tolist(), self.pair_lengths[edges].tolist()):
+                adjacency.setdefault(u, []).append((v, length))
+                adjacency.setdefault(v, []).append((u, length))
+            self.adjacencies[active] = (usable, adjacency)
+        return self.adjacencies[active]
+
+    def get_visible(self, point: Tuple[float, float], active: FrozenSet[int], usable: np.ndarray) -> List[Tuple[int, float]]:
+        ## Noktadan çakışmasız görülebilen kullanılabilir köşeler ve uzaklıkları
+        key = (point, active)
+        if key not in self.visible:
+            candidates = np.flatnonzero(usable)
+            starts = np.broadcast_to(np.asarray(point, dtype=float), (len(candidates), 2))
+            blocked = np.zeros(len(candidates), dtype=bool)
+            for zone in active:
+                blocked[self.line_blockers(starts, self.corners[candidates], zone)] = True
+            visible = candidates[~blocked]
+            delta = self.corners[visible] - np.asarray(point, dtype=float)
+            self.visible[key] = list(zip(visible.tolist(), np.sqrt((delta ** 2).sum(axis=1)).tolist()))
+        return self.visible[key]
+
+    def line_blockers(self, starts: np.ndarray, ends: np.ndarray, zone: int) -> np.ndarray:
+        return np.flatnonzero(self.noflyzones[zone].are_paths_conflict(starts, ends))
+
+    def is_clear(self, start: Tuple[float, float], end: Tuple[float, float], active: FrozenSet[int]) -> bool:
+        return not any(self.noflyzones[zone].is_path_conflict(start, end) for zone in active)
+
+    def shortest_path(self, start: Tuple[float, float], end: Tuple[float, float],
+                      active: FrozenSet[int]) -> Optional[Tuple[List[int], List[Tuple[float, float]], float]]:
+        ## Aktif zone'lardan kaçınan en kısa yol: (köşe indeksleri, noktalar, uzunluk) ya da None.
+        ## Ara düğümler yalnızca zone köşeleridir; A* düğüm sayısı paket sayısından bağımsızdır.
+        if self.is_clear(start, end, active):
+            return [], [start, end], Drone.calculate_distance(start, end)
+        usable, adjacency = self.get_adjacency(active)
+        targets = dict(self.get_visible(end, active, usable))
+        if not targets:
+            return None
+
+        heuristic = lambda i: Drone.calculate_distance(self.corner_points[i], end)
+        g_score = {}
+        came_from = {}
+        heap = []
+        for corner, distance in self.get_visible(start, active, usable):
+            g_score[corner] = distance
+            came_from[corner] = None
+            heappush(heap, (distance + heuristic(corner), corner))
+
+        best = float('inf')
+        best_corner = None
+        closed = set()
+        while heap:
+            estimate, corner = heappop(heap)
+            if estimate >= best:
+                break
+            if corner in closed:
+                continue
+            closed.add(corner)
+            self.expansions += 1
+            if corner in targets and g_score[corner] + targets[corner] < best:
+                best = g_score[corner] + targets[corner]
+                best_corner = corner
+            for neighbor, length in adjacency.get(corner, ()):
+                distance = g_score[corner] + length
+                if distance < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = distance
+                    came_from[neighbor] = corner
+                    heappush(heap, (distance + heuristic(neighbor), neighbor))
+
+        if best_corner is None:
+            return None
+        path = []
+        corner = best_corner
+        while corner is not None:
+            path.append(corner)
+            corner = came_from[corner]
+        path.reverse()
+        points = [start] + [self.corner_points[i] for i in path] + [end]
+        return path, points, best
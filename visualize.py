@@ -1,12 +1,20 @@
-from matplotlib import pyplot as plt
-from matplotlib.patches import Polygon
+import os
+from typing import List, Tuple
 import numpy as np
 
 from solver import Solution
 
 
 class CaseVisualizer:
+    ## matplotlib yalnızca çizim istendiğinde içe aktarılır; render ve render_timeline
+    ## pyplot kullanmadan Agg ile doğrudan dosyaya (PNG/SVG) yazar
+    COLORS = ['blue', 'orange', 'purple', 'brown', 'cyan', 'magenta', 'olive', 'black']
+    MAX_LABELS = 200  # Bu sayıdan fazla öğe varsa o gruba etiket yazılmaz
+
     def visualize(self, solution: Solution):
+        from matplotlib import pyplot as plt
+        from matplotlib.patches import Polygon
+
         plt.figure(figsize=(14, 10))
 
         # Harita ayarları
@@ -19,7 +27,7 @@ class CaseVisualizer:
             polygon = Polygon(zone.coordinates, alpha=0.3, color='red', edgecolor='darkred', linewidth=2)
             plt.gca().add_patch(polygon)
             center = np.mean(zone.coordinates, axis=0)
-            plt.text(center[0], center[1], f'NFZ-{zone.id}\n{zone.active_time[0].strftime("%X")}-{zone.active_time[1].strftime("%X")}',
+            plt.text(center[0], center[1], f'NFZ-{zone.id}\n{solution.to_datetime(zone.active_time[0]).strftime("%X")}-{solution.to_datetime(zone.active_time[1]).strftime("%X")}',
                     ha='center', va='center', fontsize=9, fontweight='bold',
                     bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
 
@@ -37,7 +45,7 @@ class CaseVisualizer:
 
         # Drone rotaları
         colors = ['blue', 'orange', 'purple', 'brown', 'cyan', 'magenta', 'olive', 'black']  # Extend if more drones
-        drone_paths = solution.dronePaths
+        drone_paths = solution.get_drone_paths()
 
         for drone_id, paths in drone_paths.items():
             color = colors[drone_id % len(colors)]
@@ -76,3 +84,194 @@ class CaseVisualizer:
         plt.tight_layout()
         print(solution.Case.get_successful_delivery_percent())
         plt.show()
+
+    def create_figure(self, figsize: Tuple[float, float], dpi: int):
+        # pyplot'un global durumu ve etkileşimli arka uç olmadan Agg tuvali
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        return figure
+
+    def get_extent(self, solution: Solution) -> Tuple[float, float, float, float]:
+        # Paket, üs ve zone koordinatlarını kapsayan sınırlar (%5 pay ile)
+        case = solution.Case
+        points = [package.pos for package in case.packages] + [drone.start_pos for drone in case.drones]
+        points += [point for zone in case.noflyzones for point in zone.coordinates]
+        if not points:
+            return -5, 105, -5, 105
+        points = np.asarray(points, dtype=float)
+        (minx, miny), (maxx, maxy) = points.min(axis=0), points.max(axis=0)
+        pad = max(maxx - minx, maxy - miny, 1.0) * 0.05
+        return minx - pad, maxx + pad, miny - pad, maxy + pad
+
+    def path_segments(self, solution: Solution):
+        # Tüm rota bacaklarının doğru parçaları; (teslimat, dönüş) için ayrı segment ve renk listeleri
+        segments = ([], [])
+        colors = ([], [])
+        stars = []
+        star_colors = []
+        for drone_id, paths in solution.get_drone_paths().items():
+            color = self.COLORS[drone_id % len(self.COLORS)]
+            for path in paths:
+                points = np.asarray(path.points, dtype=float)
+                if len(points) < 2:
+                    continue
+                segments[path.isReturn].extend(np.stack([points[:-1], points[1:]], axis=1))
+                colors[path.isReturn].extend([color] * (len(points) - 1))
+                if not path.isReturn:
+                    stars.append(points[-1])
+                    star_colors.append(color)
+        return segments, colors, stars, star_colors
+
+    def draw_static(self, axes, solution: Solution, labels: bool):
+        ## Zone'lar, paketler ve üsler; her grup tek bir koleksiyon çağrısıyla çizilir
+        from matplotlib.collections import PolyCollection
+
+        case = solution.Case
+        zones = PolyCollection([zone.coordinates for zone in case.noflyzones], facecolors='red', edgecolors='darkred',
+                               alpha=0.3, linewidths=1.5)
+        axes.add_collection(zones)
+        packages = np.asarray([package.pos for package in case.packages], dtype=float).reshape(-1, 2)
+        package_colors = ['green' if package.delivered else 'gray' for package in case.packages]
+        package_artist = axes.scatter(packages[:, 0], packages[:, 1], s=20, c=package_colors, marker='o', alpha=0.5, linewidths=0)
+        bases = np.asarray([drone.start_pos for drone in case.drones], dtype=float).reshape(-1, 2)
+        axes.scatter(bases[:, 0], bases[:, 1], s=120, c='green', marker='s', edgecolors='darkgreen', linewidths=1.5, zorder=4)
+
+        # Ayrıntı düzeyi: kalabalık gruplara etiket yazılmaz
+        if labels and len(case.noflyzones) <= self.MAX_LABELS:
+            for zone in case.noflyzones:
+                center = np.mean(zone.coordinates, axis=0)
+                axes.text(center[0], center[1], f'NFZ-{zone.id}', ha='center', va='center', fontsize=8, fontweight='bold')
+        if labels and len(case.packages) <= self.MAX_LABELS:
+            for package in case.packages:
+                axes.text(package.pos[0], package.pos[1], f'P{package.id}', fontsize=6, ha='center', va='bottom', color='gray')
+        if labels and len(case.drones) <= self.MAX_LABELS:
+            for drone in case.drones:
+                axes.text(drone.start_pos[0], drone.start_pos[1], f'D{drone.id}', ha='center', va='center',
+                          fontsize=7, color='white', fontweight='bold', zorder=5)
+        return zones, package_artist
+
+    def setup_axes(self, figure, solution: Solution):
+        axes = figure.add_subplot()
+        minx, maxx, miny, maxy = self.get_extent(solution)
+        axes.set_xlim(minx, maxx)
+        axes.set_ylim(miny, maxy)
+        axes.set_aspect('equal')
+        axes.grid(True, alpha=0.3)
+        axes.set_xlabel('X Koordinatı (metre)')
+        axes.set_ylabel('Y Koordinatı (metre)')
+        return axes
+
+    def render(self, solution: Solution, path: str, labels: bool = True, figsize=(14, 10), dpi: int = 100) -> str:
+        ## Çözümü ekran açmadan dosyaya çiz; biçim uzantıdan seçilir (.png, .svg, ...)
+        from matplotlib.collections import LineCollection
+
+        figure = self.create_figure(figsize, dpi)
+        axes = self.setup_axes(figure, solution)
+        self.draw_static(axes, solution, labels)
+
+        (deliver, back), (deliver_colors, back_colors), stars, star_colors = self.path_segments(solution)
+        axes.add_collection(LineCollection(deliver, colors=deliver_colors, linewidths=1.5, linestyles='solid', zorder=3))
+        axes.add_collection(LineCollection(back, colors=back_colors, linewidths=1.0, linestyles='dashed', alpha=0.7, zorder=3))
+        if stars:
+            stars = np.asarray(stars)
+            axes.scatter(stars[:, 0], stars[:, 1], marker='*', s=60, c=star_colors, edgecolors='black', linewidths=0.5, zorder=5)
+
+        axes.set_title(f'Drone Delivery Plan - {solution.solverName}', fontsize=14, fontweight='bold')
+        axes.text(1.02, 0.1, f"Solver: {solution.solverName}\n"
+                             f"Total Distance: {solution.totalDistance:.2f} m\n"
+                             f"Total Consumption: {solution.totalConsumption:.2f} mah",
+                  transform=axes.transAxes, fontsize=10, verticalalignment='top',
+                  bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        figure.tight_layout()
+        figure.savefig(path)
+        return path
+
+    def path_timeline(self, solution: Solution) -> List[tuple]:
+        # Başlangıç anı bilinen bacaklar için (drone ID, başlangıç, bitiş, noktalar, kümülatif mesafe, hız, dönüş, hedef paket)
+        speeds = {drone.id: drone.speed for drone in solution.Case.drones}
+        timeline = []
+        for drone_id, paths in solution.get_drone_paths().items():
+            for path in paths:
+                if path.start_time is None or len(path.points) < 2 or speeds[drone_id] <= 0:
+                    continue
+                points = np.asarray(path.points, dtype=float)
+                distances = np.concatenate([[0.0], np.cumsum(np.sqrt((np.diff(points, axis=0) ** 2).sum(axis=1)))])
+                end = path.start_time + distances[-1] / speeds[drone_id]
+                timeline.append((drone_id, path.start_time, end, points, distances, speeds[drone_id], path.isReturn, path.package_id))
+        return timeline
+
+    def delivery_times(self, solution: Solution, timeline: List[tuple]) -> np.ndarray:
+        # Vaka paket sırasıyla teslimat anları: teslimat bacağının bittiği an, bacağın hedef paket ID'siyle
+        # eşleştirilir (aynı konumdaki paketler karışmaz); teslim edilmeyen paket için inf
+        packages = solution.Case.packages
+        package_index = {package.id: i for i, package in enumerate(packages)}
+        deliveries = np.full(len(packages), np.inf)
+        for _, _, leg_end, _, _, _, is_return, package_id in timeline:
+            i = package_index.get(package_id) if not is_return else None
+            if i is not None:
+                deliveries[i] = min(deliveries[i], leg_end)
+        return deliveries
+
+    def render_timeline(self, solution: Solution, directory: str, frames: int = 30, fmt: str = "png",
+                        figsize=(10, 8), dpi: int = 80) -> List[str]:
+        ## Drone programından kare kare görüntüler: aktif zone'lar, o ana kadar uçulan rotalar,
+        ## drone konumları ve teslim edilen paketler. Arka plan bir kez çizilir; karelerde
+        ## yalnızca koleksiyonların verisi güncellenir.
+        from matplotlib.collections import LineCollection
+
+        timeline = self.path_timeline(solution)
+        if not timeline:
+            raise ValueError("Solution paths have no start times; timeline needs plans with departure times")
+        os.makedirs(directory, exist_ok=True)
+        start = min(item[1] for item in timeline)
+        end = max(item[2] for item in timeline)
+        case = solution.Case
+
+        figure = self.create_figure(figsize, dpi)
+        axes = self.setup_axes(figure, solution)
+        zones, package_artist = self.draw_static(axes, solution, labels=False)
+        flown = LineCollection([], linewidths=1.2, zorder=3)
+        axes.add_collection(flown)
+        positions = axes.scatter([], [], s=40, marker='^', edgecolors='black', linewidths=0.5, zorder=6)
+        title = axes.set_title('')
+
+        deliveries = self.delivery_times(solution, timeline)
+
+        written = []
+        for k, time in enumerate(np.linspace(start, end, frames)):
+            segments = []
+            segment_colors = []
+            current = {}
+            for drone_id, leg_start, leg_end, points, distances, speed, _, _ in timeline:
+                if time < leg_start:
+                    continue
+                color = self.COLORS[drone_id % len(self.COLORS)]
+                travelled = min((time - leg_start) * speed, distances[-1])
+                n = int(np.searchsorted(distances, travelled, side='right'))
+                visited = points[:n]
+                if n < len(points):
+                    ratio = (travelled - distances[n - 1]) / (distances[n] - distances[n - 1])
+                    visited = np.vstack([visited, points[n - 1] + ratio * (points[n] - points[n - 1])])
+                segments.extend(np.stack([visited[:-1], visited[1:]], axis=1))
+                segment_colors.extend([color] * (len(visited) - 1))
+                if time <= leg_end:
+                    current[drone_id] = (visited[-1], color)
+
+            flown.set_segments(segments)
+            flown.set_color(segment_colors)
+            if current:
+                positions.set_offsets(np.asarray([point for point, _ in current.values()]))
+                positions.set_facecolors([color for _, color in current.values()])
+            else:
+                positions.set_offsets(np.empty((0, 2)))
+            zones.set_facecolors(['red' if zone.is_active(time) else 'lightgray' for zone in case.noflyzones])
+            package_artist.set_facecolors(np.where(deliveries <= time, 'green', 'gray'))
+            title.set_text(f'{solution.to_datetime(time).strftime("%X")}')
+
+            path = os.path.join(directory, f"frame_{k:04d}.{fmt}")
+            figure.savefig(path)
+            written.append(path)
+        return written